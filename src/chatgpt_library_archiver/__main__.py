@@ -4,24 +4,41 @@
 
 import os
 from collections.abc import Callable, Sequence
+from importlib import import_module
+from typing import Any
 
-from . import bootstrap, gallery, importer, incremental_downloader, tagger
 from .cli import CLI, create_app
-from .tag_normalizer import consolidate_tags
+
+
+def _lazy(module: str, name: str) -> Callable[..., Any]:
+    """Return a callable that imports ``module`` only when first invoked.
+
+    The command implementations pull in OpenAI, Pillow and requests, which
+    dominate start-up time. Resolving them at call time keeps ``--help`` and
+    argument errors fast.
+    """
+
+    def runner(*args: Any, **kwargs: Any) -> Any:
+        target = getattr(import_module(module, __package__), name)
+        return target(*args, **kwargs)
+
+    runner.__name__ = name
+    runner.__qualname__ = f"{module.lstrip('.')}.{name}"
+    return runner
 
 
 def build_app(*, printer: Callable[[str], None] = print) -> CLI:
     """Create the CLI wired up with the production dependencies."""
 
     return create_app(
-        bootstrap_runner=bootstrap.main,
-        download_runner=incremental_downloader.main,
-        gallery_generator=gallery.generate_gallery,
-        thumbnail_regenerator=importer.regenerate_thumbnails,
-        import_runner=importer.import_images,
-        tag_runner=tagger.tag_images,
-        tag_remover=tagger.remove_tags,
-        tag_consolidator=consolidate_tags,
+        bootstrap_runner=_lazy(".bootstrap", "main"),
+        download_runner=_lazy(".incremental_downloader", "main"),
+        gallery_generator=_lazy(".gallery", "generate_gallery"),
+        thumbnail_regenerator=_lazy(".importer", "regenerate_thumbnails"),
+        import_runner=_lazy(".importer", "import_images"),
+        tag_runner=_lazy(".tagger", "tag_images"),
+        tag_remover=_lazy(".tagger", "remove_tags"),
+        tag_consolidator=_lazy(".tag_normalizer", "consolidate_tags"),
         printer=printer,
     )
 
@@ -11,8 +11,9 @@
 import time
 from collections.abc import Callable
 from dataclasses import dataclass
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 from openai import (
     APIConnectionError,
@@ -48,9 +49,16 @@
 
 #: Files larger than this threshold (bytes) are resized before AI encoding.
 _ENCODE_SIZE_THRESHOLD = 500_000
+#: EXIF orientation tag; 1 means no rotation is needed.
+_EXIF_ORIENTATION = 0x0112
+_B64_READ_SIZE = 3 * (1 << 16)
 
 _CLIENT_CACHE: dict[str, OpenAI] = {}
 
+# With ``h2`` available (via the ``fast`` extra) the shared client speaks
+# HTTP/2, so concurrent tagging/renaming requests multiplex over one connection.
+_HTTP2_AVAILABLE = find_spec("h2") is not None
+
 
 @dataclass(slots=True)
 class AIRequestTelemetry:
@@ -75,6 +83,23 @@ class TaggingConfig:
     rename_prompt: str | None = None
 
 
+def _http2_client() -> Any:
+    """Return an HTTP/2 capable httpx client for the OpenAI SDK.
+
+    ``DefaultHttpxClient`` keeps the SDK's default timeouts and connection
+    limits but only exists in newer ``openai`` releases; older ones get a
+    plain ``httpx.Client``.
+    """
+
+    try:
+        from openai import DefaultHttpxClient
+    except ImportError:
+        import httpx
+
+        return httpx.Client(http2=True)
+    return DefaultHttpxClient(http2=True)
+
+
 def get_cached_client(api_key: str) -> OpenAI:
     """Return a cached ``OpenAI`` client for ``api_key``.
 
@@ -82,6 +107,9 @@ def get_cached_client(api_key: str) -> OpenAI:
     perform its own retries on top of the application-level retry loop in
     :func:`call_image_endpoint`.
 
+    When ``h2`` is installed the client negotiates HTTP/2, so the worker
+    threads that share it multiplex their requests over a single connection.
+
     The cache key is a blake2b hash of the API key to avoid holding the
     raw secret as a dictionary key in memory (M-1).
     """
@@ -89,7 +117,10 @@ def get_cached_client(api_key: str) -> OpenAI:
     cache_key = hashlib.blake2b(api_key.encode(), digest_size=16).hexdigest()
     client = _CLIENT_CACHE.get(cache_key)
     if client is None:
-        client = OpenAI(api_key=api_key, max_retries=0)
+        options: dict[str, Any] = {}
+        if _HTTP2_AVAILABLE:
+            options["http_client"] = _http2_client()
+        client = OpenAI(api_key=api_key, max_retries=0, **options)
         _CLIENT_CACHE[cache_key] = client
     return client
 
@@ -174,22 +205,43 @@ def encode_image(image_path: Path, *, max_dimension: int = 1024) -> tuple[str, s
 
     if file_size > _ENCODE_SIZE_THRESHOLD:
         with Image.open(image_path) as raw:
-            img = ImageOps.exif_transpose(raw)
-        img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-        if img.mode == "RGBA":
-            background = Image.new("RGB", img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[3])
-            img = background
-        elif img.mode not in ("RGB", "L"):
-            img = img.convert("RGB")
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=85, optimize=True)
-        payload = base64.b64encode(buf.getvalue()).decode("ascii")
-        return "image/jpeg", f"data:image/jpeg;base64,{payload}"
+            # Let JPEGs decode at a reduced DCT scale before the transpose
+            # forces a full-size load, keeping 2x headroom for the resample
+            # as ``Image.thumbnail`` itself does.
+            raw.draft(raw.mode, (max_dimension * 2, max_dimension * 2))
+            # ``exif_transpose`` copies even upright images, so skip it unless
+            # the orientation tag asks for a rotation.
+            if raw.getexif().get(_EXIF_ORIENTATION, 1) == 1:
+                img = raw
+            else:
+                img = ImageOps.exif_transpose(raw)
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            if img.mode == "RGBA":
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[3])
+                img = background
+            elif img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=85, optimize=True)
+        buf.seek(0)
+        return "image/jpeg", _data_url("image/jpeg", buf)
 
     with image_path.open("rb") as fh:
-        payload = base64.b64encode(fh.read()).decode("ascii")
-    return mime, f"data:{mime};base64,{payload}"
+        return mime, _data_url(mime, fh)
+
+
+def _data_url(mime: str, stream: BinaryIO) -> str:
+    """Return a base64 ``data:`` URL for the remaining bytes of ``stream``.
+
+    Reads are a multiple of three bytes, so each chunk encodes without padding
+    and the pieces concatenate into one valid payload. Only the ASCII buffer
+    and the final ``str`` are held, not the raw bytes and intermediate copies.
+    """
+    out = bytearray(f"data:{mime};base64,".encode("ascii"))
+    for chunk in iter(lambda: stream.read(_B64_READ_SIZE), b""):
+        out += base64.b64encode(chunk)
+    return out.decode("ascii")
 
 
 def _extract_usage(usage: Any | None) -> tuple[int | None, int | None, int | None]:
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import contextlib
+import hashlib
 import os
 import shutil
 import subprocess
@@ -96,8 +98,35 @@ def select_installer(env: EnvironmentInfo) -> tuple[str, Sequence[str]]:
     if pip_sync:
         return "pip-tools", (pip_sync,)
 
-    # Fallback to the environment's python -m pip install
-    return "pip", (env.python, "-m", "pip", "install")
+    # Fallback to the environment's python -m pip install. Skipping pip's
+    # self-update check saves a network round trip on every run, and
+    # --no-input fails fast instead of hanging on a credentials prompt.
+    return "pip", (
+        env.python,
+        "-m",
+        "pip",
+        "install",
+        "--no-input",
+        "--disable-pip-version-check",
+    )
+
+
+REQUIREMENTS_STAMP = ".requirements.sha256"
+
+
+def requirements_digest(requirements: Iterable[str]) -> str:
+    """Return a digest covering the names and contents of ``requirements``."""
+    digest = hashlib.sha256()
+    for req in requirements:
+        digest.update(Path(req).name.encode("utf-8") + b"\0")
+        digest.update(Path(req).read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+def _write_stamp(path: Path, value: str) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(value, encoding="utf-8")
+    tmp_path.replace(path)
 
 
 def install_dependencies(env: EnvironmentInfo, requirements: Iterable[str]) -> None:
@@ -106,6 +135,17 @@ def install_dependencies(env: EnvironmentInfo, requirements: Iterable[str]) -> N
         print("No requirements files found; skipping dependency installation.")
         return
 
+    # Skip re-resolving the dependency set when the requirement files match
+    # what was last installed into this environment.
+    stamp = Path(env.prefix) / REQUIREMENTS_STAMP
+    digest = requirements_digest(reqs)
+    try:
+        if stamp.read_text(encoding="utf-8").strip() == digest:
+            print("Dependencies are up to date; skipping installation.")
+            return
+    except OSError:
+        pass
+
     installer_name, base_cmd = select_installer(env)
     if installer_name == "pip":
         cmd: list[str] = list(base_cmd)
@@ -116,6 +156,8 @@ def install_dependencies(env: EnvironmentInfo, requirements: Iterable[str]) -> N
 
     print(f"Installing dependencies using {installer_name}...")
     subprocess.check_call(cmd)
+    with contextlib.suppress(OSError):
+        _write_stamp(stamp, digest)
 
 
 def main(tag_new: bool = False):
@@ -130,10 +172,14 @@ def main(tag_new: bool = False):
     install_dependencies(env, requirements)
 
     print("Launching chatgpt_library_archiver inside the virtual environment...")
-    cmd = [env.python, "-m", "chatgpt_library_archiver"]
-    if tag_new:
-        cmd.append("--tag-new")
-    sys.exit(subprocess.call(cmd))
+    argv = ["--tag-new"] if tag_new else []
+    if env.is_active:
+        # Already running on the environment's interpreter; re-enter the CLI
+        # in-process instead of paying for a second interpreter start-up.
+        from .__main__ import main as cli_main
+
+        sys.exit(cli_main(argv))
+    sys.exit(subprocess.call([env.python, "-m", "chatgpt_library_archiver", *argv]))
 
 
 if __name__ == "__main__":
@@ -6,6 +6,8 @@
 from collections.abc import Callable
 from dataclasses import dataclass
 
+from .options import add_tag_new_argument
+
 
 @dataclass
 class BootstrapCommand:
@@ -21,9 +23,7 @@ def register(self, subparsers: _SubParsersAction[ArgumentParser]) -> ArgumentPar
                 "and run the downloader"
             ),
         )
-        parser.add_argument(
-            "--tag-new", action="store_true", help="Tag newly downloaded images"
-        )
+        add_tag_new_argument(parser)
         parser.set_defaults(command_handler=self.handle, command="bootstrap")
         return parser
 
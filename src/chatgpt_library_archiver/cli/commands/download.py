@@ -6,6 +6,8 @@
 from collections.abc import Callable
 from dataclasses import dataclass
 
+from .options import add_tag_new_argument, add_webp_thumbnails_argument
+
 
 @dataclass
 class DownloadCommand:
@@ -18,9 +20,7 @@ def register(self, subparsers: _SubParsersAction[ArgumentParser]) -> ArgumentPar
             "download",
             help="Download new images and regenerate the gallery (default)",
         )
-        parser.add_argument(
-            "--tag-new", action="store_true", help="Tag newly downloaded images"
-        )
+        add_tag_new_argument(parser)
         parser.add_argument(
             "--browser",
             choices=["edge", "chrome"],
@@ -34,11 +34,7 @@ def register(self, subparsers: _SubParsersAction[ArgumentParser]) -> ArgumentPar
             default=6,
             help="Maximum number of concurrent download threads (default: 6)",
         )
-        parser.add_argument(
-            "--webp-thumbnails",
-            action="store_true",
-            help="Generate thumbnails in WebP format for smaller file sizes",
-        )
+        add_webp_thumbnails_argument(parser)
         parser.set_defaults(command_handler=self.handle, command="download")
         return parser
 
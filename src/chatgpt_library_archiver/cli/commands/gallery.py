@@ -6,6 +6,8 @@
 from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 
+from .options import add_webp_thumbnails_argument
+
 
 @dataclass
 class GalleryCommand:
@@ -30,11 +32,7 @@ def register(self, subparsers: _SubParsersAction[ArgumentParser]) -> ArgumentPar
             action="store_true",
             help="Overwrite thumbnails when regenerating",
         )
-        parser.add_argument(
-            "--webp-thumbnails",
-            action="store_true",
-            help="Generate thumbnails in WebP format for smaller file sizes",
-        )
+        add_webp_thumbnails_argument(parser)
         parser.set_defaults(command_handler=self.handle, command="gallery")
         return parser
 
@@ -5,9 +5,12 @@
 from argparse import ArgumentParser, Namespace, _SubParsersAction
 from collections.abc import Callable, Iterable
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from ...importer import ImportConfig
-from ...metadata import GalleryItem
+from .options import add_webp_thumbnails_argument
+
+if TYPE_CHECKING:
+    from ...metadata import GalleryItem
 
 
 @dataclass
@@ -78,6 +81,12 @@ def register(self, subparsers: _SubParsersAction[ArgumentParser]) -> ArgumentPar
             default=4,
             help="Worker count when tagging imports",
         )
+        parser.add_argument(
+            "--import-workers",
+            type=int,
+            default=4,
+            help="Number of images to import concurrently",
+        )
         parser.add_argument(
             "--no-config-prompt",
             action="store_true",
@@ -93,11 +102,7 @@ def register(self, subparsers: _SubParsersAction[ArgumentParser]) -> ArgumentPar
             action="store_true",
             help="Overwrite thumbnails when regenerating",
         )
-        parser.add_argument(
-            "--webp-thumbnails",
-            action="store_true",
-            help="Generate thumbnails in WebP format for smaller file sizes",
-        )
+        add_webp_thumbnails_argument(parser)
         parser.set_defaults(command_handler=self.handle, command="import")
         return parser
 
@@ -122,6 +127,8 @@ def handle(self, args: Namespace) -> int | None:
             self.printer("No inputs supplied for import.")
             return None
 
+        from ...importer import ImportConfig
+
         try:
             config = ImportConfig(
                 gallery_root=gallery_root,
@@ -140,6 +147,7 @@ def handle(self, args: Namespace) -> int | None:
                 tag_prompt=getattr(args, "tag_prompt", None),
                 tag_model=getattr(args, "tag_model", None),
                 tag_workers=int(getattr(args, "tag_workers", 4)),
+                import_workers=int(getattr(args, "import_workers", 4)),
                 allow_interactive=not bool(getattr(args, "no_config_prompt", False)),
             )
             imported = list(
@@ -0,0 +1,30 @@
+"""Arguments shared by several subcommands."""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser, BooleanOptionalAction
+
+from ...utils import webp_thumbnails_requested
+
+
+def add_tag_new_argument(parser: ArgumentParser) -> None:
+    """Add the ``--tag-new`` flag used by ``bootstrap`` and ``download``."""
+
+    parser.add_argument(
+        "--tag-new", action="store_true", help="Tag newly downloaded images"
+    )
+
+
+def add_webp_thumbnails_argument(parser: ArgumentParser) -> None:
+    """Add the ``--webp-thumbnails`` flag used by commands that write thumbnails.
+
+    ``ARCHIVER_WEBP_THUMBNAILS`` turns it on by default, and
+    ``--no-webp-thumbnails`` turns it back off for a single run.
+    """
+
+    parser.add_argument(
+        "--webp-thumbnails",
+        action=BooleanOptionalAction,
+        default=webp_thumbnails_requested(),
+        help="Generate thumbnails in WebP format for smaller file sizes",
+    )
@@ -1,23 +1,48 @@
 from __future__ import annotations
 
+import contextlib
 import json
+import re
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from importlib import resources
+from operator import attrgetter
 from pathlib import Path
-
-from .metadata import (
-    GalleryItem,
-    created_at_sort_key,
-    load_gallery_items,
-    save_gallery_items,
+from typing import Any, BinaryIO
+
+from .metadata import GalleryItem, load_gallery_items, save_gallery_records
+from .utils import file_matches, optional_module, pretty_output_requested
+
+# See ``metadata._orjson``: the ``fast`` extra also serializes the page payload.
+_orjson = optional_module("orjson")
+
+# orjson writes non-ASCII as raw UTF-8, so U+2028/U+2029 (line terminators in
+# pre-ES2019 script) are escaped alongside the HTML-sensitive characters.
+_HTML_JSON_ESCAPES = (
+    (b"<", b"\\u003c"),
+    (b">", b"\\u003e"),
+    (b"&", b"\\u0026"),
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
 )
 
+_DATA_SCRIPT_PREFIX = b"<script>var GALLERY_DATA = "
+_DATA_SCRIPT_SUFFIX = b";</script>\n"
+
+# Lets the template head, data prefix/suffix and tail share write calls.
+_WRITE_BUFFER_SIZE = 1 << 20
 
-def _created_at_key(item: GalleryItem) -> float:
-    return created_at_sort_key(item.created_at)
+_STYLE_BLOCK = re.compile(r"(<style>)(.*?)(</style>)", re.DOTALL)
+_SCRIPT_BLOCK = re.compile(r"(<script>)(.*?)(</script>)", re.DOTALL)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_WHITESPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_LEADING_INDENT = re.compile(r"^[ \t]+", re.MULTILINE)
 
 
-def _safe_json_for_html(items: list[GalleryItem]) -> str:
-    """Serialize gallery items to JSON escaped for safe ``<script>`` embedding.
+def _safe_json_for_html(records: Sequence[Mapping[str, Any]]) -> str:
+    """Serialize item records to JSON escaped for safe ``<script>`` embedding.
 
     After ``json.dumps`` the output is post-processed to replace ``<``, ``>``,
     and ``&`` with their Unicode escape sequences so that sequences like
@@ -25,22 +50,134 @@ def _safe_json_for_html(items: list[GalleryItem]) -> str:
     This follows the same approach used by Django's ``json_script`` filter.
     """
     raw = json.dumps(
-        [item.to_dict() for item in items],
+        records,
         ensure_ascii=True,
         separators=(",", ":"),
     )
+    # Chained replace() beats str.translate here: the payload is pure ASCII, so
+    # each pass is a fast memchr-style scan, while translate falls back to a
+    # per-character slow path as soon as a mapping expands to several chars.
     return raw.replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026")
 
 
-def generate_gallery(gallery_root: str = "gallery") -> int:
+def _html_json_payload(records: Sequence[Mapping[str, Any]]) -> bytes:
+    """Return ``records`` as script-safe JSON bytes for ``GALLERY_DATA``.
+
+    Uses ``orjson`` when installed, escaping the same characters as
+    :func:`_safe_json_for_html`; otherwise that function's ASCII output.
+    """
+    if _orjson is None:
+        return _safe_json_for_html(records).encode("ascii")
+    payload: bytes = _orjson.dumps(records)
+    for raw, escaped in _HTML_JSON_ESCAPES:
+        payload = payload.replace(raw, escaped)
+    return payload
+
+
+def _minify_css(css: str) -> str:
+    """Drop comments and whitespace that carries no meaning in the stylesheet."""
+    css = _CSS_WHITESPACE.sub(" ", _CSS_COMMENT.sub("", css))
+    css = _CSS_PUNCTUATION.sub(r"\1", css).replace(": ", ":")
+    return css.replace(";}", "}").strip()
+
+
+def _minify_js(js: str) -> str:
+    """Drop indentation, blank lines and whole-line comments from the script.
+
+    Line breaks are kept so automatic semicolon insertion and any trailing
+    ``//`` comments behave exactly as in the source.
+    """
+    lines: list[str] = []
+    for line in js.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        if stripped.startswith("/*") and stripped.endswith("*/"):
+            continue
+        lines.append(stripped)
+    return "\n" + "\n".join(lines) + "\n"
+
+
+def _minify_template(template: str) -> str:
+    """Return a compact but equivalent copy of the viewer template."""
+    template = _STYLE_BLOCK.sub(
+        lambda m: m.group(1) + _minify_css(m.group(2)) + m.group(3), template
+    )
+    template = _SCRIPT_BLOCK.sub(
+        lambda m: m.group(1) + _minify_js(m.group(2)) + m.group(3), template
+    )
+    return _LEADING_INDENT.sub("", template)
+
+
+@cache
+def _template_parts() -> tuple[bytes, bytes]:
+    """Return the packaged viewer template split around ``</head>``.
+
+    The template is static for the lifetime of the process, so it is read,
+    minified, split and encoded to UTF-8 once; ``GALLERY_DATA`` is injected
+    between the two halves. Set ``ARCHIVER_PRETTY=1`` to emit the template as
+    authored.
+    """
+    template = resources.read_text(
+        "chatgpt_library_archiver", "gallery_index.html", encoding="utf-8"
+    )
+    if not pretty_output_requested():
+        template = _minify_template(template)
+    head, sep, tail = template.partition("</head>")
+    return head.encode("utf-8"), (sep + tail).encode("utf-8")
+
+
+def _page_parts(head: bytes, tail: bytes, payload: bytes) -> tuple[bytes, ...]:
+    """Return the pieces of ``index.html`` with the data script between halves."""
+    return (head, _DATA_SCRIPT_PREFIX, payload, _DATA_SCRIPT_SUFFIX, tail)
+
+
+def _write_index(fp: BinaryIO, head: bytes, tail: bytes, payload: bytes) -> None:
+    """Stream the page to ``fp`` with the data script between ``head`` and ``tail``.
+
+    Writing the already-encoded pieces to a binary handle avoids materialising
+    a full copy of the page and skips the text layer's per-write encoding.
+    """
+    fp.writelines(_page_parts(head, tail, payload))
+
+
+def _save_page(index_path: Path, records: Sequence[Mapping[str, Any]]) -> None:
+    """Write the gallery page embedding ``records`` to ``index_path``."""
+
+    head, tail = _template_parts()
+    payload = _html_json_payload(records)
+    # Re-running the generator on an unchanged gallery leaves the page (and its
+    # mtime, which browsers and sync tools key on) alone.
+    if not file_matches(index_path, _page_parts(head, tail, payload)):
+        # Write beside the page and rename over it so a crash or an open
+        # browser tab never observes a half-written index.html.
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        try:
+            with tmp_path.open("wb", buffering=_WRITE_BUFFER_SIZE) as fp:
+                _write_index(fp, head, tail, payload)
+            tmp_path.replace(index_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+            raise
+
+
+def generate_gallery(
+    gallery_root: str = "gallery", items: list[GalleryItem] | None = None
+) -> int:
     """Write ``metadata.json`` and embed metadata into ``index.html``.
 
     ``metadata.json`` is still written for CLI tools that read it directly.
     The gallery viewer reads from a ``GALLERY_DATA`` variable injected into
     the HTML ``<head>`` so no runtime ``fetch()`` is required.
+
+    Callers that already hold the current gallery ``items`` in memory (e.g.
+    at the end of a download run) can pass them to skip re-reading
+    ``metadata.json``; the list is sorted in place.
     """
     Path(gallery_root).mkdir(parents=True, exist_ok=True)
-    items = load_gallery_items(gallery_root)
+    if items is None:
+        items = load_gallery_items(gallery_root)
     if not items:
         return 0
 
@@ -48,19 +185,17 @@ def generate_gallery(gallery_root: str = "gallery") -> int:
         if item.created_at is None:
             item.created_at = 0.0
 
-    items.sort(
-        key=lambda item: (_created_at_key(item), item.id),
-        reverse=True,
-    )
-    save_gallery_items(gallery_root, items)
-
-    template = resources.read_text(
-        "chatgpt_library_archiver", "gallery_index.html", encoding="utf-8"
-    )
-    escaped_json = _safe_json_for_html(items)
-    data_script = f"<script>var GALLERY_DATA = {escaped_json};</script>"
-    html = template.replace("</head>", f"{data_script}\n</head>", 1)
-    (Path(gallery_root) / "index.html").write_text(html, encoding="utf-8")
+    # ``created_at`` is already normalized to a float by ``GalleryItem.from_dict``
+    # and backfilled above, so a C-level attrgetter can serve as the sort key.
+    items.sort(key=attrgetter("created_at", "id"), reverse=True)
+    # Both outputs serialize the same per-item dicts, so build them once.
+    records = [item.to_dict() for item in items]
+    # metadata.json and index.html are independent files; write the former on
+    # a worker thread so its compare-and-write I/O overlaps building the page.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        metadata_saved = pool.submit(save_gallery_records, gallery_root, records)
+        _save_page(Path(gallery_root) / "index.html", records)
+        metadata_saved.result()
 
     return len(items)
 
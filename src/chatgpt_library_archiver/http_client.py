@@ -3,18 +3,32 @@
 from __future__ import annotations
 
 import hashlib
+import os
+import re
 import threading
+import time
 from collections.abc import Callable, Iterable, Mapping, MutableSet
 from dataclasses import dataclass
 from pathlib import Path
 from typing import cast
 from urllib.parse import urlparse
 
-from requests import PreparedRequest, Response, Session
+from requests import PreparedRequest, RequestException, Response, Session
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 HTTP_ERROR_STATUS = 400
+HTTP_PARTIAL_CONTENT = 206
+HTTP_RANGE_NOT_SATISFIABLE = 416
+# Coalesces the 64 KiB network chunks into ~1 MiB writes to the destination.
+_WRITE_BUFFER_SIZE = 1 << 20
+_HAS_FALLOCATE = hasattr(os, "posix_fallocate")
+# Start spacing out JSON requests once the server reports fewer than this
+# many requests left in the current rate-limit window.
+RATE_LIMIT_LOW_WATER = 5
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-\d+/(?:\d+|\*)", re.IGNORECASE)
 
 
 class HttpError(RuntimeError):
@@ -113,6 +127,101 @@ def _default_retry(
     )
 
 
+def _parse_duration(value: str) -> float:
+    """Return seconds for ``"1.5"`` or Go-style durations such as ``"6m0s"``."""
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return sum(
+        float(amount) * _DURATION_SECONDS[unit]
+        for amount, unit in _DURATION_PART.findall(value)
+    )
+
+
+def _rate_limit_delay(headers: Mapping[str, str]) -> float:
+    """Return how long to wait before the next request, per rate-limit headers.
+
+    Only applies back-pressure when the remaining budget is nearly spent;
+    429 responses are already retried (honouring ``Retry-After``) by the
+    urllib3 ``Retry`` policy mounted on each session.
+    """
+
+    remaining = headers.get("x-ratelimit-remaining-requests")
+    if remaining is None:
+        return 0.0
+    try:
+        remaining_count = int(remaining)
+    except ValueError:
+        return 0.0
+    if remaining_count >= RATE_LIMIT_LOW_WATER:
+        return 0.0
+    reset = _parse_duration(headers.get("x-ratelimit-reset-requests", "0"))
+    return reset / max(1, remaining_count)
+
+
+def _preallocate(
+    fileno: int, headers: Mapping[str, str], max_bytes: int | None
+) -> int | None:
+    """Reserve disk space for the declared body size; return what was reserved.
+
+    Large images then land in as few extents as possible. Encoded bodies are
+    skipped because ``Content-Length`` counts the compressed bytes, and
+    filesystems without ``fallocate`` support just grow the file as written.
+    """
+
+    if not _HAS_FALLOCATE or headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    try:
+        length = int(headers.get("Content-Length", ""))
+    except ValueError:
+        return None
+    if length <= 0 or (max_bytes is not None and length > max_bytes):
+        return None
+    try:
+        os.posix_fallocate(fileno, 0, length)
+    except OSError:
+        return None
+    return length
+
+
+def _validator_path(destination: Path) -> Path:
+    """Return the sidecar file holding the ``If-Range`` validator of a partial."""
+
+    return destination.with_name(f"{destination.name}.validator")
+
+
+def _resume_validator(headers: Mapping[str, str]) -> str | None:
+    """Return the validator to send as ``If-Range`` when resuming a response.
+
+    ``If-Range`` only accepts strong entity tags, so a weak ``ETag`` falls back
+    to ``Last-Modified``.
+    """
+
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _save_validator(destination: Path, headers: Mapping[str, str]) -> None:
+    """Keep the ``If-Range`` validator for the partial ``destination``."""
+
+    validator = _resume_validator(headers)
+    if validator:
+        _validator_path(destination).write_text(validator)
+    else:
+        _validator_path(destination).unlink(missing_ok=True)
+
+
+def _content_range_start(headers: Mapping[str, str]) -> int | None:
+    """Return the first byte position of a ``Content-Range`` header, if valid."""
+
+    match = _CONTENT_RANGE.fullmatch(headers.get("Content-Range", "").strip())
+    return int(match.group(1)) if match else None
+
+
 class HttpClient:
     """Reusable HTTP client with retries and streaming helpers."""
 
@@ -136,6 +245,7 @@ def __init__(
         self._sessions: MutableSet[Session] = set()
         self._lock = threading.Lock()
         self._local = threading.local()
+        self._next_json_request = 0.0
 
     def _create_session(self) -> Session:
         session = self._session_factory()
@@ -178,11 +288,19 @@ def get_json(
         """Fetch ``url`` and return the parsed JSON body.
 
         Raises :class:`HttpError` if the response is not JSON or the
-        status code indicates an error.
+        status code indicates an error. Waits first if the previous JSON
+        response reported the rate-limit budget as nearly exhausted.
         """
 
+        with self._lock:
+            wait = self._next_json_request - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
         response = self._get_session().get(url, headers=headers, timeout=self.timeout)
         try:
+            delay = _rate_limit_delay(response.headers)
+            with self._lock:
+                self._next_json_request = time.monotonic() + delay
             content_type = response.headers.get("Content-Type", "")
             if response.status_code >= HTTP_ERROR_STATUS:
                 raise HttpError(
@@ -237,6 +355,129 @@ def get_json(
         finally:
             response.close()
 
+    def _open_download(
+        self,
+        url: str,
+        destination: Path,
+        headers: Mapping[str, str] | None,
+        *,
+        resume: bool,
+    ) -> tuple[Response, int]:
+        """Start a streaming GET, resuming from a partial ``destination``.
+
+        Returns the response and the byte offset it continues from, which is
+        ``0`` unless the server answered a ``Range`` request with 206 content
+        starting at that offset. The validator saved with the partial file is
+        sent as ``If-Range`` so a changed image is served whole instead.
+        """
+
+        session = self._get_session()
+        offset = destination.stat().st_size if resume and destination.exists() else 0
+        if not offset:
+            _validator_path(destination).unlink(missing_ok=True)
+            response = session.get(
+                url, headers=headers, timeout=self.timeout, stream=True
+            )
+            return response, 0
+
+        ranged = {**(headers or {}), "Range": f"bytes={offset}-"}
+        try:
+            validator = _validator_path(destination).read_text().strip()
+        except OSError:
+            validator = ""
+        if validator:
+            ranged["If-Range"] = validator
+        response = session.get(url, headers=ranged, timeout=self.timeout, stream=True)
+        if response.status_code == HTTP_PARTIAL_CONTENT and (
+            _content_range_start(response.headers) == offset
+        ):
+            return response, offset
+        if response.status_code in {HTTP_PARTIAL_CONTENT, HTTP_RANGE_NOT_SATISFIABLE}:
+            # The partial file is unusable (e.g. the image changed) or the
+            # server sent some other range; restart from the first byte.
+            response.close()
+            response = session.get(
+                url, headers=headers, timeout=self.timeout, stream=True
+            )
+        return response, 0
+
+    def _write_body(
+        self,
+        response: Response,
+        destination: Path,
+        *,
+        url: str,
+        offset: int,
+        chunk_size: int,
+        max_bytes: int | None,
+        resume: bool,
+    ) -> tuple[int, str]:
+        """Stream ``response`` into ``destination`` after its first ``offset`` bytes.
+
+        Returns the total file size and its SHA-256 hex digest.
+        """
+
+        content_type = response.headers.get("Content-Type")
+        hasher = hashlib.sha256()
+        if offset:
+            with destination.open("rb") as existing:
+                for block in iter(lambda: existing.read(_WRITE_BUFFER_SIZE), b""):
+                    hasher.update(block)
+        bytes_downloaded = offset
+        if resume and not offset:
+            # Record the validator before streaming so a partial file left by
+            # any kind of interruption is resumed with ``If-Range``. A 206
+            # reply matched the validator already on disk.
+            _save_validator(destination, response.headers)
+        try:
+            with destination.open(
+                "ab" if offset else "wb", buffering=_WRITE_BUFFER_SIZE
+            ) as fh:
+                preallocated = (
+                    None
+                    if offset
+                    else _preallocate(fh.fileno(), response.headers, max_bytes)
+                )
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if not chunk:
+                        continue
+                    fh.write(chunk)
+                    hasher.update(chunk)
+                    bytes_downloaded += len(chunk)
+                    if max_bytes is not None and bytes_downloaded > max_bytes:
+                        raise HttpError(
+                            url=url,
+                            status_code=response.status_code,
+                            reason="Download exceeds size limit",
+                            details={
+                                "content_type": content_type,
+                                "max_bytes": max_bytes,
+                                "bytes_downloaded": bytes_downloaded,
+                            },
+                            response=response,
+                        )
+                if preallocated is not None and bytes_downloaded != preallocated:
+                    fh.truncate()
+        except BaseException as exc:
+            # Network errors and interruptions such as Ctrl-C leave a partial
+            # file worth resuming; anything else means the body was bad.
+            interrupted = isinstance(exc, RequestException) or not isinstance(
+                exc, Exception
+            )
+            if resume and interrupted:
+                # Drop any preallocated tail so the size marks the resume point.
+                os.truncate(destination, bytes_downloaded)
+            else:
+                destination.unlink(missing_ok=True)
+                _validator_path(destination).unlink(missing_ok=True)
+            raise
+        finally:
+            response.close()
+        if resume:
+            _validator_path(destination).unlink(missing_ok=True)
+
+        return bytes_downloaded, hasher.hexdigest()
+
     def stream_download(
         self,
         url: str,
@@ -248,6 +489,7 @@ def stream_download(
         expected_content_prefixes: Iterable[str] | None = None,
         expected_checksum: str | None = None,
         max_bytes: int | None = None,
+        resume: bool = False,
     ) -> DownloadResult:
         """Download ``url`` to ``destination`` streaming the payload.
 
@@ -255,10 +497,16 @@ def stream_download(
         provided, the ``Content-Type`` header must begin with one of the
         prefixes. When ``expected_checksum`` is supplied, the SHA-256 digest of
         the downloaded content must match it.
+
+        With ``resume`` an existing ``destination`` is treated as a partial
+        download and continued with a ``Range`` request, and a transfer cut
+        short by a network error or an interruption such as Ctrl-C keeps what
+        was received for the next attempt. The response's ``ETag`` or
+        ``Last-Modified`` is kept beside the partial file in
+        ``<destination>.validator`` and removed once the download ends.
         """
 
-        session = self._get_session()
-        response = session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        response, offset = self._open_download(url, destination, headers, resume=resume)
         content_type = response.headers.get("Content-Type")
         if response.status_code >= HTTP_ERROR_STATUS:
             response.close()
@@ -287,34 +535,15 @@ def stream_download(
 
         destination.parent.mkdir(parents=True, exist_ok=True)
 
-        hasher = hashlib.sha256()
-        bytes_downloaded = 0
-        try:
-            with destination.open("wb") as fh:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if not chunk:
-                        continue
-                    fh.write(chunk)
-                    hasher.update(chunk)
-                    bytes_downloaded += len(chunk)
-                    if max_bytes is not None and bytes_downloaded > max_bytes:
-                        raise HttpError(
-                            url=url,
-                            status_code=response.status_code,
-                            reason="Download exceeds size limit",
-                            details={
-                                "content_type": content_type,
-                                "max_bytes": max_bytes,
-                                "bytes_downloaded": bytes_downloaded,
-                            },
-                            response=response,
-                        )
-        except Exception:
-            destination.unlink(missing_ok=True)
-            response.close()
-            raise
-        finally:
-            response.close()
+        bytes_downloaded, checksum = self._write_body(
+            response,
+            destination,
+            url=url,
+            offset=offset,
+            chunk_size=chunk_size,
+            max_bytes=max_bytes,
+            resume=resume,
+        )
 
         if bytes_downloaded == 0 and not allow_empty:
             destination.unlink(missing_ok=True)
@@ -326,7 +555,6 @@ def stream_download(
                 response=response,
             )
 
-        checksum = hasher.hexdigest()
         if expected_checksum and checksum != expected_checksum:
             destination.unlink(missing_ok=True)
             raise HttpError(
@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import mimetypes
+import os
 import re
 import shutil
+import threading
+import time
 import unicodedata
 import uuid
 from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
 from pathlib import Path
 
 from openai import OpenAI
@@ -25,16 +28,21 @@
 from .status import StatusReporter
 from .utils import prompt_yes_no
 
-IMAGE_EXTENSIONS = {
-    ".jpg",
-    ".jpeg",
-    ".png",
-    ".gif",
-    ".webp",
-    ".bmp",
-    ".tiff",
-    ".tif",
-}
+IMAGE_EXTENSIONS = frozenset(
+    {
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".gif",
+        ".webp",
+        ".bmp",
+        ".tiff",
+        ".tif",
+    }
+)
+
+_SLUG_SEPARATORS = re.compile(r"[^a-z0-9]+")
+_COPY_RANGE_SIZE = 1 << 30
 
 DEFAULT_RENAME_PROMPT = (
     "Create a short, descriptive filename slug (kebab-case, <=6 words) for this image."
@@ -59,6 +67,7 @@ class ImportConfig:
     tag_prompt: str | None = None
     tag_model: str | None = None
     tag_workers: int = 4
+    import_workers: int = 4
     allow_interactive: bool | None = None
     telemetry_sink: Callable[[AIRequestTelemetry], None] | None = None
 
@@ -97,36 +106,115 @@ class _ImportContext:
     images_dir: Path
     existing_files: set[str]
     ai_ctx: _AIContext | None
+    # Next free numeric suffix per ``(slug, ext)``; see ``_unique_filename``.
+    name_counters: dict[tuple[str, str], int] = field(default_factory=dict)
+    # Guards ``existing_files`` while images are imported concurrently.
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
 
+def _is_image_name(name: str) -> bool:
+    """Return whether ``name`` looks like an image, checking known suffixes first.
 
-def _is_image_file(path: Path) -> bool:
-    if not path.is_file():
-        return False
-    ext = path.suffix.lower()
+    ``mimetypes`` is only consulted for suffixes outside ``IMAGE_EXTENSIONS``.
+    """
+    ext = os.path.splitext(name)[1].lower()
     if ext in IMAGE_EXTENSIONS:
         return True
-    mime, _ = mimetypes.guess_type(path)
+    mime, _ = mimetypes.guess_type(name)
     return bool(mime and mime.startswith("image/"))
 
 
 def _slugify(text: str, fallback: str = "image") -> str:
-    normalized = unicodedata.normalize("NFKD", text)
-    ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
-    ascii_text = ascii_text.lower()
-    ascii_text = re.sub(r"[^a-z0-9]+", "-", ascii_text).strip("-")
-    return ascii_text or fallback
-
+    if not text.isascii():
+        # NFKD leaves ASCII untouched, so only fold text that needs it.
+        normalized = unicodedata.normalize("NFKD", text)
+        text = normalized.encode("ascii", "ignore").decode("ascii")
+    slug = _SLUG_SEPARATORS.sub("-", text.lower()).strip("-")
+    return slug or fallback
+
+
+def _unique_filename(
+    base: str,
+    ext: str,
+    existing: set[str],
+    counters: dict[tuple[str, str], int] | None = None,
+) -> str:
+    """Return a name based on ``base`` + ``ext`` that is not in ``existing``.
+
+    ``existing`` only grows, so when ``counters`` is given it remembers the
+    next suffix to try per ``(base, ext)`` and repeated collisions on the same
+    slug resume there instead of re-probing every taken name.
+    """
 
-def _unique_filename(base: str, ext: str, existing: set[str]) -> str:
-    candidate = f"{base}{ext}"
-    counter = 2
+    counter = counters.get((base, ext)) if counters is not None else None
+    if counter is None:
+        candidate = f"{base}{ext}"
+        counter = 2
+    else:
+        candidate = f"{base}-{counter}{ext}"
+        counter += 1
     while candidate in existing:
         candidate = f"{base}-{counter}{ext}"
         counter += 1
     existing.add(candidate)
+    if counters is not None:
+        counters[(base, ext)] = counter
     return candidate
 
 
+def _copy_file(source: Path, dest: Path) -> None:
+    """Copy ``source`` to ``dest`` like :func:`shutil.copy2`.
+
+    Where the platform offers ``os.copy_file_range`` the data never passes
+    through userspace, and copy-on-write filesystems can share the blocks
+    outright.  Any failure falls back to :func:`shutil.copy2`.
+    """
+
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is None:
+        shutil.copy2(source, dest)
+        return
+    try:
+        with source.open("rb") as src, dest.open("wb") as dst:
+            while copy_range(src.fileno(), dst.fileno(), _COPY_RANGE_SIZE):
+                pass
+    except OSError:
+        shutil.copy2(source, dest)
+        return
+    shutil.copystat(source, dest)
+
+
+def _existing_names(directory: Path) -> set[str]:
+    """Return every entry name in ``directory`` using a single ``scandir`` pass."""
+    with os.scandir(directory) as entries:
+        return {entry.name for entry in entries}
+
+
+def _walk_image_files(root: Path) -> list[Path]:
+    """Return the image files beneath ``root`` in sorted order.
+
+    Entries are filtered by name before a ``Path`` is built, and the cached
+    directory-entry type spares a ``stat`` per file. Like ``Path.rglob``,
+    symlinked directories are not descended into and unreadable directories
+    are skipped.
+    """
+    found: list[Path] = []
+    pending = [os.fspath(root)]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except PermissionError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif _is_image_name(entry.name) and entry.is_file():
+                    found.append(Path(entry.path))
+    found.sort()
+    return found
+
+
 def _collect_inputs(
     inputs: Sequence[str], recursive: bool
 ) -> tuple[list[ImportItem], list[Path]]:
@@ -137,16 +225,17 @@ def _collect_inputs(
         if not path.exists():
             raise FileNotFoundError(f"Input path not found: {path}")
         if path.is_file():
-            items.append(ImportItem(source=path))
+            # Every direct file counts towards --conversation-link pairing,
+            # but only images are scheduled for import.
             original_files.append(path)
+            if _is_image_name(path.name):
+                items.append(ImportItem(source=path))
             continue
         if not recursive:
             raise ValueError(
                 f"Directory '{path}' provided but --recursive flag not set."
             )
-        for child in sorted(path.rglob("*")):
-            if _is_image_file(child):
-                items.append(ImportItem(source=child))
+        items.extend(ImportItem(source=child) for child in _walk_image_files(path))
     return items, original_files
 
 
@@ -220,12 +309,18 @@ def _import_one_image(
     *,
     ctx: _ImportContext,
     reporter: StatusReporter,
-) -> GalleryItem:
-    """Import a single image file and return the created gallery item."""
+) -> tuple[GalleryItem, AIRequestTelemetry | None]:
+    """Import a single image file.
+
+    Returns the created gallery item and the AI rename telemetry, if any. The
+    telemetry is handed back rather than sent to ``telemetry_sink`` here so
+    the sink is only ever called from the thread running the import.
+    """
     source_path = item.source
     reporter.log_status("Importing", source_path.name)
 
     slug: str | None = None
+    telemetry: AIRequestTelemetry | None = None
     if ctx.ai_ctx is not None:
         try:
             slug, telemetry = _generate_ai_slug(
@@ -235,8 +330,6 @@ def _import_one_image(
                 source_path,
                 reporter=reporter,
             )
-            if ctx.config.telemetry_sink is not None:
-                ctx.config.telemetry_sink(telemetry)
             if telemetry.total_tokens is not None:
                 reporter.log_status(
                     "AI rename",
@@ -259,23 +352,24 @@ def _import_one_image(
         slug = _slugify(source_path.stem)
 
     ext = source_path.suffix.lower() or ".jpg"
-    filename = _unique_filename(slug, ext, ctx.existing_files)
+    with ctx.lock:
+        filename = _unique_filename(slug, ext, ctx.existing_files, ctx.name_counters)
     dest = ctx.images_dir / filename
 
     dest.parent.mkdir(parents=True, exist_ok=True)
     if dest.is_symlink():
         raise ValueError(f"Refusing to overwrite symlink at {dest}")
     if ctx.config.copy_files:
-        shutil.copy2(source_path, dest)
+        _copy_file(source_path, dest)
     else:
         shutil.move(source_path, dest)
 
-    created_at = datetime.now(timezone.utc).timestamp()
+    created_at = time.time()
     thumb_rels = thumbnails.thumbnail_relative_paths(filename)
     thumb_paths = {size: ctx.gallery_path / rel for size, rel in thumb_rels.items()}
     thumbnails.create_thumbnails(dest, thumb_paths, reporter=reporter)
 
-    return GalleryItem(
+    entry = GalleryItem(
         id=uuid.uuid4().hex,
         filename=filename,
         title=ctx.config.title or slug.replace("-", " ").title(),
@@ -291,19 +385,26 @@ def _import_one_image(
         thumbnails=thumb_rels,
         thumbnail=thumb_rels["medium"],
     )
+    return entry, telemetry
 
 
 def _run_post_import(
     imported: list[GalleryItem],
     config: ImportConfig,
     gallery_path: Path,
+    data: list[GalleryItem],
 ) -> None:
-    """Run tagging and gallery generation after a successful import."""
+    """Run tagging and gallery generation after a successful import.
+
+    ``data`` is the full, just-saved gallery; both steps reuse it rather than
+    re-reading ``metadata.json``.
+    """
     if config.tag_new:
         ids = [entry.id for entry in imported]
         tagger.tag_images(
             gallery_root=str(gallery_path),
             ids=ids,
+            items=data,
             config_path=config.config_path,
             prompt=config.tag_prompt,
             model=config.tag_model,
@@ -311,7 +412,7 @@ def _run_post_import(
             allow_interactive=config.allow_interactive,
             telemetry_sink=config.telemetry_sink,
         )
-    gallery.generate_gallery(gallery_root=str(gallery_path))
+    gallery.generate_gallery(gallery_root=str(gallery_path), items=data)
 
 
 def import_images(
@@ -346,6 +447,9 @@ def import_images(
     images_dir.mkdir(parents=True, exist_ok=True)
     data = load_gallery_items(gallery_path)
     existing_files = {entry.filename for entry in data if entry.filename}
+    # Files can exist on disk without a metadata record (e.g. an interrupted
+    # import); reserve their names too so a copy never overwrites them.
+    existing_files.update(_existing_names(images_dir))
 
     if not prompt_yes_no(
         f"Import {len(items)} image(s) into {gallery_path}?", default=True
@@ -372,39 +476,62 @@ def import_images(
         existing_files=existing_files,
         ai_ctx=ai_ctx,
     )
-    imported: list[GalleryItem] = []
-
     with StatusReporter(
         total=len(items), description="Importing images", unit="img"
     ) as reporter:
-        for item in items:
-            if not _is_image_file(item.source):
-                reporter.advance()
-                continue
-
-            record = _import_one_image(
-                item,
-                ctx=ctx,
-                reporter=reporter,
-            )
-            data.append(record)
-            imported.append(record)
+        imported: list[GalleryItem] = []
+
+        def record(result: tuple[GalleryItem, AIRequestTelemetry | None]) -> None:
+            entry, telemetry = result
+            imported.append(entry)
+            if telemetry is not None and config.telemetry_sink is not None:
+                config.telemetry_sink(telemetry)
             reporter.advance()
 
+        workers = max(1, min(config.import_workers, len(items)))
+        if workers == 1:
+            for item in items:
+                record(_import_one_image(item, ctx=ctx, reporter=reporter))
+        else:
+            # AI renaming, file copies and thumbnail encoding all release the
+            # GIL, so independent images overlap well across threads. Results
+            # are collected in input order to keep metadata.json stable, and
+            # telemetry is forwarded from this thread so the sink need not be
+            # thread-safe.
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_import_one_image, item, ctx=ctx, reporter=reporter)
+                    for item in items
+                ]
+                try:
+                    for future in futures:
+                        record(future.result())
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+    data.extend(imported)
+
     thumbnails.ensure_thumbnail_metadata(gallery_path, data)
     save_gallery_items(gallery_path, data)
 
     if imported:
-        _run_post_import(imported, config, gallery_path)
+        _run_post_import(imported, config, gallery_path, data)
 
     return imported
 
 
 def regenerate_thumbnails(
-    *, gallery_root: str, force: bool = False, webp: bool = False
+    *,
+    gallery_root: str,
+    force: bool = False,
+    webp: bool = False,
+    items: list[GalleryItem] | None = None,
 ) -> list[str]:
     gallery_path = Path(gallery_root)
-    data = load_gallery_items(gallery_path)
+    # Callers that already hold the gallery can pass it to skip re-reading
+    # ``metadata.json``; the items are updated in place.
+    data = load_gallery_items(gallery_path) if items is None else items
     if not data:
         return []
     with StatusReporter(
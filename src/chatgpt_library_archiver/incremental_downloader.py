@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 import mimetypes
+import os
 import re
 import time
 import unicodedata
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Mapping
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from functools import partial
+from functools import lru_cache, partial
 from pathlib import Path
 from urllib.parse import quote
 
@@ -27,6 +29,12 @@
 from .utils import ensure_auth_config, prompt_yes_no
 
 MAX_EMPTY_PAGE_RETRIES = 2
+# Minimum seconds between mid-run metadata.json checkpoints. Each save
+# rewrites the whole file, so saving after every page is quadratic overall.
+SAVE_PROGRESS_INTERVAL = 30.0
+
+_UNSAFE_ID_CHARS = re.compile(r"[^a-zA-Z0-9_\-]")
+_ALNUM = re.compile(r"[a-zA-Z0-9]")
 
 
 def _sanitize_id(image_id: str) -> str:
@@ -37,10 +45,11 @@ def _sanitize_id(image_id: str) -> str:
     used by ``importer._slugify()``.
     """
     text = image_id.replace("\x00", "")
-    normalized = unicodedata.normalize("NFKD", text)
-    ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
-    clean = re.sub(r"[^a-zA-Z0-9_\-]", "_", ascii_text)
-    if not re.search(r"[a-zA-Z0-9]", clean):
+    if not text.isascii():
+        normalized = unicodedata.normalize("NFKD", text)
+        text = normalized.encode("ascii", "ignore").decode("ascii")
+    clean = _UNSAFE_ID_CHARS.sub("_", text)
+    if not _ALNUM.search(clean):
         return "unknown"
     return clean or "unknown"
 
@@ -73,6 +82,21 @@ class DownloadImageResult:
     content_type: str | None
     thumbnails: dict[str, str]
     thumbnail: str
+    # Set when thumbnails were handed to a separate executor; see
+    # :func:`_await_thumbnails`.
+    pending_thumbnails: Future[None] | None = None
+
+
+@lru_cache(maxsize=64)
+def _extension_for(content_type: str) -> str:
+    """Return the file extension for a ``Content-Type`` header value.
+
+    A library only ever serves a handful of image types, so the MIME
+    database lookup is cached per header value.
+    """
+
+    raw_type = content_type.split(";", 1)[0].strip()
+    return mimetypes.guess_extension(raw_type) or ".jpg"
 
 
 def download_image(
@@ -84,6 +108,7 @@ def download_image(
     client: HttpClient,
     progress: StatusReporter,
     webp: bool = False,
+    thumbnail_executor: Executor | None = None,
 ) -> tuple[str, GalleryItem, DownloadImageResult | str, Exception | None]:
     """Download a single image and generate thumbnails.
 
@@ -91,6 +116,10 @@ def download_image(
     On success *status* is ``"ok"`` and the third element is a
     :class:`DownloadImageResult`.  On failure *status* is ``"error"``
     and the third element is a human-readable reason string.
+
+    With *thumbnail_executor* the thumbnails are generated there instead, so
+    the calling download worker is free for the next image; the result's
+    ``pending_thumbnails`` future tracks them.
     """
 
     try:
@@ -104,9 +133,9 @@ def download_image(
             headers=headers,
             expected_content_prefixes=("image/",),
             max_bytes=100 * 1024 * 1024,
+            resume=True,
         )
-        raw_type = (result.content_type or "").split(";", 1)[0].strip()
-        ext = mimetypes.guess_extension(raw_type) or ".jpg"
+        ext = _extension_for(result.content_type or "")
         filename = f"{safe_id}{ext}"
         filepath = (images_dir / filename).resolve()
         if not filepath.is_relative_to(images_dir.resolve()):
@@ -115,15 +144,24 @@ def download_image(
             )
         if filepath.is_symlink():
             raise ValueError(f"Refusing to overwrite symlink at {filepath}")
-        if filepath.exists():
-            filepath.unlink()
+        # ``replace`` overwrites an existing file atomically on every platform.
         temp_path.replace(filepath)
 
         thumb_rels = thumbnails.thumbnail_relative_paths(filename, webp=webp)
         thumb_paths = {size: gallery_root / rel for size, rel in thumb_rels.items()}
-        thumbnails.create_thumbnails(
-            filepath, thumb_paths, reporter=progress, webp=webp
-        )
+        pending_thumbnails: Future[None] | None = None
+        if thumbnail_executor is None:
+            thumbnails.create_thumbnails(
+                filepath, thumb_paths, reporter=progress, webp=webp
+            )
+        else:
+            pending_thumbnails = thumbnail_executor.submit(
+                thumbnails.create_thumbnails,
+                filepath,
+                thumb_paths,
+                reporter=progress,
+                webp=webp,
+            )
 
         dto = DownloadImageResult(
             filename=filename,
@@ -131,6 +169,7 @@ def download_image(
             content_type=result.content_type,
             thumbnails=thumb_rels,
             thumbnail=thumb_rels["medium"],
+            pending_thumbnails=pending_thumbnails,
         )
         return ("ok", item, dto, None)
     except HttpError as exc:
@@ -139,6 +178,22 @@ def download_image(
         return ("error", item, str(exc), exc)
 
 
+def _await_thumbnails(
+    result: tuple[str, GalleryItem, DownloadImageResult | str, Exception | None],
+) -> tuple[str, GalleryItem, DownloadImageResult | str, Exception | None]:
+    """Wait for deferred thumbnails, turning a failure into an error result."""
+
+    status, item, payload, _exc = result
+    if status != "ok" or not isinstance(payload, DownloadImageResult):
+        return result
+    if payload.pending_thumbnails is not None:
+        try:
+            payload.pending_thumbnails.result()
+        except Exception as exc:
+            return ("error", item, str(exc), exc)
+    return result
+
+
 def main(
     tag_new: bool = False,
     browser: str | None = None,
@@ -169,6 +224,17 @@ def main(
             total=0, description="Overall progress", unit="img", position=1
         ) as progress,
         create_http_client() as client,
+        # One pool for the whole run: HttpClient keeps a keep-alive session per
+        # worker thread, so long-lived workers reuse their connections across
+        # pages instead of paying a fresh TLS handshake on every page.
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+        # Thumbnailing is CPU-bound; Pillow releases the GIL while decoding,
+        # resizing and encoding, so a separate pool keeps download workers on
+        # the network while earlier images are still being resized.
+        ThreadPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, 8),
+            thread_name_prefix="thumbnails",
+        ) as thumbnail_executor,
     ):
         progress.log(f"Found {len(existing_ids)} previously downloaded image IDs.")
 
@@ -189,182 +255,221 @@ def main(
             client=client,
             progress=progress,
             webp=webp,
+            thumbnail_executor=thumbnail_executor,
         )
 
+        # The next page is requested while the current one downloads, so the
+        # listing round-trip no longer sits between consecutive batches.
+        prefetched: tuple[str, Future[Mapping[str, object]]] | None = None
+        last_saved = time.monotonic()
+        unsaved = False
+
         progress.log("Fetching metadata from API...")
 
-        while True:
-            url = base_url + (f"&after={quote(cursor)}" if cursor else "")
-            try:
-                data = client.get_json(url, headers=headers)
-            except HttpError as exc:
-                progress.report_error(
-                    "Fetch metadata",
-                    url,
-                    reason=exc.reason,
-                    context=exc.context,
-                    exception=exc,
-                )
-                if exc.status_code in (401, 403):
-                    if browser:
-                        from .browser_extract import extract_auth_config
-
-                        config = extract_auth_config(browser)
-                        headers = build_headers(config)
-                        continue
-                    elif prompt_yes_no(
-                        "Auth seems invalid/expired. Re-enter credentials now?"
-                    ):
-                        config = ensure_auth_config("auth.txt")
-                        headers = build_headers(config)
-                        continue
-                break
-            except Exception as exc:  # pragma: no cover - safety net
-                progress.report_error(
-                    "Fetch metadata",
-                    url,
-                    reason=str(exc),
-                    context={"url": url},
-                    exception=exc,
-                )
-                break
-
-            items = data.get("items") if isinstance(data, dict) else None
-            if not isinstance(items, list):
-                progress.report_error(
-                    "Fetch metadata",
-                    url,
-                    reason="Response missing 'items' list",
-                    context={"url": url},
-                )
-                break
-            if not items:
-                progress.log("No more items in API.")
-                break
-
-            # Filter only new items
-            new_items = [item for item in items if item.get("id") not in existing_ids]
-
-            if not new_items:
-                consecutive_empty_pages += 1
-                if consecutive_empty_pages >= MAX_EMPTY_PAGE_RETRIES:
-                    message = (
-                        f"No new images found in {MAX_EMPTY_PAGE_RETRIES} pages."
-                        " Stopping."
+        try:
+            while True:
+                url = base_url + (f"&after={quote(cursor)}" if cursor else "")
+                pending, prefetched = prefetched, None
+                try:
+                    if pending is not None and pending[0] == url:
+                        data = pending[1].result()
+                    else:
+                        data = client.get_json(url, headers=headers)
+                except HttpError as exc:
+                    progress.report_error(
+                        "Fetch metadata",
+                        url,
+                        reason=exc.reason,
+                        context=exc.context,
+                        exception=exc,
                     )
-                    progress.log(message)
+                    if exc.status_code in (401, 403):
+                        if browser:
+                            from .browser_extract import extract_auth_config
+
+                            config = extract_auth_config(browser)
+                            headers = build_headers(config)
+                            continue
+                        elif prompt_yes_no(
+                            "Auth seems invalid/expired. Re-enter credentials now?"
+                        ):
+                            config = ensure_auth_config("auth.txt")
+                            headers = build_headers(config)
+                            continue
                     break
-                cursor = data.get("cursor") if isinstance(data, dict) else None
-                if not cursor:
+                except Exception as exc:  # pragma: no cover - safety net
+                    progress.report_error(
+                        "Fetch metadata",
+                        url,
+                        reason=str(exc),
+                        context={"url": url},
+                        exception=exc,
+                    )
                     break
-                continue
 
-            consecutive_empty_pages = 0  # Reset if we got new content
+                items = data.get("items") if isinstance(data, dict) else None
+                if not isinstance(items, list):
+                    progress.report_error(
+                        "Fetch metadata",
+                        url,
+                        reason="Response missing 'items' list",
+                        context={"url": url},
+                    )
+                    break
+                if not items:
+                    progress.log("No more items in API.")
+                    break
 
-            metas: list[GalleryItem] = []
-            for item in new_items:
-                image_url = item.get("url")
-                image_id = item.get("id")
-                if not image_url or not image_id:
+                # Filter only new items
+                new_items = [
+                    item for item in items if item.get("id") not in existing_ids
+                ]
+
+                if not new_items:
+                    consecutive_empty_pages += 1
+                    if consecutive_empty_pages >= MAX_EMPTY_PAGE_RETRIES:
+                        message = (
+                            f"No new images found in {MAX_EMPTY_PAGE_RETRIES} pages."
+                            " Stopping."
+                        )
+                        progress.log(message)
+                        break
+                    cursor = data.get("cursor") if isinstance(data, dict) else None
+                    if not cursor:
+                        break
                     continue
-                conversation_id = item.get("conversation_id")
-                message_id = item.get("message_id")
-                conversation_link = None
-                if conversation_id and message_id:
-                    conversation_link = (
-                        f"https://chat.openai.com/c/{conversation_id}#{message_id}"
-                    )
 
-                metas.append(
-                    GalleryItem(
-                        id=image_id,
-                        filename="",
-                        title=item.get("title", ""),
-                        prompt=item.get("prompt"),
-                        tags=list(item.get("tags") or []),
-                        created_at=normalize_created_at(item.get("created_at")),
-                        width=item.get("width"),
-                        height=item.get("height"),
-                        url=image_url,
-                        conversation_id=conversation_id,
-                        message_id=message_id,
-                        conversation_link=conversation_link,
+                consecutive_empty_pages = 0  # Reset if we got new content
+
+                metas: list[GalleryItem] = []
+                for item in new_items:
+                    image_url = item.get("url")
+                    image_id = item.get("id")
+                    if not image_url or not image_id:
+                        continue
+                    conversation_id = item.get("conversation_id")
+                    message_id = item.get("message_id")
+                    conversation_link = None
+                    if conversation_id and message_id:
+                        conversation_link = (
+                            f"https://chat.openai.com/c/{conversation_id}#{message_id}"
+                        )
+
+                    metas.append(
+                        GalleryItem(
+                            id=image_id,
+                            filename="",
+                            title=item.get("title", ""),
+                            prompt=item.get("prompt"),
+                            tags=list(item.get("tags") or []),
+                            created_at=normalize_created_at(item.get("created_at")),
+                            width=item.get("width"),
+                            height=item.get("height"),
+                            url=image_url,
+                            conversation_id=conversation_id,
+                            message_id=message_id,
+                            conversation_link=conversation_link,
+                        )
                     )
-                )
-
-            progress.add_total(len(metas))
-
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                results = list(
-                    tqdm(
-                        executor.map(_download, metas),
-                        total=len(metas),
-                        desc="Downloading images",
-                        unit="img",
-                        dynamic_ncols=True,
-                        bar_format=(
-                            "{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt}"
-                        ),
-                        disable=progress.disable,
-                        mininterval=1,
-                        position=0,
+
+                progress.add_total(len(metas))
+
+                next_cursor = data.get("cursor") if isinstance(data, dict) else None
+                if isinstance(next_cursor, str) and next_cursor:
+                    next_url = f"{base_url}&after={quote(next_cursor)}"
+                    prefetched = (
+                        next_url,
+                        executor.submit(client.get_json, next_url, headers=headers),
                     )
-                )
-
-            page_added = 0
-            for status, payload, result_or_reason, exc in results:
-                if status == "ok":
-                    item = payload
-                    dto: DownloadImageResult = result_or_reason  # type: ignore[assignment]
-                    item.filename = dto.filename
-                    item.checksum = dto.checksum
-                    item.content_type = dto.content_type
-                    item.thumbnails = dto.thumbnails
-                    item.thumbnail = dto.thumbnail
-                    item.url = ""
-                    new_metadata.append(item)
-                    existing_metadata.append(item)
-                    existing_ids.add(item.id)
-                    progress.advance()
-                    page_added += 1
-                else:
-                    item = payload
-                    progress.report_error(
-                        "Download",
-                        item.id,
-                        reason=result_or_reason,
-                        context={"url": item.url or ""},
-                        exception=exc,
+
+                futures = [executor.submit(_download, meta) for meta in metas]
+                # Tick the bar as each download finishes rather than in
+                # submission order; results are still read back in page order.
+                for _ in tqdm(
+                    as_completed(futures),
+                    total=len(metas),
+                    desc="Downloading images",
+                    unit="img",
+                    dynamic_ncols=True,
+                    bar_format=(
+                        "{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt}"
+                    ),
+                    disable=progress.disable,
+                    mininterval=1,
+                    position=0,
+                ):
+                    pass
+                results = [_await_thumbnails(future.result()) for future in futures]
+
+                page_added = 0
+                for status, payload, result_or_reason, exc in results:
+                    if status == "ok":
+                        item = payload
+                        dto: DownloadImageResult = result_or_reason  # type: ignore[assignment]
+                        item.filename = dto.filename
+                        item.checksum = dto.checksum
+                        item.content_type = dto.content_type
+                        item.thumbnails = dto.thumbnails
+                        item.thumbnail = dto.thumbnail
+                        item.url = ""
+                        new_metadata.append(item)
+                        existing_metadata.append(item)
+                        existing_ids.add(item.id)
+                        progress.advance()
+                        page_added += 1
+                    else:
+                        item = payload
+                        progress.report_error(
+                            "Download",
+                            item.id,
+                            reason=result_or_reason,
+                            context={"url": item.url or ""},
+                            exception=exc,
+                        )
+
+                unsaved = unsaved or page_added > 0
+                if unsaved and time.monotonic() - last_saved >= SAVE_PROGRESS_INTERVAL:
+                    save_gallery_items(gallery_root, existing_metadata)
+                    progress.log(
+                        f"Saved progress: {len(existing_metadata)} total images"
                     )
+                    last_saved = time.monotonic()
+                    unsaved = False
 
-            if page_added:
+                cursor = data.get("cursor") if isinstance(data, dict) else None
+                if not cursor:
+                    break
+        except BaseException:
+            # Interrupted mid-run: keep what finished since the last checkpoint
+            # so the next run does not download it again.
+            if unsaved:
                 save_gallery_items(gallery_root, existing_metadata)
-                progress.log(f"Saved progress: {len(existing_metadata)} total images")
-
-            cursor = data.get("cursor") if isinstance(data, dict) else None
-            if not cursor:
-                break
-
-            time.sleep(0.5)
+            raise
 
-        # Save metadata (items already appended to existing_metadata per-page)
+        # New items are already appended to existing_metadata per page.
         if new_metadata:
             metadata_updated = thumbnails.ensure_thumbnail_metadata(
                 gallery_root, existing_metadata, webp=webp
             )
             if metadata_updated:
                 progress.log("Updated thumbnail metadata for gallery items.")
-            save_gallery_items(gallery_root, existing_metadata)
-            progress.log(f"Saved {len(new_metadata)} new images to gallery/")
+            progress.log(f"Downloaded {len(new_metadata)} new images to gallery/")
             if tag_new:
                 ids = [m.id for m in new_metadata]
                 progress.log("Tagging new images...")
-                tagger.tag_images(ids=ids)
+                # Tag the in-memory items; the gallery below writes them out.
+                try:
+                    tagger.tag_images(ids=ids, items=existing_metadata, save=False)
+                except BaseException:
+                    # Keep the downloads even if tagging fails or is stopped.
+                    save_gallery_items(gallery_root, existing_metadata)
+                    raise
         else:
             progress.log("No new images to download.")
 
-    # Regenerate gallery pages and index after downloads (including tags)
-    generate_gallery()
+    # Regenerate the gallery after downloads (including tags). This also
+    # writes metadata.json, so the run's items are saved exactly once here.
+    generate_gallery(str(gallery_root), items=existing_metadata)
 
 
 if __name__ == "__main__":
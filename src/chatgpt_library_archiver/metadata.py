@@ -5,12 +5,42 @@
 import contextlib
 import json
 import os
+import re
 import tempfile
-from collections.abc import Iterable, Mapping
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, TextIO, cast
+
+from .utils import file_matches, optional_module, pretty_output_requested
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_VALUE_TERMINATORS = frozenset(" \t\n\r,]")
+_READ_CHUNK_SIZE = 1 << 16
+
+
+# ``orjson`` (installed via the ``fast`` extra) parses and serializes several
+# times faster than the standard library; without it metadata is decoded
+# incrementally and encoded with :mod:`json`.
+_orjson = optional_module("orjson")
+
+
+def _dump_records(records: Sequence[Mapping[str, Any]], *, pretty: bool) -> bytes:
+    """Serialize ``records`` as the UTF-8 ``metadata.json`` payload.
+
+    The file is read by tools rather than people, so it is compact unless
+    ``pretty`` asks for two-space indentation.
+    """
+
+    if _orjson is not None:
+        if pretty:
+            return _orjson.dumps(records, option=_orjson.OPT_INDENT_2)
+        return _orjson.dumps(records)
+    if pretty:
+        return json.dumps(records, indent=2).encode("utf-8")
+    return json.dumps(records, separators=(",", ":")).encode("utf-8")
 
 
 def metadata_path(gallery_root: str | Path) -> Path:
@@ -22,6 +52,13 @@ def metadata_path(gallery_root: str | Path) -> Path:
 def normalize_created_at(value: Any) -> float | None:
     """Convert assorted ``created_at`` values into a float timestamp."""
 
+    # Stored metadata almost always holds plain floats (or ints); exact type
+    # checks return those before the general isinstance/string handling.
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+
     normalized: float | None
     if value is None:
         normalized = None
@@ -78,6 +115,28 @@ def _default_extra() -> dict[str, Any]:
     return {}
 
 
+_KNOWN_FIELDS = frozenset(
+    {
+        "id",
+        "filename",
+        "title",
+        "prompt",
+        "tags",
+        "created_at",
+        "width",
+        "height",
+        "url",
+        "conversation_id",
+        "message_id",
+        "conversation_link",
+        "thumbnails",
+        "thumbnail",
+        "checksum",
+        "content_type",
+    }
+)
+
+
 @dataclass(slots=True)
 class GalleryItem:
     """Typed representation of a gallery item."""
@@ -105,43 +164,32 @@ def from_dict(cls, data: Mapping[str, Any]) -> GalleryItem:
         """Create an item from a JSON-compatible mapping."""
 
         raw_thumbnails = data.get("thumbnails")
-        extras = {
-            key: value
-            for key, value in data.items()
-            if key
-            not in {
-                "id",
-                "filename",
-                "title",
-                "prompt",
-                "tags",
-                "created_at",
-                "width",
-                "height",
-                "url",
-                "conversation_id",
-                "message_id",
-                "conversation_link",
-                "thumbnails",
-                "thumbnail",
-                "checksum",
-                "content_type",
+        # Records written by this package carry only known fields, so the
+        # per-key filter is skipped unless something extra is present.
+        if _KNOWN_FIELDS.issuperset(data):
+            extras: dict[str, Any] = {}
+        else:
+            extras = {
+                key: value for key, value in data.items() if key not in _KNOWN_FIELDS
             }
-        }
         thumbnail_entries: dict[str, str] = {}
         if isinstance(raw_thumbnails, Mapping):
-            for size_obj, path_obj in cast(
-                Mapping[object, object], raw_thumbnails
-            ).items():
-                if isinstance(size_obj, str) and isinstance(path_obj, str):
-                    thumbnail_entries[size_obj] = path_obj
+            thumbnail_entries = {
+                size_obj: path_obj
+                for size_obj, path_obj in cast(
+                    Mapping[object, object], raw_thumbnails
+                ).items()
+                if isinstance(size_obj, str) and isinstance(path_obj, str)
+            }
 
         raw_tags = data.get("tags")
         tags: list[str] = []
         if isinstance(raw_tags, Iterable):
-            for tag_obj in cast(Iterable[object], raw_tags):
-                if isinstance(tag_obj, str):
-                    tags.append(tag_obj)
+            tags = [
+                tag_obj
+                for tag_obj in cast(Iterable[object], raw_tags)
+                if isinstance(tag_obj, str)
+            ]
 
         return cls(
             id=str(data.get("id", "")),
@@ -188,38 +236,165 @@ def to_dict(self) -> dict[str, Any]:
         return payload
 
 
+def _expect_json_end(fh: TextIO, buf: str, pos: int) -> None:
+    """Raise ``JSONDecodeError`` unless only whitespace follows ``buf[pos:]``."""
+
+    while True:
+        match = _JSON_WHITESPACE.match(buf, pos)
+        pos = match.end() if match else pos
+        if pos < len(buf):
+            raise json.JSONDecodeError("Extra data", buf, pos)
+        buf, pos = fh.read(_READ_CHUNK_SIZE), 0
+        if not buf:
+            return
+
+
+def _iter_json_array(fh: TextIO) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array read incrementally from ``fh``.
+
+    Only the current chunk of text and the element being decoded are held in
+    memory, so callers can convert each record before the next one is parsed
+    instead of keeping the whole document and its parsed list alive together.
+    A document that is not an array is decoded in one piece and iterated.
+    """
+
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    need_value = False
+    need_separator = False
+    while True:
+        match = _JSON_WHITESPACE.match(buf, pos)
+        pos = match.end() if match else pos
+        if pos == len(buf):
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", buf, pos)
+            chunk = fh.read(_READ_CHUNK_SIZE)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        char = buf[pos]
+        if not started:
+            if char != "[":
+                yield from json.loads(buf[pos:] + fh.read())
+                return
+            started = True
+            pos += 1
+            continue
+        if char == "]" and not need_value:
+            _expect_json_end(fh, buf, pos + 1)
+            return
+        if need_separator:
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+            need_separator = False
+            need_value = True
+            continue
+        try:
+            value, end = _JSON_DECODER.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = -1
+            value = None
+        # A value cut off at the chunk boundary (notably a number such as
+        # ``12`` of ``125``) may still decode, so insist on seeing what
+        # follows it before accepting the element. The pending text is
+        # re-decoded after each refill, so read at least as much again as is
+        # already buffered to keep oversized elements linear, not quadratic.
+        if not eof and (
+            end < 0 or end == len(buf) or buf[end] not in _JSON_VALUE_TERMINATORS
+        ):
+            chunk = fh.read(max(_READ_CHUNK_SIZE, len(buf) - pos))
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        pos = end
+        need_value = False
+        need_separator = True
+        yield value
+
+
+def _iter_metadata_records(path: Path) -> Iterator[Any]:
+    """Yield the raw records stored in the metadata file at ``path``."""
+
+    if _orjson is not None:
+        data: Any = _orjson.loads(path.read_bytes())
+        if isinstance(data, list):
+            yield from cast(list[Any], data)
+        return
+    with path.open(encoding="utf-8") as fh:
+        yield from _iter_json_array(fh)
+
+
 def load_gallery_items(gallery_root: str | Path) -> list[GalleryItem]:
-    """Load all gallery items for ``gallery_root``."""
+    """Load all gallery items for ``gallery_root``.
+
+    With ``orjson`` available the file is parsed in one fast pass. Otherwise
+    records are decoded and converted one at a time so peak memory tracks the
+    resulting items rather than the raw text plus a parsed copy of every row.
+    """
 
     path = metadata_path(gallery_root)
     if not path.is_file():
         return []
-    with path.open(encoding="utf-8") as fh:
-        raw_items = json.load(fh)
     items: list[GalleryItem] = []
-    for raw in raw_items:
+    for raw in _iter_metadata_records(path):
         if isinstance(raw, Mapping):
             items.append(GalleryItem.from_dict(cast(Mapping[str, Any], raw)))
     return items
 
 
-def save_gallery_items(gallery_root: str | Path, items: Iterable[GalleryItem]) -> None:
+def save_gallery_items(
+    gallery_root: str | Path,
+    items: Iterable[GalleryItem],
+    *,
+    pretty: bool | None = None,
+) -> None:
     """Persist ``items`` to ``metadata.json`` within ``gallery_root``.
 
     The write is atomic: data is flushed to a temporary file in the same
     directory first, then moved into place with :func:`os.replace`.  This
     prevents a crash or power loss from leaving a truncated metadata file.
+    When the file already holds identical content it is left untouched.
+
+    The JSON is compact unless ``pretty`` is true; when ``pretty`` is
+    ``None`` the ``ARCHIVER_PRETTY`` environment variable decides.
+    """
+
+    save_gallery_records(
+        gallery_root, [item.to_dict() for item in items], pretty=pretty
+    )
+
+
+def save_gallery_records(
+    gallery_root: str | Path,
+    records: Sequence[Mapping[str, Any]],
+    *,
+    pretty: bool | None = None,
+) -> None:
+    """Persist already-serialized item ``records`` to ``metadata.json``.
+
+    Callers that also need the ``to_dict`` payload for another output (such
+    as the gallery page) can build it once and share it.  The write is atomic
+    in the same way as :func:`save_gallery_items`.
     """
 
     path = metadata_path(gallery_root)
     gallery_dir = path.parent
     gallery_dir.mkdir(parents=True, exist_ok=True)
 
-    payload = json.dumps([item.to_dict() for item in items], indent=2)
+    if pretty is None:
+        pretty = pretty_output_requested()
+    payload = _dump_records(records, pretty=pretty)
+    if file_matches(path, (payload,)):
+        return
 
     fd, tmp_path = tempfile.mkstemp(dir=str(gallery_dir), suffix=".tmp")
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        with os.fdopen(fd, "wb") as fh:
             fh.write(payload)
         os.replace(tmp_path, str(path))
     except BaseException:
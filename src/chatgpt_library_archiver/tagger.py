@@ -30,6 +30,9 @@
 
 SAVE_INTERVAL = 10
 
+_HTML_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE_RUN = re.compile(r"\s+")
+
 
 def _load_config(path: str) -> dict:
     with Path(path).open(encoding="utf-8") as f:
@@ -125,9 +128,9 @@ def on_retry(attempt: int, delay: float) -> None:
 
 def normalize_tag(raw: str) -> str:
     """Normalize a single tag string for consistent storage."""
-    tag = re.sub(r"<[^>]+>", "", raw)  # strip HTML tags
+    tag = _HTML_TAG.sub("", raw)  # strip HTML tags
     tag = tag.replace("_", " ")  # underscores → spaces
-    tag = re.sub(r"\s+", " ", tag).strip()  # collapse whitespace
+    tag = _WHITESPACE_RUN.sub(" ", tag).strip()  # collapse whitespace
     tag = tag.lower()  # lowercase
     tag = tag.rstrip(".!?,;:")  # strip trailing punctuation
     return tag
@@ -148,15 +151,18 @@ def remove_tags(
     if not items:
         return 0
 
-    ids_set = set(ids) if ids else None
-    updated = 0
-    for item in items:
-        if ids_set is None or item.id in ids_set:
-            item.tags = []
-            updated += 1
+    if ids is None:
+        targets = items
+    else:
+        # An empty *ids* selects nothing; only ``None`` means every item.
+        ids_set = set(ids)
+        targets = [item for item in items if item.id in ids_set]
+    for item in targets:
+        item.tags = []
 
-    save_gallery_items(gallery_root, items)
-    return updated
+    if targets:
+        save_gallery_items(gallery_root, items)
+    return len(targets)
 
 
 def tag_images(
@@ -169,16 +175,35 @@ def tag_images(
     max_workers: int = 4,
     allow_interactive: bool | None = None,
     telemetry_sink: Callable[[AIRequestTelemetry], None] | None = None,
+    *,
+    items: list[GalleryItem] | None = None,
+    save: bool = True,
 ) -> int:
     """Generate AI tags for gallery images.
 
+    Callers that already hold the gallery ``items`` can pass them to skip
+    re-reading ``metadata.json``; they are tagged in place and saved.  Pass
+    ``save=False`` when the caller writes the items itself afterwards (for
+    example by regenerating the gallery); periodic checkpoints during long
+    runs are still written.
+
     Returns the number of items successfully tagged.
     """
-    items = load_gallery_items(gallery_root)
+    if items is None:
+        items = load_gallery_items(gallery_root)
     if not items:
         return 0
 
     ids_set = set(ids) if ids else None
+    if ids_set:
+        to_tag = [item for item in items if item.id in ids_set]
+    elif re_tag:
+        to_tag = list(items)
+    else:
+        to_tag = [item for item in items if not item.tags]
+    # Nothing to do: skip the config prompt, client setup and metadata rewrite.
+    if not to_tag:
+        return 0
 
     updated = 0
     cfg = ensure_tagging_config(
@@ -188,85 +213,78 @@ def tag_images(
     client = get_cached_client(cfg.api_key)
     use_prompt = prompt or cfg.prompt
     use_model = model or cfg.model
-    to_tag = []
-    for item in items:
-        if ids_set and item.id not in ids_set:
-            continue
-        if not ids_set and not re_tag and item.tags:
-            continue
-        to_tag.append(item)
-
-    if to_tag:
-        with StatusReporter(
-            total=len(to_tag), description="Tagging images", unit="img"
-        ) as reporter:
-            reporter.log_status("Tagging", f"{len(to_tag)} images.")
-
-            total_tokens = 0
-            total_latency = 0.0
-            telemetry_count = 0
-
-            def process(item: GalleryItem):
-                image_path = str(Path(gallery_root) / "images" / item.filename)
-                reporter.log_status("Uploading", item.filename)
-                tags, telemetry = generate_tags(
-                    image_path,
-                    client,
-                    use_model,
-                    use_prompt,
-                    reporter=reporter,
+
+    with StatusReporter(
+        total=len(to_tag), description="Tagging images", unit="img"
+    ) as reporter:
+        reporter.log_status("Tagging", f"{len(to_tag)} images.")
+
+        total_tokens = 0
+        total_latency = 0.0
+        telemetry_count = 0
+
+        def process(item: GalleryItem):
+            image_path = str(Path(gallery_root) / "images" / item.filename)
+            reporter.log_status("Uploading", item.filename)
+            tags, telemetry = generate_tags(
+                image_path,
+                client,
+                use_model,
+                use_prompt,
+                reporter=reporter,
+            )
+            item.tags = tags
+            tokens = telemetry.total_tokens
+            if telemetry_sink is not None:
+                telemetry_sink(telemetry)
+            if tokens is not None:
+                reporter.log_status(
+                    "Received tags for",
+                    (
+                        f"{item.id} (tokens: {tokens}, "
+                        f"latency: {telemetry.latency_s:.2f}s)"
+                    ),
                 )
-                item.tags = tags
-                tokens = telemetry.total_tokens
-                if telemetry_sink is not None:
-                    telemetry_sink(telemetry)
-                if tokens is not None:
-                    reporter.log_status(
-                        "Received tags for",
-                        (
-                            f"{item.id} (tokens: {tokens}, "
-                            f"latency: {telemetry.latency_s:.2f}s)"
-                        ),
+            else:
+                reporter.log_status("Received tags for", item.id)
+            return telemetry
+
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            future_to_item = {ex.submit(process, item): item for item in to_tag}
+            for fut in as_completed(future_to_item):
+                item = future_to_item[fut]
+                try:
+                    telemetry = fut.result()
+                except Exception as exc:
+                    reporter.report_error(
+                        "Tagging failed",
+                        item.filename,
+                        reason=str(exc),
+                        exception=exc,
                     )
-                else:
-                    reporter.log_status("Received tags for", item.id)
-                return telemetry
-
-            with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                future_to_item = {ex.submit(process, item): item for item in to_tag}
-                for fut in as_completed(future_to_item):
-                    item = future_to_item[fut]
-                    try:
-                        telemetry = fut.result()
-                    except Exception as exc:
-                        reporter.report_error(
-                            "Tagging failed",
-                            item.filename,
-                            reason=str(exc),
-                            exception=exc,
-                        )
-                        reporter.advance()
-                        continue
-                    if telemetry.total_tokens is not None:
-                        total_tokens += telemetry.total_tokens
-                    total_latency += telemetry.latency_s
-                    telemetry_count += 1
-                    updated += 1
-                    if updated % SAVE_INTERVAL == 0:
-                        save_gallery_items(gallery_root, items)
                     reporter.advance()
+                    continue
+                if telemetry.total_tokens is not None:
+                    total_tokens += telemetry.total_tokens
+                total_latency += telemetry.latency_s
+                telemetry_count += 1
+                updated += 1
+                if updated % SAVE_INTERVAL == 0:
+                    save_gallery_items(gallery_root, items)
+                reporter.advance()
+
+        if telemetry_count:
+            avg_latency = total_latency / telemetry_count
+            if total_tokens:
+                reporter.log(
+                    f"Total tokens used: {total_tokens} | "
+                    f"avg latency: {avg_latency:.2f}s"
+                )
+            else:
+                reporter.log(f"Avg latency: {avg_latency:.2f}s")
+        elif total_tokens:
+            reporter.log(f"Total tokens used: {total_tokens}")
 
-            if telemetry_count:
-                avg_latency = total_latency / telemetry_count
-                if total_tokens:
-                    reporter.log(
-                        f"Total tokens used: {total_tokens} | "
-                        f"avg latency: {avg_latency:.2f}s"
-                    )
-                else:
-                    reporter.log(f"Avg latency: {avg_latency:.2f}s")
-            elif total_tokens:
-                reporter.log(f"Total tokens used: {total_tokens}")
-
-    save_gallery_items(gallery_root, items)
+    if save:
+        save_gallery_items(gallery_root, items)
     return updated
@@ -4,15 +4,14 @@
 
 import concurrent.futures
 import io
+import math
 import multiprocessing
 import os
-import threading
-from collections.abc import Iterable
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from multiprocessing.context import BaseContext
-from multiprocessing.managers import SyncManager
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Protocol, cast
+from typing import TYPE_CHECKING
 
 from PIL import Image, ImageOps, UnidentifiedImageError
 
@@ -34,26 +33,6 @@ class ThumbnailError(RuntimeError):
     from .metadata import GalleryItem
 
 
-def _entry_get(entry: GalleryItem, key: str) -> Any:
-    return getattr(entry, key, None)
-
-
-def _entry_set(entry: GalleryItem, key: str, value: Any) -> None:
-    setattr(entry, key, value)
-
-
-class _StatusQueueProtocol(Protocol):
-    """Minimal protocol for status queue objects used by workers."""
-
-    def put(
-        self, item: object, block: bool = True, timeout: float | None = None
-    ) -> None:
-        """Send ``item`` to the queue."""
-
-    def get(self) -> object:
-        """Retrieve a message from the queue."""
-
-
 THUMBNAIL_DIR_NAME = "thumbs"
 THUMBNAIL_SIZES: dict[str, tuple[int, int]] = {
     "small": (150, 150),
@@ -62,6 +41,14 @@ def get(self) -> object:
 }
 
 _LANCZOS: Image.Resampling = Image.Resampling.LANCZOS
+# Large enough to hold any thumbnail, so each one is written in one syscall.
+_SAVE_BUFFER_SIZE = 1 << 20
+# Largest bucket; ``create_thumbnails`` renders it before the smaller ones.
+_FIRST_WRITTEN_SIZE = max(THUMBNAIL_SIZES, key=THUMBNAIL_SIZES.__getitem__)
+# Decode JPEGs, and let ``resize`` pre-reduce, at no less than this multiple
+# of the target size so LANCZOS still has detail to work with; Pillow's
+# ``thumbnail`` uses the same gap.
+_DRAFT_REDUCING_GAP = 2.0
 
 _EXT_TO_FORMAT = {
     ".jpg": "JPEG",
@@ -116,12 +103,21 @@ def _infer_format(dest: Path, image: Image.Image) -> str:
     return "PNG"
 
 
+# Encoder settings per output format; shared read-only across every save.
+_SAVE_OPTIONS: dict[str, Mapping[str, object]] = {
+    "JPEG": {"quality": 80, "optimize": True, "progressive": True, "subsampling": 2},
+    "PNG": {"optimize": True, "compress_level": 9},
+    "WEBP": {"quality": 80, "method": 6},
+    "GIF": {"optimize": True},
+}
+_NO_SAVE_OPTIONS: Mapping[str, object] = {}
+
+
 def _prepare_for_format(
     img: Image.Image, fmt: str
-) -> tuple[Image.Image, dict[str, object]]:
+) -> tuple[Image.Image, Mapping[str, object]]:
     """Return an image and keyword arguments tuned for the target format."""
 
-    save_kwargs: dict[str, object] = {}
     fmt = fmt.upper()
     if fmt == "JPEG":
         if img.mode == "RGBA":
@@ -130,37 +126,66 @@ def _prepare_for_format(
             img = background
         elif img.mode not in ("RGB", "L"):
             img = img.convert("RGB")
-        save_kwargs.update(
-            {
-                "quality": 80,
-                "optimize": True,
-                "progressive": True,
-                "subsampling": 2,
-            }
-        )
-    elif fmt == "PNG":
-        if img.mode not in ("RGB", "RGBA", "L"):
-            img = img.convert("RGBA")
-        save_kwargs.update(
-            {
-                "optimize": True,
-                "compress_level": 9,
-            }
-        )
-    elif fmt == "WEBP":
-        if img.mode not in ("RGB", "RGBA", "L"):
-            img = img.convert("RGBA")
-        save_kwargs.update(
-            {
-                "quality": 80,
-                "method": 6,
-            }
-        )
-    elif fmt == "GIF":
-        if img.mode not in ("P", "L"):
-            img = img.convert("P", palette=Image.Palette.ADAPTIVE)
-        save_kwargs["optimize"] = True
-    return img, save_kwargs
+    elif fmt in ("PNG", "WEBP") and img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGBA")
+    elif fmt == "GIF" and img.mode not in ("P", "L"):
+        img = img.convert("P", palette=Image.Palette.ADAPTIVE)
+    return img, _SAVE_OPTIONS.get(fmt, _NO_SAVE_OPTIONS)
+
+
+# EXIF tag holding the orientation; 1 means the pixels are already upright.
+_EXIF_ORIENTATION = 0x0112
+
+
+def _open_image(source: Path) -> Image.Image:
+    """Open *source*, probing the format its extension names first.
+
+    Without a hint Pillow tries each registered format in turn.  A file whose
+    contents do not match its extension falls back to that full probe.
+    """
+
+    fmt = _EXT_TO_FORMAT.get(source.suffix.lower())
+    if fmt is not None:
+        try:
+            return Image.open(source, formats=(fmt,))
+        except UnidentifiedImageError:
+            pass
+    return Image.open(source)
+
+
+def _exif_upright(img: Image.Image) -> Image.Image:
+    """Return *img* rotated per its EXIF orientation, or *img* itself.
+
+    ``ImageOps.exif_transpose`` copies the whole image even when nothing needs
+    rotating, so it is only called for sources that are actually rotated.
+    """
+
+    if img.getexif().get(_EXIF_ORIENTATION, 1) == 1:
+        return img
+    return ImageOps.exif_transpose(img)
+
+
+def _fit_size(size: tuple[int, int], bounds: tuple[int, int]) -> tuple[int, int] | None:
+    """Return the size ``Image.thumbnail`` would shrink *size* to.
+
+    ``None`` means *size* already fits within *bounds*.  The rounding mirrors
+    Pillow's so the output matches ``thumbnail`` pixel for pixel.
+    """
+
+    width, height = size
+    x, y = bounds
+    if x >= width and y >= height:
+        return None
+    aspect = width / height
+
+    def round_aspect(number: float, error: Callable[[int], float]) -> int:
+        return max(min(math.floor(number), math.ceil(number), key=error), 1)
+
+    if x / y >= aspect:
+        x = round_aspect(y * aspect, lambda n: abs(aspect - n / y))
+    else:
+        y = round_aspect(x / aspect, lambda n: 0 if n == 0 else abs(aspect - x / n))
+    return x, y
 
 
 def _ensure_srgb(img: Image.Image) -> Image.Image:
@@ -228,6 +253,27 @@ def _ensure_srgb(img: Image.Image) -> Image.Image:
     return img
 
 
+def _save_image(
+    image: Image.Image, dest: Path, fmt: str, save_kwargs: Mapping[str, object]
+) -> None:
+    """Atomically save ``image`` through one buffered handle.
+
+    Pillow's encoders emit many small chunks; a thumbnail easily fits in the
+    buffer, so the whole file is flushed with a single ``write`` on close.
+    The data goes to a temporary sibling that replaces ``dest`` only once
+    complete, so an interrupted run never leaves a truncated thumbnail that
+    later runs would mistake for a finished one.
+    """
+
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb", buffering=_SAVE_BUFFER_SIZE) as fh:
+            image.save(fh, fmt, **save_kwargs)
+        tmp.replace(dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 def create_thumbnails(
     source: Path,
     dest_map: dict[str, Path],
@@ -242,18 +288,39 @@ def create_thumbnails(
     rewritten to use a ``.webp`` extension.
     """
 
+    # Resolve each bucket's bounds once, largest first: each smaller one is
+    # resized from the previous thumbnail rather than the full-size source.
+    ordered: list[tuple[tuple[int, int], Path]] = []
+    for size, dest in dest_map.items():
+        bounds = THUMBNAIL_SIZES.get(size)
+        if bounds is None:
+            raise ValueError(f"Unsupported thumbnail size: {size}")
+        ordered.append((bounds, dest))
+    ordered.sort(key=lambda pair: pair[0], reverse=True)
+
     if reporter is not None:
         reporter.log_status("Generating thumbnails for", source.name)
     try:
-        with Image.open(source) as img:
-            base = ImageOps.exif_transpose(img)
-            base = _ensure_srgb(base)
-            for size, dest in dest_map.items():
-                if size not in THUMBNAIL_SIZES:
-                    raise ValueError(f"Unsupported thumbnail size: {size}")
-                target_size = THUMBNAIL_SIZES[size]
-                thumb = base.copy()
-                thumb.thumbnail(target_size, _LANCZOS)
+        with _open_image(source) as img:
+            # Rotating or copying decodes the image, which would bypass the
+            # shrink-on-load ``thumbnail`` normally gets for free, so request
+            # it first: JPEGs then decode at the smallest DCT scale that still
+            # covers the largest bucket (a no-op for other formats).
+            if ordered:
+                draft_edge = int(max(ordered[0][0]) * _DRAFT_REDUCING_GAP)
+                img.draft(img.mode, (draft_edge, draft_edge))
+            base = _exif_upright(img)
+            current = _ensure_srgb(base)
+            for bounds, dest in ordered:
+                # ``resize`` writes a new image, so unlike ``copy`` plus
+                # ``thumbnail`` the source pixels are never duplicated.
+                fitted = _fit_size(current.size, bounds)
+                if fitted is None:
+                    thumb = current
+                else:
+                    thumb = current.resize(  # type: ignore[reportUnknownMemberType]
+                        fitted, _LANCZOS, reducing_gap=_DRAFT_REDUCING_GAP
+                    )
                 if webp:
                     dest = dest.with_suffix(".webp")
                     fmt = "WEBP"
@@ -261,60 +328,84 @@ def create_thumbnails(
                     fmt = _infer_format(dest, thumb)
                 dest.parent.mkdir(parents=True, exist_ok=True)
                 prepared, save_kwargs = _prepare_for_format(thumb, fmt)
-                prepared.save(dest, fmt, **save_kwargs)
+                _save_image(prepared, dest, fmt, save_kwargs)
                 if prepared is not thumb:
                     prepared.close()
-                thumb.close()
+                if thumb is not current:
+                    if current is not base:
+                        current.close()
+                    current = thumb
+            if current is not base:
+                current.close()
         if reporter is not None:
             reporter.log_status("Finished generating thumbnails for", source.name)
-    except (FileNotFoundError, UnidentifiedImageError, OSError) as exc:
+    except (
+        FileNotFoundError,
+        UnidentifiedImageError,
+        OSError,
+        Image.DecompressionBombError,
+    ) as exc:
         raise ThumbnailError(f"Failed to create thumbnail for {source}: {exc}") from exc
 
 
-def _create_thumbnails_worker(
-    source: Path,
-    dest_map: dict[str, Path],
-    status_queue: _StatusQueueProtocol | None = None,
-    webp: bool = False,
-) -> str:
-    """Create thumbnails for ``source`` without side-channel reporting."""
+# Parallel regeneration hands each worker several images per task.
+_BATCHES_PER_WORKER = 4
+# Below this many images a thread pool is used; worker processes only pay
+# off once there is enough work to amortize starting them.
+_PROCESS_POOL_MIN_JOBS = 64
+_BatchResult = list[tuple[str, Exception | None]]
+# Lists the performance cores on Linux hybrid CPUs (Intel P/E designs).
+_PERF_CORES_PATH = Path("/sys/devices/cpu_core/cpus")
+
+
+def _parse_cpu_list(text: str) -> set[int]:
+    """Parse a kernel CPU list such as ``"0-3,8,10-11"``."""
+
+    cpus: set[int] = set()
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _pin_to_perf_cores() -> None:
+    """Keep a worker process on performance cores when the CPU is hybrid.
 
-    if status_queue is not None:
-        status_queue.put(("start", source.name))
+    Resizing is CPU-bound, and the scheduler may otherwise park workers on
+    efficiency cores.  Anywhere the topology is not exposed this is a no-op.
+    """
+
+    if not hasattr(os, "sched_setaffinity"):
+        return
     try:
-        create_thumbnails(source, dest_map, reporter=None, webp=webp)
-    except Exception as exc:
-        if status_queue is not None:
-            status_queue.put(("error", source.name, str(exc)))
-        raise
-    else:
-        if status_queue is not None:
-            status_queue.put(("finish", source.name))
-    return source.name
+        perf_cores = _parse_cpu_list(_PERF_CORES_PATH.read_text(encoding="ascii"))
+        if perf_cores:
+            os.sched_setaffinity(0, perf_cores)
+    except (OSError, ValueError):
+        pass
 
 
-def _consume_status_messages(
-    status_queue: _StatusQueueProtocol,
-    reporter: StatusReporter,
-) -> None:
-    """Forward worker status updates to ``reporter``."""
-
-    while True:
-        raw = status_queue.get()
-        if raw is None:
-            break
-        message = cast(tuple[str, ...], raw)
-        kind = message[0]
-        name = message[1]
-        rest = message[2:]
-        if kind == "start":
-            reporter.log_status("Generating thumbnails for", name)
-        elif kind == "finish":
-            reporter.log_status("Finished generating thumbnails for", name)
-        elif kind == "error":
-            detail = rest[0] if rest else ""
-            suffix = f": {detail}" if detail else ""
-            reporter.log_status("Failed to generate thumbnails for", f"{name}{suffix}")
+def _create_thumbnails_batch(
+    jobs: list[tuple[Path, dict[str, Path]]],
+    webp: bool = False,
+) -> _BatchResult:
+    """Create thumbnails for each ``(source, dest_map)`` job in one task.
+
+    Returns ``(source name, error)`` pairs so one bad image does not hide the
+    results of the rest of the batch.
+    """
+
+    results: _BatchResult = []
+    for source, dest_map in jobs:
+        try:
+            create_thumbnails(source, dest_map, reporter=None, webp=webp)
+        except Exception as exc:
+            results.append((source.name, exc))
+        else:
+            results.append((source.name, None))
+    return results
 
 
 def ensure_thumbnail_metadata(
@@ -336,20 +427,38 @@ def ensure_thumbnail_metadata(
 
     updated = False
     for entry in metadata:
-        filename = _entry_get(entry, "filename")
+        filename = entry.filename
         if not filename:
             continue
         thumb_rel_map = thumbnail_relative_paths(filename, webp=webp)
-        if _entry_get(entry, "thumbnails") != thumb_rel_map:
-            _entry_set(entry, "thumbnails", thumb_rel_map)
-            updated = True
-        medium_rel = thumb_rel_map["medium"]
-        if _entry_get(entry, "thumbnail") != medium_rel:
-            _entry_set(entry, "thumbnail", medium_rel)
-            updated = True
+        updated = _set_thumbnail_fields(entry, thumb_rel_map) or updated
+    return updated
+
+
+def _set_thumbnail_fields(entry: GalleryItem, thumb_rel_map: dict[str, str]) -> bool:
+    """Point ``entry`` at ``thumb_rel_map``; return ``True`` if anything changed."""
+
+    updated = False
+    if entry.thumbnails != thumb_rel_map:
+        entry.thumbnails = thumb_rel_map
+        updated = True
+    medium_rel = thumb_rel_map["medium"]
+    if entry.thumbnail != medium_rel:
+        entry.thumbnail = medium_rel
+        updated = True
     return updated
 
 
+def _file_names(directory: Path) -> frozenset[str]:
+    """Return the names of regular files directly inside ``directory``."""
+
+    try:
+        with os.scandir(directory) as it:
+            return frozenset(entry.name for entry in it if entry.is_file())
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+
 def regenerate_thumbnails(
     gallery_root: Path,
     metadata: Iterable[GalleryItem],
@@ -370,37 +479,47 @@ def regenerate_thumbnails(
     if max_workers is not None and max_workers < 1:
         raise ValueError("max_workers must be at least 1")
 
-    entries = list(metadata)
     pending: list[tuple[str, Path, dict[str, Path]]] = []
+    updated = False
+
+    # List each image and thumbnail directory once instead of stat-ing every
+    # candidate path; large galleries otherwise pay four stats per entry.
+    listings: dict[Path, frozenset[str]] = {}
 
-    for entry in entries:
-        filename = _entry_get(entry, "filename")
+    def is_file(path: Path) -> bool:
+        parent = path.parent
+        names = listings.get(parent)
+        if names is None:
+            names = listings[parent] = _file_names(parent)
+        return path.name in names
+
+    for entry in metadata:
+        filename = entry.filename
         if not filename:
             continue
+        # Fix up the metadata paths in the same pass that checks the files,
+        # computing each entry's thumbnail paths only once.
+        thumb_rel_map = thumbnail_relative_paths(filename, webp=webp)
+        updated = _set_thumbnail_fields(entry, thumb_rel_map) or updated
         source = images_dir / filename
-        if not source.is_file():
+        if not is_file(source):
             continue
         processed.append(filename)
-        thumb_rel_map = thumbnail_relative_paths(filename, webp=webp)
         thumb_path_map = {
             size: gallery_root / rel for size, rel in thumb_rel_map.items()
         }
         need_create = force or any(
-            not path.exists() for path in thumb_path_map.values()
+            not is_file(path) for path in thumb_path_map.values()
         )
         if not need_create:
-            source_mtime = source.stat().st_mtime
-            need_create = any(
-                path.stat().st_mtime < source_mtime
-                for path in thumb_path_map.values()
-                if path.exists()
-            )
+            # ``create_thumbnails`` writes the largest bucket first, so it is
+            # the oldest of the set: if it is newer than the source, so are
+            # the rest, and one stat stands in for all of them.
+            oldest = thumb_path_map[_FIRST_WRITTEN_SIZE]
+            need_create = oldest.stat().st_mtime < source.stat().st_mtime
         if need_create:
             pending.append((filename, source, thumb_path_map))
 
-    # Delegate metadata fixup to the lightweight helper.
-    updated = ensure_thumbnail_metadata(gallery_root, entries, webp=webp)
-
     if reporter is not None and pending:
         reporter.add_total(len(pending))
 
@@ -423,82 +542,92 @@ def regenerate_thumbnails(
                 reporter.advance()
         return processed, updated
 
-    executor_kwargs: dict[str, object] = {}
     if max_workers is None:
         max_workers = min(os.cpu_count() or 1, 8)
-    executor_kwargs["max_workers"] = max_workers
 
-    status_queue: _StatusQueueProtocol | None = None
-    status_thread: threading.Thread | None = None
-    status_manager: SyncManager | None = None
-    mp_context: BaseContext | None = None
-    if reporter is not None:
-        mp_context = multiprocessing.get_context()
-        status_manager = mp_context.Manager()
-        status_queue = status_manager.Queue()
-        status_thread = threading.Thread(
-            target=_consume_status_messages,
-            args=(status_queue, reporter),
-            daemon=True,
+    executor: concurrent.futures.Executor
+    if len(pending) < _PROCESS_POOL_MIN_JOBS:
+        # Pillow releases the GIL while decoding, resizing and encoding, so
+        # threads parallelize a modest batch without paying process start-up.
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(),
+            initializer=_pin_to_perf_cores,
         )
-        status_thread.start()
 
-    try:
-        with ProcessPoolExecutor(
-            max_workers=max_workers,
-            mp_context=mp_context,
-        ) as executor:
-            pending_iter = iter(pending)
-            futures: set[concurrent.futures.Future[str]] = set()
-            future_filenames: dict[concurrent.futures.Future[str], str] = {}
+    # Progress is reported from this thread as work is handed out and
+    # collected. At most ``max_workers`` jobs are in flight, so a submitted
+    # job starts almost immediately and no cross-process queue is needed.
+    with executor:
+        worker_limit = getattr(executor, "_max_workers", None)
+        if worker_limit is None:
+            worker_limit = len(pending)
+        # Several images per task amortize pickling and dispatch, while about
+        # four batches per worker keep the load balanced and progress moving.
+        batch_size = max(1, len(pending) // (worker_limit * _BATCHES_PER_WORKER))
+        pending_iter = iter(pending)
+        futures: set[concurrent.futures.Future[_BatchResult]] = set()
+        batch_names: dict[concurrent.futures.Future[_BatchResult], list[str]] = {}
+
+        def report(name: str, exc: Exception | None) -> None:
+            if reporter is None:
+                return
+            if exc is None:
+                reporter.log_status("Finished generating thumbnails for", name)
+            else:
+                reporter.log_status(
+                    "Failed to generate thumbnails for", f"{name}: {exc}"
+                )
+                reporter.report_error(
+                    "Thumbnail generation failed",
+                    name,
+                    reason=str(exc),
+                    exception=exc,
+                )
+            reporter.advance()
 
-            def submit_next() -> bool:
+        def submit_next() -> bool:
+            while batch := list(islice(pending_iter, batch_size)):
+                names = [source.name for _name, source, _paths in batch]
+                if reporter is not None:
+                    for name in names:
+                        reporter.log_status("Generating thumbnails for", name)
                 try:
-                    _filename, source, thumb_paths = next(pending_iter)
-                except StopIteration:
-                    return False
-                future = executor.submit(
-                    _create_thumbnails_worker,
-                    source,
-                    thumb_paths,
-                    status_queue,
-                    webp,
-                )
+                    future = executor.submit(
+                        _create_thumbnails_batch,
+                        [(source, thumb_paths) for _name, source, thumb_paths in batch],
+                        webp,
+                    )
+                except Exception as exc:
+                    # A broken pool refuses new work; report the batch and
+                    # move on so every image is still accounted for.
+                    for name in names:
+                        report(name, exc)
+                    continue
                 futures.add(future)
-                future_filenames[future] = _filename
+                batch_names[future] = names
                 return True
+            return False
 
-            worker_limit = getattr(executor, "_max_workers", None)
-            if worker_limit is None:
-                worker_limit = len(pending)
-            for _ in range(worker_limit):
-                if not submit_next():
-                    break
-
-            while futures:
-                future = next(as_completed(futures))
-                futures.remove(future)
-                fname = future_filenames.pop(future, "unknown")
-                try:
-                    future.result()
-                except Exception as exc:
-                    if reporter is not None:
-                        reporter.report_error(
-                            "Thumbnail generation failed",
-                            fname,
-                            reason=str(exc),
-                            exception=exc,
-                        )
-                if reporter is not None:
-                    reporter.advance()
-                submit_next()
-    finally:
-        if status_queue is not None and status_thread is not None:
+        for _ in range(worker_limit):
+            if not submit_next():
+                break
+
+        while futures:
+            future = next(as_completed(futures))
+            futures.remove(future)
+            names = batch_names.pop(future)
+            results: _BatchResult
             try:
-                status_queue.put(None)
-            finally:
-                status_thread.join()
-        if status_manager is not None:
-            status_manager.shutdown()
+                results = future.result()
+            except Exception as exc:
+                # The worker itself failed (e.g. a crashed process pool), so
+                # every image of the batch is reported with that error.
+                results = [(name, exc) for name in names]
+            for name, exc in results:
+                report(name, exc)
+            submit_next()
 
     return processed, updated
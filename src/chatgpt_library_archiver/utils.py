@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import getpass
+import importlib
 import os
+from collections.abc import Sequence
 from pathlib import Path
+from types import ModuleType
 from typing import TypedDict, cast
 
 REQUIRED_AUTH_KEYS = [
@@ -35,6 +38,28 @@ class AuthConfig(TypedDict):
 # Environment variable to automatically answer yes to prompts
 ASSUME_YES_ENV = "ARCHIVER_ASSUME_YES"
 
+# Environment variable to write human-readable (unminified, indented) output
+PRETTY_ENV = "ARCHIVER_PRETTY"
+
+# Values accepted as "on" for boolean environment variables
+_TRUTHY_ENV_VALUES = frozenset({"1", "true", "yes"})
+
+
+def pretty_output_requested() -> bool:
+    """Return ``True`` when :data:`PRETTY_ENV` asks for human-readable output."""
+
+    return os.environ.get(PRETTY_ENV, "").lower() in _TRUTHY_ENV_VALUES
+
+
+# Environment variable that makes WebP the default thumbnail format
+WEBP_THUMBNAILS_ENV = "ARCHIVER_WEBP_THUMBNAILS"
+
+
+def webp_thumbnails_requested() -> bool:
+    """Return ``True`` when :data:`WEBP_THUMBNAILS_ENV` defaults thumbnails to WebP."""
+
+    return os.environ.get(WEBP_THUMBNAILS_ENV, "").lower() in _TRUTHY_ENV_VALUES
+
 
 def prompt_yes_no(message: str, default: bool = True) -> bool:
     """Prompt the user with a yes/no question.
@@ -51,7 +76,7 @@ def prompt_yes_no(message: str, default: bool = True) -> bool:
     """
 
     assume = os.environ.get(ASSUME_YES_ENV, "").lower()
-    if assume in {"1", "true", "yes"}:
+    if assume in _TRUTHY_ENV_VALUES:
         print(f"{message} [Y/n]: y (auto)")
         return True
 
@@ -97,6 +122,44 @@ def write_secure_file(path: str | Path, content: str, mode: int = 0o600) -> None
         raise
 
 
+def optional_module(name: str) -> ModuleType | None:
+    """Import ``name`` if it is installed, else return ``None``."""
+
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def file_matches(path: str | Path, parts: Sequence[str | bytes]) -> bool:
+    """Return ``True`` if *path* already contains exactly the joined *parts*.
+
+    Text parts are compared as UTF-8. The file size is checked first so most
+    changed outputs are detected with a single ``stat``; otherwise the file is
+    compared piece by piece without joining *parts* into one large buffer.
+    Lets generators skip rewriting outputs whose content has not changed.
+    """
+
+    try:
+        size = Path(path).stat().st_size
+    except OSError:
+        return False
+    if size != sum(_utf8_len(part) for part in parts):
+        return False
+    with Path(path).open("rb") as fh:
+        for part in parts:
+            data = part.encode("utf-8") if isinstance(part, str) else part
+            if fh.read(len(data)) != data:
+                return False
+        return not fh.read(1)
+
+
+def _utf8_len(part: str | bytes) -> int:
+    if isinstance(part, bytes) or part.isascii():
+        return len(part)
+    return len(part.encode("utf-8"))
+
+
 def load_auth_config(path: str = "auth.txt") -> AuthConfig:
     """Load key=value lines from auth.txt into a dict.
     Ignores lines without '=' and whitespace-only lines.
@@ -104,13 +167,12 @@ def load_auth_config(path: str = "auth.txt") -> AuthConfig:
     config: dict[str, str] = {}
     if not Path(path).is_file():
         raise FileNotFoundError(path)
-    with Path(path).open(encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line or "=" not in line:
-                continue
-            key, value = line.split("=", 1)
-            config[key.strip()] = value.strip()
+    for raw in Path(path).read_text(encoding="utf-8").splitlines():
+        line = raw.strip()
+        if not line or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        config[key.strip()] = value.strip()
     return cast(AuthConfig, config)
 
 
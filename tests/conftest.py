@@ -3,10 +3,17 @@
 from __future__ import annotations
 
 import base64
+import importlib
+import importlib.util
 import io
 import json
+import os
+import shutil
+import subprocess
+import sys
+import venv
 from pathlib import Path
-from types import SimpleNamespace
+from types import ModuleType, SimpleNamespace
 
 import httpx
 import pytest
@@ -67,8 +74,7 @@ def _write(
         root: Path, items: list[dict[str, object]], *, create_images: bool = False
     ) -> Path:
         (root / "images").mkdir(parents=True, exist_ok=True)
-        with open(root / "metadata.json", "w", encoding="utf-8") as f:
-            json.dump(items, f)
+        (root / "metadata.json").write_text(json.dumps(items), encoding="utf-8")
         if create_images:
             for item in items:
                 (root / "images" / str(item["filename"])).write_text("img")
@@ -77,6 +83,80 @@ def _write(
     return _write
 
 
+@pytest.fixture
+def seeded_gallery(tmp_path: Path, write_metadata) -> Path:
+    """``tmp_path / "gallery"`` holding one image, ``a.jpg``, and its metadata."""
+    return write_metadata(
+        tmp_path / "gallery",
+        [{"id": "1", "filename": "a.jpg", "created_at": 1}],
+        create_images=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def cli_module() -> ModuleType:
+    """The ``chatgpt_library_archiver.__main__`` entry-point module."""
+    return importlib.import_module("chatgpt_library_archiver.__main__")
+
+
+@pytest.fixture(scope="session")
+def built_wheel(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Wheel built from the working tree, once per session."""
+    if importlib.util.find_spec("build") is None:
+        pytest.skip("build package is required to build wheels for this test")
+
+    project_root = Path(__file__).resolve().parents[1]
+    wheel_dir = tmp_path_factory.mktemp("wheel")
+    build_dir = project_root / "build"
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "build", "--wheel", "--outdir", str(wheel_dir)],
+            cwd=project_root,
+            check=True,
+            capture_output=True,
+        )
+    finally:
+        if build_dir.exists():
+            shutil.rmtree(build_dir)
+
+    wheels = list(wheel_dir.glob("chatgpt_library_archiver-*.whl"))
+    assert wheels, "Wheel build did not produce any artifacts"
+    return wheels[0]
+
+
+@pytest.fixture(scope="session")
+def installed_venv(built_wheel: Path, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Scripts directory of a venv with :func:`built_wheel` installed.
+
+    The venv is created once per session. Only the wheel itself is installed
+    (``--no-deps``), which is enough for the console script to print help
+    and keeps the fixture off the network.
+    """
+    venv_dir = tmp_path_factory.mktemp("venv")
+    venv.EnvBuilder(with_pip=True, symlinks=os.name != "nt").create(venv_dir)
+    bin_dir = venv_dir / ("Scripts" if os.name == "nt" else "bin")
+    python_bin = bin_dir / ("python.exe" if os.name == "nt" else "python")
+
+    isolated_env = os.environ.copy()
+    isolated_env.pop("PYTHONPATH", None)
+    subprocess.run(
+        [
+            str(python_bin),
+            "-m",
+            "pip",
+            "install",
+            "--no-deps",
+            "--disable-pip-version-check",
+            str(built_wheel),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=isolated_env,
+    )
+    return bin_dir
+
+
 # ---------------------------------------------------------------------------
 # Reusable OpenAI mock helpers
 # ---------------------------------------------------------------------------
@@ -81,6 +81,44 @@ def __init__(self, **kwargs):
     assert captured_kwargs.get("max_retries") == 0
 
 
+@pytest.mark.parametrize("http2", [False, True])
+def test_get_cached_client_uses_http2_when_h2_is_installed(monkeypatch, http2):
+    captured_kwargs: dict = {}
+
+    class FakeOpenAI:
+        def __init__(self, **kwargs):
+            captured_kwargs.update(kwargs)
+
+    monkeypatch.setattr(ai, "OpenAI", FakeOpenAI)
+    monkeypatch.setattr(ai, "_HTTP2_AVAILABLE", http2)
+    monkeypatch.setattr("openai.DefaultHttpxClient", lambda **kwargs: ("httpx", kwargs))
+    ai.reset_client_cache()
+
+    ai.get_cached_client("key-h2")
+    if http2:
+        assert captured_kwargs["http_client"] == ("httpx", {"http2": True})
+    else:
+        assert "http_client" not in captured_kwargs
+
+
+def test_get_cached_client_falls_back_to_httpx_without_default_client(monkeypatch):
+    captured_kwargs: dict = {}
+
+    class FakeOpenAI:
+        def __init__(self, **kwargs):
+            captured_kwargs.update(kwargs)
+
+    monkeypatch.setattr(ai, "OpenAI", FakeOpenAI)
+    monkeypatch.setattr(ai, "_HTTP2_AVAILABLE", True)
+    # Older openai releases do not export DefaultHttpxClient.
+    monkeypatch.delattr("openai.DefaultHttpxClient", raising=False)
+    monkeypatch.setattr("httpx.Client", lambda **kwargs: ("plain-httpx", kwargs))
+    ai.reset_client_cache()
+
+    ai.get_cached_client("key-old-sdk")
+    assert captured_kwargs["http_client"] == ("plain-httpx", {"http2": True})
+
+
 # ---------------------------------------------------------------------------
 # resolve_config
 # ---------------------------------------------------------------------------
@@ -554,6 +592,20 @@ def test_encode_image_small_file_passed_through(tmp_path):
     assert data_url == f"data:image/png;base64,{encoded}"
 
 
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 10, 11])
+def test_data_url_encodes_in_aligned_chunks(monkeypatch, size):
+    """Chunked encoding produces the same payload as a single b64encode."""
+    import base64
+    import io
+
+    monkeypatch.setattr(ai, "_B64_READ_SIZE", 3)
+    data = bytes(range(size))
+
+    result = ai._data_url("image/png", io.BytesIO(data))
+
+    assert result == "data:image/png;base64," + base64.b64encode(data).decode()
+
+
 def test_encode_image_large_file_resized_to_jpeg(tmp_path):
     """13.1 — Files >500KB are resized to ≤1024px and converted to JPEG."""
     img_path = tmp_path / "large.png"
@@ -60,7 +60,14 @@ def test_select_installer_falls_back_to_pip(monkeypatch):
     )
     assert bootstrap.select_installer(env) == (
         "pip",
-        ("python", "-m", "pip", "install"),
+        (
+            "python",
+            "-m",
+            "pip",
+            "install",
+            "--no-input",
+            "--disable-pip-version-check",
+        ),
     )
 
 
@@ -145,3 +152,86 @@ def test_ensure_environment_uses_project_venv(monkeypatch, tmp_path):
     assert env.is_active is False
     assert env.python == str(python_path)
     assert env.prefix == str(venv_dir)
+
+
+def test_install_dependencies_skips_unchanged_requirements(
+    monkeypatch, capsys, tmp_path
+):
+    env = bootstrap.EnvironmentInfo(
+        prefix=str(tmp_path),
+        python="python",
+        is_active=False,
+        created=False,
+    )
+    requirement = tmp_path / "requirements.txt"
+    requirement.write_text("requests==2.0\n")
+    monkeypatch.setattr(
+        bootstrap,
+        "select_installer",
+        lambda env: ("pip", ("python", "-m", "pip", "install")),
+    )
+    called = []
+    monkeypatch.setattr(bootstrap.subprocess, "check_call", called.append)
+
+    bootstrap.install_dependencies(env, [str(requirement)])
+    bootstrap.install_dependencies(env, [str(requirement)])
+    assert len(called) == 1
+    assert "up to date" in capsys.readouterr().out
+
+    requirement.write_text("requests==2.1\n")
+    bootstrap.install_dependencies(env, [str(requirement)])
+    assert len(called) == 2
+
+
+def test_install_dependencies_does_not_stamp_failed_install(monkeypatch, tmp_path):
+    env = bootstrap.EnvironmentInfo(
+        prefix=str(tmp_path),
+        python="python",
+        is_active=False,
+        created=False,
+    )
+    requirement = tmp_path / "requirements.txt"
+    requirement.write_text("")
+    monkeypatch.setattr(
+        bootstrap,
+        "select_installer",
+        lambda env: ("pip", ("python", "-m", "pip", "install")),
+    )
+
+    def failing_call(cmd):
+        raise bootstrap.subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(bootstrap.subprocess, "check_call", failing_call)
+    with pytest.raises(bootstrap.subprocess.CalledProcessError):
+        bootstrap.install_dependencies(env, [str(requirement)])
+    assert not (tmp_path / bootstrap.REQUIREMENTS_STAMP).exists()
+
+
+@pytest.mark.parametrize("is_active", [True, False])
+def test_main_reenters_cli_in_process_when_env_is_active(
+    monkeypatch, cli_module, is_active
+):
+    env = bootstrap.EnvironmentInfo(
+        prefix="/env", python="venv-python", is_active=is_active, created=False
+    )
+    monkeypatch.setattr(bootstrap, "ensure_environment", lambda root: env)
+    monkeypatch.setattr(bootstrap, "install_dependencies", lambda env, reqs: None)
+    calls = []
+    monkeypatch.setattr(
+        bootstrap.subprocess, "call", lambda cmd: calls.append(("spawn", cmd)) or 3
+    )
+    monkeypatch.setattr(
+        cli_module, "main", lambda argv: calls.append(("cli", argv)) or 5
+    )
+
+    with pytest.raises(SystemExit) as excinfo:
+        bootstrap.main(tag_new=True)
+
+    if is_active:
+        assert calls == [("cli", ["--tag-new"])]
+        assert excinfo.value.code == 5
+    else:
+        assert calls == [
+            ("spawn", ["venv-python", "-m", "chatgpt_library_archiver", "--tag-new"])
+        ]
+        assert excinfo.value.code == 3
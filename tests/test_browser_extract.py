@@ -10,6 +10,7 @@
 import stat
 import subprocess
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
@@ -744,15 +745,11 @@ def _make_mock_http_client_for_scrape(
     The scrape function accesses ``client._get_session().get(...).text``.
     """
 
-    class _FakeResponse:
-        def __init__(self):
-            self.text = html or ""
-
     class _FakeSession:
         def get(self, url, *, headers=None, timeout=None, allow_redirects=None):
             if exc:
                 raise exc
-            return _FakeResponse()
+            return SimpleNamespace(text=html or "")
 
     class _MockHttpClient:
         def __init__(self, **_kwargs):
@@ -1,12 +1,9 @@
-import importlib
-import importlib.util
 import json
 import os
 import platform
-import shutil
 import subprocess
 import sys
-import venv
+from importlib.metadata import entry_points
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -16,8 +13,7 @@
 from chatgpt_library_archiver.metadata import GalleryItem
 
 
-def test_main_sets_assume_yes(monkeypatch):
-    module = importlib.import_module("chatgpt_library_archiver.__main__")
+def test_main_sets_assume_yes(monkeypatch, cli_module):
     # Ensure monkeypatch tracks the key and starts with it unset.
     # setenv records the original state; delenv then removes the key.
     monkeypatch.setenv("ARCHIVER_ASSUME_YES", "")
@@ -36,38 +32,41 @@ def run(self, args):
             return 42
 
     dummy_cli = DummyCLI()
-    monkeypatch.setattr(module, "build_app", lambda printer=print: dummy_cli)
+    monkeypatch.setattr(cli_module, "build_app", lambda printer=print: dummy_cli)
 
     expected_exit_code = 42
-    result = module.main(["--yes"], printer=lambda _: None)
+    result = cli_module.main(["--yes"], printer=lambda _: None)
 
     assert result == expected_exit_code
     assert dummy_cli.run_called_with is dummy_cli.parsed
     assert os.environ["ARCHIVER_ASSUME_YES"] == "1"
 
 
-def test_gallery_subcommand(monkeypatch, tmp_path):
-    # Run within temporary directory
+@pytest.fixture
+def run_cli(monkeypatch, tmp_path, cli_module):
+    """Run the console entry point as ``chatgpt_library_archiver *args``.
+
+    The test runs inside ``tmp_path`` so relative paths like ``gallery/`` are
+    isolated.
+    """
     monkeypatch.chdir(tmp_path)
 
+    def _run(*args: str) -> None:
+        monkeypatch.setattr(sys, "argv", ["chatgpt_library_archiver", *args])
+        cli_module.main()
+
+    return _run
+
+
+def test_gallery_subcommand(monkeypatch, run_cli, seeded_gallery):
     # Ensure downloader is not invoked
     def fail(tag_new=False):  # pragma: no cover - should not be called
         raise AssertionError("incremental downloader should not run")
 
     monkeypatch.setattr(incremental_downloader, "main", fail)
 
-    # Seed existing gallery data
-    gallery = Path("gallery")
-    (gallery / "images").mkdir(parents=True)
-    (gallery / "images" / "a.jpg").write_text("img")
-    with open(gallery / "metadata.json", "w", encoding="utf-8") as f:
-        json.dump([{"id": "1", "filename": "a.jpg", "created_at": 1}], f)
-
-    # Invoke CLI to regenerate gallery
-    monkeypatch.setattr(sys, "argv", ["chatgpt_library_archiver", "gallery"])
-
-    cli = importlib.import_module("chatgpt_library_archiver.__main__")
-    cli.main()
+    # Regenerate the gallery from the seeded data
+    run_cli("gallery")
 
     # Gallery regenerated from existing metadata
     assert Path("gallery/images/a.jpg").exists()
@@ -76,9 +75,7 @@ def fail(tag_new=False):  # pragma: no cover - should not be called
     assert Path("gallery/index.html").exists()
 
 
-def test_gallery_subcommand_with_thumbnails(monkeypatch, tmp_path):
-    monkeypatch.chdir(tmp_path)
-
+def test_gallery_subcommand_with_thumbnails(monkeypatch, run_cli, seeded_gallery):
     calls = {}
 
     def fake_regen(gallery_root="gallery", force=False, webp=False):
@@ -88,40 +85,24 @@ def fake_regen(gallery_root="gallery", force=False, webp=False):
 
     monkeypatch.setattr(importer, "regenerate_thumbnails", fake_regen)
 
-    gallery = Path("gallery")
-    (gallery / "images").mkdir(parents=True)
-    (gallery / "images" / "a.jpg").write_text("img")
-    with open(gallery / "metadata.json", "w", encoding="utf-8") as f:
-        json.dump([{"id": "1", "filename": "a.jpg", "created_at": 1}], f)
-
-    monkeypatch.setattr(
-        sys,
-        "argv",
-        [
-            "chatgpt_library_archiver",
-            "gallery",
-            "--gallery",
-            "gallery",
-            "--regenerate-thumbnails",
-            "--force-thumbnails",
-        ],
+    run_cli(
+        "gallery",
+        "--gallery",
+        "gallery",
+        "--regenerate-thumbnails",
+        "--force-thumbnails",
     )
-    cli = importlib.import_module("chatgpt_library_archiver.__main__")
-    cli.main()
 
     assert calls["gallery_root"] == "gallery"
     assert calls["force"] is True
 
 
-def test_tag_subcommand(monkeypatch, tmp_path):
-    monkeypatch.chdir(tmp_path)
-
-    # create minimal gallery
-    gallery = Path("gallery")
-    (gallery / "images").mkdir(parents=True)
-    (gallery / "images" / "a.jpg").write_text("img")
-    with open(gallery / "metadata.json", "w", encoding="utf-8") as f:
-        json.dump([{"id": "1", "filename": "a.jpg", "tags": ["old"]}], f)
+def test_tag_subcommand(monkeypatch, run_cli, write_metadata):
+    write_metadata(
+        Path("gallery"),
+        [{"id": "1", "filename": "a.jpg", "tags": ["old"]}],
+        create_images=True,
+    )
 
     called = {}
 
@@ -135,43 +116,24 @@ def fake_remove_tags(**kwargs):
 
     monkeypatch.setattr(tagger, "tag_images", fake_tag_images)
     monkeypatch.setattr(tagger, "remove_tags", fake_remove_tags)
-    monkeypatch.setattr(
-        sys, "argv", ["chatgpt_library_archiver", "tag", "--remove-all"]
-    )
-
-    cli = importlib.import_module("chatgpt_library_archiver.__main__")
-    cli.main()
+    run_cli("tag", "--remove-all")
 
     assert "remove" in called
     assert called["remove"]["ids"] is None
     assert called["remove"]["gallery_root"] == "gallery"
 
 
-def test_download_tag_new_flag(monkeypatch, tmp_path):
-    monkeypatch.chdir(tmp_path)
-
-    called = {}
-
-    def fake_main(tag_new=False, browser=None, max_workers=6, webp=False):
-        called["tag_new"] = tag_new
-        called["browser"] = browser
-
-    monkeypatch.setattr(incremental_downloader, "main", fake_main)
-    monkeypatch.setattr(
-        sys, "argv", ["chatgpt_library_archiver", "download", "--tag-new"]
-    )
-
-    cli = importlib.import_module("chatgpt_library_archiver.__main__")
-    cli.main()
-
-    assert called.get("tag_new") is True
-    assert called.get("browser") is None
-
-
-def test_download_browser_flag_edge(monkeypatch, tmp_path):
-    """download --browser edge sets browser='edge' and passes it to the runner."""
-    monkeypatch.chdir(tmp_path)
-
+@pytest.mark.parametrize(
+    ("flags", "tag_new", "browser"),
+    [
+        (["--tag-new"], True, None),
+        (["--browser", "edge"], False, "edge"),
+        (["--browser", "chrome", "--tag-new"], True, "chrome"),
+    ],
+    ids=["tag-new", "edge", "chrome-tag-new"],
+)
+def test_download_flags(monkeypatch, run_cli, flags, tag_new, browser):
+    """download passes --tag-new and --browser through to the runner."""
     called = {}
 
     def fake_main(tag_new=False, browser=None, max_workers=6, webp=False):
@@ -179,50 +141,39 @@ def fake_main(tag_new=False, browser=None, max_workers=6, webp=False):
         called["browser"] = browser
 
     monkeypatch.setattr(incremental_downloader, "main", fake_main)
-    monkeypatch.setattr(
-        sys, "argv", ["chatgpt_library_archiver", "download", "--browser", "edge"]
-    )
+    run_cli("download", *flags)
 
-    cli = importlib.import_module("chatgpt_library_archiver.__main__")
-    cli.main()
+    assert called == {"tag_new": tag_new, "browser": browser}
 
-    assert called["browser"] == "edge"
-    assert called["tag_new"] is False
 
-
-def test_download_browser_flag_chrome(monkeypatch, tmp_path):
-    """download --browser chrome sets browser='chrome' and passes it to the runner."""
-    monkeypatch.chdir(tmp_path)
+@pytest.mark.parametrize(
+    ("env", "flags", "expected"),
+    [
+        (None, [], False),
+        (None, ["--webp-thumbnails"], True),
+        ("1", [], True),
+        ("1", ["--no-webp-thumbnails"], False),
+    ],
+)
+def test_download_webp_thumbnails_default(monkeypatch, run_cli, env, flags, expected):
+    """ARCHIVER_WEBP_THUMBNAILS defaults to WebP; the flags still override it."""
+    if env is None:
+        monkeypatch.delenv("ARCHIVER_WEBP_THUMBNAILS", raising=False)
+    else:
+        monkeypatch.setenv("ARCHIVER_WEBP_THUMBNAILS", env)
 
     called = {}
 
     def fake_main(tag_new=False, browser=None, max_workers=6, webp=False):
-        called["tag_new"] = tag_new
-        called["browser"] = browser
+        called["webp"] = webp
 
     monkeypatch.setattr(incremental_downloader, "main", fake_main)
-    monkeypatch.setattr(
-        sys,
-        "argv",
-        [
-            "chatgpt_library_archiver",
-            "download",
-            "--browser",
-            "chrome",
-            "--tag-new",
-        ],
-    )
-
-    cli = importlib.import_module("chatgpt_library_archiver.__main__")
-    cli.main()
-
-    assert called["browser"] == "chrome"
-    assert called["tag_new"] is True
+    run_cli("download", *flags)
 
+    assert called["webp"] is expected
 
-def test_import_subcommand(monkeypatch, tmp_path):
-    monkeypatch.chdir(tmp_path)
 
+def test_import_subcommand(monkeypatch, run_cli):
     called = {}
 
     def fake_import_images(*, inputs, config=None):
@@ -232,95 +183,64 @@ def fake_import_images(*, inputs, config=None):
 
     monkeypatch.setattr(importer, "import_images", fake_import_images)
     monkeypatch.setattr(importer, "regenerate_thumbnails", lambda **kwargs: [])
-    monkeypatch.setattr(
-        sys,
-        "argv",
-        [
-            "chatgpt_library_archiver",
-            "import",
-            "example.png",
-            "--copy",
-            "--tag",
-            "demo",
-        ],
-    )
-
-    cli = importlib.import_module("chatgpt_library_archiver.__main__")
-    cli.main()
+    run_cli("import", "example.png", "--copy", "--tag", "demo")
 
     assert called["inputs"] == ["example.png"]
     assert called["config"].copy_files is True
     assert called["config"].tags == ["demo"]
 
 
+def test_entry_point_defers_heavy_imports():
+    code = (
+        "import sys, chatgpt_library_archiver.__main__; "
+        "print(sorted(m for m in ('PIL', 'openai', 'requests') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_console_script_entry_point_prints_help(monkeypatch, capsys):
+    """The installed ``chatgpt-archiver`` entry point resolves and runs --help.
+
+    The wheel-install test below covers packaging end to end but is opt-in
+    (``-m slow``); this checks the console-script wiring on every run.
+    """
+    (entry_point,) = entry_points(group="console_scripts", name="chatgpt-archiver")
+    main = entry_point.load()
+    monkeypatch.setattr(sys, "argv", ["chatgpt-archiver", "--help"])
+
+    with pytest.raises(SystemExit) as excinfo:
+        main()
+
+    assert excinfo.value.code == 0
+    assert "usage: chatgpt-archiver" in capsys.readouterr().out
+
+
 @pytest.mark.slow
 @pytest.mark.integration
 @pytest.mark.skipif(
     platform.python_implementation() != "CPython",
     reason="Building wheels is only supported on CPython",
 )
-def test_console_script_help_via_built_wheel(tmp_path):
-    if importlib.util.find_spec("build") is None:
-        pytest.skip("build package is required to build wheels for this test")
-
-    project_root = Path(__file__).resolve().parents[1]
-    wheel_dir = tmp_path / "wheel"
-    wheel_dir.mkdir()
-    build_dir = project_root / "build"
-
-    venv_dir = tmp_path / "venv"
-    bin_dir = venv_dir / ("Scripts" if os.name == "nt" else "bin")
-    python_name = "python.exe" if os.name == "nt" else "python"
+def test_console_script_help_via_built_wheel(installed_venv):
     script_name = "chatgpt-archiver.exe" if os.name == "nt" else "chatgpt-archiver"
-
-    try:
-        subprocess.run(
-            [
-                sys.executable,
-                "-m",
-                "build",
-                "--wheel",
-                "--outdir",
-                str(wheel_dir),
-            ],
-            cwd=project_root,
-            check=True,
-            capture_output=True,
-        )
-
-        wheels = list(wheel_dir.glob("chatgpt_library_archiver-*.whl"))
-        assert wheels, "Wheel build did not produce any artifacts"
-        wheel_path = wheels[0]
-
-        venv.EnvBuilder(with_pip=True, upgrade_deps=True).create(venv_dir)
-        python_bin = bin_dir / python_name
-
-        isolated_env = os.environ.copy()
-        isolated_env.pop("PYTHONPATH", None)
-        install_result = subprocess.run(
-            [str(python_bin), "-m", "pip", "install", str(wheel_path)],
-            check=True,
-            capture_output=True,
-            text=True,
-            env=isolated_env,
-        )
-
-        script_path = bin_dir / script_name
-        failure_message = (
-            "console script not installed:\n"
-            f"{install_result.stdout}\n{install_result.stderr}"
-        )
-        assert script_path.exists(), failure_message
-        result = subprocess.run(
-            [str(script_path), "--help"],
-            check=True,
-            capture_output=True,
-            text=True,
-            env=isolated_env,
-        )
-    finally:
-        if build_dir.exists():
-            shutil.rmtree(build_dir)
+    script_path = installed_venv / script_name
+    assert script_path.exists(), "console script not installed"
+
+    isolated_env = os.environ.copy()
+    isolated_env.pop("PYTHONPATH", None)
+    result = subprocess.run(
+        [str(script_path), "--help"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=isolated_env,
+    )
 
     assert "usage: chatgpt-archiver" in result.stdout
 
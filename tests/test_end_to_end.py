@@ -1,5 +1,10 @@
 import hashlib
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
 from urllib.parse import urlparse
 
 import pytest
@@ -9,6 +14,17 @@
 from chatgpt_library_archiver.incremental_downloader import _sanitize_id
 
 
+def _write_download(destination, payload: bytes) -> DownloadResult:
+    """Write *payload* to *destination* as a fake ``stream_download`` would."""
+    destination.write_bytes(payload)
+    return DownloadResult(
+        path=destination,
+        bytes_downloaded=len(payload),
+        checksum=hashlib.sha256(payload).hexdigest(),
+        content_type="image/png",
+    )
+
+
 @pytest.mark.integration
 def test_incremental_download_and_gallery(monkeypatch, tmp_path, sample_png_bytes):
     # Operate within a temporary working directory
@@ -38,14 +54,11 @@ def test_incremental_download_and_gallery(monkeypatch, tmp_path, sample_png_byte
 
     tagged = {}
 
-    def fake_tag_images(gallery_root="gallery", ids=None, **kwargs):
+    def fake_tag_images(gallery_root="gallery", ids=None, *, items, **kwargs):
         tagged["ids"] = list(ids or [])
-        meta = tmp_path / gallery_root / "metadata.json"
-        data = json.loads(meta.read_text())
-        for item in data:
-            if not ids or item["id"] in ids:
-                item["tags"] = ["t"]
-        meta.write_text(json.dumps(data))
+        for item in items:
+            if not ids or item.id in ids:
+                item.tags = ["t"]
         return len(tagged["ids"])
 
     monkeypatch.setattr(incremental_downloader.tagger, "tag_images", fake_tag_images)
@@ -55,8 +68,10 @@ def fake_tag_images(gallery_root="gallery", ids=None, **kwargs):
     images_dir.mkdir(parents=True)
     (images_dir / "1.png").write_bytes(sample_png_bytes)
     meta_path = tmp_path / "gallery" / "metadata.json"
-    with open(meta_path, "w", encoding="utf-8") as f:
-        json.dump([{"id": "1", "filename": "1.png", "created_at": 1}], f)
+    meta_path.write_text(
+        json.dumps([{"id": "1", "filename": "1.png", "created_at": 1}]),
+        encoding="utf-8",
+    )
 
     # Mock network requests for both metadata and image download
     calls = {"meta": 0}
@@ -98,14 +113,7 @@ def get_json(self, url, headers=None):
         def stream_download(self, url, destination, headers=None, **kwargs):
             if url == "https://img.local/2.png":
                 destination.parent.mkdir(parents=True, exist_ok=True)
-                destination.write_bytes(sample_png_bytes)
-                checksum = hashlib.sha256(sample_png_bytes).hexdigest()
-                return DownloadResult(
-                    path=destination,
-                    bytes_downloaded=len(sample_png_bytes),
-                    checksum=checksum,
-                    content_type="image/png",
-                )
+                return _write_download(destination, sample_png_bytes)
             if url == "https://img.local/1.png":
                 raise AssertionError("Should not re-download existing image")
             raise AssertionError(f"Unexpected download URL {url}")
@@ -145,75 +153,107 @@ def stream_download(self, url, destination, headers=None, **kwargs):
     assert "var GALLERY_DATA = " in html
 
 
-@pytest.mark.integration
-def test_incremental_download_with_browser_calls_extract_auth(monkeypatch, tmp_path):
-    """browser= passed → calls extract_auth_config, not ensure_auth_config."""
-    monkeypatch.chdir(tmp_path)
-
-    auth_calls = {"extract": 0, "ensure": 0}
-    fake_config = {
-        "url": "https://api.example.com?limit=1",
-        "authorization": "Bearer tok",
-        "cookie": "session=abc",
-        "referer": "https://chat.openai.com/library",
-        "user_agent": "agent",
-        "oai_client_version": "1",
-        "oai_device_id": "dev",
-        "oai_language": "en",
-    }
-
-    def fake_extract(browser):
-        auth_calls["extract"] += 1
-        assert browser == "edge"
-        return fake_config
+_AUTH_CONFIG = {
+    "url": "https://api.example.com?limit=1",
+    "authorization": "Bearer tok",
+    "cookie": "session=abc",
+    "referer": "https://chat.openai.com/library",
+    "user_agent": "agent",
+    "oai_client_version": "1",
+    "oai_device_id": "dev",
+    "oai_language": "en",
+}
 
-    def fake_ensure(path="auth.txt"):
-        auth_calls["ensure"] += 1
-        return fake_config
 
-    monkeypatch.setattr(
-        "chatgpt_library_archiver.browser_extract.extract_auth_config",
-        fake_extract,
-    )
+@pytest.mark.integration
+def test_main_tag_new_writes_metadata_once(monkeypatch, tmp_path, sample_png_bytes):
+    """Downloading and tagging new images rewrites metadata.json a single time."""
+    monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(
         incremental_downloader,
         "ensure_auth_config",
-        fake_ensure,
+        lambda path="auth.txt": _AUTH_CONFIG,
+    )
+    monkeypatch.setattr(incremental_downloader, "prompt_yes_no", lambda msg: True)
+    tagger = incremental_downloader.tagger
+    monkeypatch.setattr(
+        tagger,
+        "ensure_tagging_config",
+        lambda *a, **kw: SimpleNamespace(api_key="k", prompt="p", model="m"),
+    )
+    monkeypatch.setattr(tagger, "get_cached_client", lambda api_key: object())
+    monkeypatch.setattr(
+        tagger,
+        "generate_tags",
+        lambda *a, **kw: (["t"], SimpleNamespace(total_tokens=None, latency_s=0.0)),
+    )
+    images_dir = tmp_path / "gallery" / "images"
+    images_dir.mkdir(parents=True)
+    (images_dir / "old.png").write_bytes(sample_png_bytes)
+    (tmp_path / "gallery" / "metadata.json").write_text(
+        json.dumps([{"id": "old", "filename": "old.png", "created_at": 1}])
     )
-    monkeypatch.setattr(incremental_downloader, "prompt_yes_no", lambda msg: False)
 
-    (tmp_path / "gallery").mkdir()
+    class FakeHttpClient:
+        def __enter__(self):
+            return self
 
-    incremental_downloader.main(browser="edge")
+        def __exit__(self, *a):
+            return False
 
-    assert auth_calls["extract"] == 1
-    assert auth_calls["ensure"] == 0
+        def get_json(self, url, headers=None):
+            return {
+                "items": [
+                    {"id": "n1", "url": "https://img.local/n1", "created_at": 2},
+                    {"id": "n2", "url": "https://img.local/n2", "created_at": 3},
+                ]
+            }
+
+        def stream_download(self, url, destination, headers=None, **kwargs):
+            return _write_download(destination, sample_png_bytes)
+
+    monkeypatch.setattr(incremental_downloader, "create_http_client", FakeHttpClient)
+    real_replace = os.replace
+    metadata_writes: list[str] = []
+
+    def counting_replace(src, dst):
+        if Path(dst).name == "metadata.json":
+            metadata_writes.append(str(dst))
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", counting_replace)
+
+    incremental_downloader.main(tag_new=True, max_workers=1)
+
+    assert len(metadata_writes) == 1
+    metadata = json.loads((tmp_path / "gallery" / "metadata.json").read_text())
+    assert {item["id"]: item["tags"] for item in metadata} == {
+        "n2": ["t"],
+        "n1": ["t"],
+        "old": [],
+    }
 
 
 @pytest.mark.integration
-def test_incremental_download_without_browser_calls_ensure_auth(monkeypatch, tmp_path):
-    """browser= None (default) → calls ensure_auth_config."""
+@pytest.mark.parametrize(
+    ("browser", "expected"),
+    [("edge", {"extract": 1, "ensure": 0}), (None, {"extract": 0, "ensure": 1})],
+    ids=["browser", "auth-file"],
+)
+def test_incremental_download_auth_source(monkeypatch, tmp_path, browser, expected):
+    """browser= reads credentials from the browser; otherwise from auth.txt."""
     monkeypatch.chdir(tmp_path)
 
     auth_calls = {"extract": 0, "ensure": 0}
-    fake_config = {
-        "url": "https://api.example.com?limit=1",
-        "authorization": "Bearer tok",
-        "cookie": "session=abc",
-        "referer": "https://chat.openai.com/library",
-        "user_agent": "agent",
-        "oai_client_version": "1",
-        "oai_device_id": "dev",
-        "oai_language": "en",
-    }
 
     def fake_extract(browser):
         auth_calls["extract"] += 1
-        return fake_config
+        assert browser == "edge"
+        return _AUTH_CONFIG
 
     def fake_ensure(path="auth.txt"):
         auth_calls["ensure"] += 1
-        return fake_config
+        return _AUTH_CONFIG
 
     monkeypatch.setattr(
         "chatgpt_library_archiver.browser_extract.extract_auth_config",
@@ -228,10 +268,9 @@ def fake_ensure(path="auth.txt"):
 
     (tmp_path / "gallery").mkdir()
 
-    incremental_downloader.main()
+    incremental_downloader.main(browser=browser)
 
-    assert auth_calls["extract"] == 0
-    assert auth_calls["ensure"] == 1
+    assert auth_calls == expected
 
 
 # -------------------------------------------------------------------
@@ -240,23 +279,19 @@ def fake_ensure(path="auth.txt"):
 
 
 @pytest.mark.integration
-def test_main_default_max_workers_is_six(monkeypatch, tmp_path, sample_png_bytes):
-    """main() should default to max_workers=6 and pass it to ThreadPoolExecutor."""
+@pytest.mark.parametrize(
+    ("kwargs", "expected"),
+    [({}, 6), ({"max_workers": 2}, 2)],
+    ids=["default", "custom"],
+)
+def test_main_max_workers(monkeypatch, tmp_path, sample_png_bytes, kwargs, expected):
+    """main() passes max_workers, 6 by default, to the ThreadPoolExecutor."""
     monkeypatch.chdir(tmp_path)
 
     monkeypatch.setattr(
         incremental_downloader,
         "ensure_auth_config",
-        lambda path="auth.txt": {
-            "url": "https://api.example.com?limit=1",
-            "authorization": "Bearer token",
-            "cookie": "session=abc",
-            "referer": "https://chat.openai.com/library",
-            "user_agent": "agent",
-            "oai_client_version": "1",
-            "oai_device_id": "dev",
-            "oai_language": "en",
-        },
+        lambda path="auth.txt": _AUTH_CONFIG,
     )
     monkeypatch.setattr(incremental_downloader, "prompt_yes_no", lambda msg: True)
     monkeypatch.setattr(incremental_downloader.time, "sleep", lambda s: None)
@@ -294,13 +329,7 @@ def get_json(self, url, headers=None):
 
         def stream_download(self, url, destination, headers=None, **kwargs):
             destination.parent.mkdir(parents=True, exist_ok=True)
-            destination.write_bytes(sample_png_bytes)
-            return DownloadResult(
-                path=destination,
-                bytes_downloaded=len(sample_png_bytes),
-                checksum=hashlib.sha256(sample_png_bytes).hexdigest(),
-                content_type="image/png",
-            )
+            return _write_download(destination, sample_png_bytes)
 
     monkeypatch.setattr(
         incremental_downloader,
@@ -314,22 +343,23 @@ def stream_download(self, url, destination, headers=None, **kwargs):
 
     class RecordingTPE(_OrigTPE):
         def __init__(self, *args, **kwargs):
-            recorded_workers.append(kwargs.get("max_workers"))
+            if kwargs.get("thread_name_prefix") != "thumbnails":
+                recorded_workers.append(kwargs.get("max_workers"))
             super().__init__(*args, **kwargs)
 
     monkeypatch.setattr(incremental_downloader, "ThreadPoolExecutor", RecordingTPE)
 
-    # Call without explicit max_workers → default should be 6
-    incremental_downloader.main()
+    incremental_downloader.main(**kwargs)
 
-    assert recorded_workers == [6]
+    assert recorded_workers == [expected]
 
 
 @pytest.mark.integration
-def test_main_custom_max_workers(monkeypatch, tmp_path, sample_png_bytes):
-    """main(max_workers=N) should pass N to ThreadPoolExecutor."""
+def test_main_reuses_one_worker_pool_across_pages(
+    monkeypatch, tmp_path, sample_png_bytes
+):
+    """Worker threads (and their HTTP sessions) outlive each page of results."""
     monkeypatch.chdir(tmp_path)
-
     monkeypatch.setattr(
         incremental_downloader,
         "ensure_auth_config",
@@ -346,13 +376,13 @@ def test_main_custom_max_workers(monkeypatch, tmp_path, sample_png_bytes):
     )
     monkeypatch.setattr(incremental_downloader, "prompt_yes_no", lambda msg: True)
     monkeypatch.setattr(incremental_downloader.time, "sleep", lambda s: None)
-    monkeypatch.setattr(incremental_downloader.tagger, "tag_images", lambda **kw: 0)
+    (tmp_path / "gallery" / "images").mkdir(parents=True)
 
-    images_dir = tmp_path / "gallery" / "images"
-    images_dir.mkdir(parents=True)
-    (tmp_path / "gallery" / "metadata.json").write_text("[]")
-
-    recorded_workers: list[int | None] = []
+    pages = {
+        None: {"items": [{"id": "p1", "url": "https://img.local/1"}], "cursor": "c"},
+        "c": {"items": [{"id": "p2", "url": "https://img.local/2"}]},
+    }
+    threads: set[int] = set()
 
     class FakeHttpClient:
         def __enter__(self):
@@ -361,53 +391,227 @@ def __enter__(self):
         def __exit__(self, *a):
             return False
 
-        def close(self):
-            return None
-
         def get_json(self, url, headers=None):
-            parsed = urlparse(url)
-            if parsed.netloc == "api.example.com":
-                return {
-                    "items": [
-                        {
-                            "id": "w2",
-                            "url": "https://img.local/w2.png",
-                            "created_at": 1,
-                        }
-                    ]
-                }
-            return {"items": []}
+            cursor = url.partition("&after=")[2] or None
+            return pages[cursor]
 
         def stream_download(self, url, destination, headers=None, **kwargs):
-            destination.parent.mkdir(parents=True, exist_ok=True)
-            destination.write_bytes(sample_png_bytes)
-            return DownloadResult(
-                path=destination,
-                bytes_downloaded=len(sample_png_bytes),
-                checksum=hashlib.sha256(sample_png_bytes).hexdigest(),
-                content_type="image/png",
-            )
+            threads.add(threading.get_ident())
+            return _write_download(destination, sample_png_bytes)
+
+    monkeypatch.setattr(incremental_downloader, "create_http_client", FakeHttpClient)
+
+    incremental_downloader.main(max_workers=1)
+
+    metadata = json.loads((tmp_path / "gallery" / "metadata.json").read_text())
+    assert sorted(item["id"] for item in metadata) == ["p1", "p2"]
+    assert len(threads) == 1
 
+
+@pytest.mark.integration
+def test_main_requests_next_page_while_downloading(
+    monkeypatch, tmp_path, sample_png_bytes
+):
+    """The following page's listing is fetched while the current page downloads."""
+    monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(
         incremental_downloader,
-        "create_http_client",
-        FakeHttpClient,
+        "ensure_auth_config",
+        lambda path="auth.txt": {
+            "url": "https://api.example.com?limit=1",
+            "authorization": "Bearer token",
+            "cookie": "session=abc",
+            "referer": "https://chat.openai.com/library",
+            "user_agent": "agent",
+            "oai_client_version": "1",
+            "oai_device_id": "dev",
+            "oai_language": "en",
+        },
     )
+    monkeypatch.setattr(incremental_downloader, "prompt_yes_no", lambda msg: True)
+    monkeypatch.setattr(incremental_downloader.time, "sleep", lambda s: None)
+    (tmp_path / "gallery" / "images").mkdir(parents=True)
 
-    from concurrent.futures import ThreadPoolExecutor
+    pages = {
+        None: {"items": [{"id": "p1", "url": "https://img.local/1"}], "cursor": "c"},
+        "c": {"items": [{"id": "p2", "url": "https://img.local/2"}]},
+    }
+    requested: list[str | None] = []
+    second_page_requested = threading.Event()
+    overlapped: list[bool] = []
 
-    _OrigTPE = ThreadPoolExecutor
+    class FakeHttpClient:
+        def __enter__(self):
+            return self
 
-    class RecordingTPE(_OrigTPE):
-        def __init__(self, *args, **kwargs):
-            recorded_workers.append(kwargs.get("max_workers"))
-            super().__init__(*args, **kwargs)
+        def __exit__(self, *a):
+            return False
 
-    monkeypatch.setattr(incremental_downloader, "ThreadPoolExecutor", RecordingTPE)
+        def get_json(self, url, headers=None):
+            cursor = url.partition("&after=")[2] or None
+            requested.append(cursor)
+            if cursor == "c":
+                second_page_requested.set()
+            return pages[cursor]
+
+        def stream_download(self, url, destination, headers=None, **kwargs):
+            if url.endswith("/1"):
+                overlapped.append(second_page_requested.wait(timeout=5))
+            return _write_download(destination, sample_png_bytes)
+
+    monkeypatch.setattr(incremental_downloader, "create_http_client", FakeHttpClient)
 
     incremental_downloader.main(max_workers=2)
 
-    assert recorded_workers == [2]
+    assert overlapped == [True]
+    assert requested == [None, "c"]
+    metadata = json.loads((tmp_path / "gallery" / "metadata.json").read_text())
+    assert sorted(item["id"] for item in metadata) == ["p1", "p2"]
+
+
+@pytest.mark.parametrize(
+    ("content_type", "ext"),
+    [
+        ("image/png", ".png"),
+        ("image/jpeg; charset=binary", ".jpg"),
+        ("", ".jpg"),
+        ("application/x-unknown-thing", ".jpg"),
+    ],
+)
+def test_extension_for_content_type(content_type, ext):
+    assert incremental_downloader._extension_for(content_type) == ext
+
+
+def test_download_image_replaces_existing_file(tmp_path, sample_png_bytes):
+    gallery_root = tmp_path / "gallery"
+    images_dir = gallery_root / "images"
+    images_dir.mkdir(parents=True)
+    (images_dir / "x1.png").write_bytes(b"stale")
+
+    class FakeClient:
+        def stream_download(self, url, destination, **kwargs):
+            return _write_download(destination, sample_png_bytes)
+
+    status, _item, result, exc = incremental_downloader.download_image(
+        incremental_downloader.GalleryItem(id="x1", filename="", url="https://i/x"),
+        images_dir=images_dir,
+        gallery_root=gallery_root,
+        headers={},
+        client=FakeClient(),
+        progress=incremental_downloader.StatusReporter(disable=True),
+    )
+
+    assert (status, exc) == ("ok", None)
+    assert result.filename == "x1.png"
+    assert (images_dir / "x1.png").read_bytes() == sample_png_bytes
+    assert sorted(p.name for p in images_dir.iterdir()) == ["x1.png"]
+
+
+@pytest.mark.parametrize(
+    ("payload_fixture", "expected_status"),
+    [("sample_png_bytes", "ok"), (None, "error")],
+)
+def test_download_image_defers_thumbnails_to_executor(
+    request, tmp_path, payload_fixture, expected_status
+):
+    payload = request.getfixturevalue(payload_fixture) if payload_fixture else b"junk"
+    gallery_root = tmp_path / "gallery"
+    images_dir = gallery_root / "images"
+    images_dir.mkdir(parents=True)
+
+    class FakeClient:
+        def stream_download(self, url, destination, **kwargs):
+            return _write_download(destination, payload)
+
+    with ThreadPoolExecutor(max_workers=1) as thumbnail_executor:
+        result = incremental_downloader.download_image(
+            incremental_downloader.GalleryItem(id="x1", filename="", url="https://i/x"),
+            images_dir=images_dir,
+            gallery_root=gallery_root,
+            headers={},
+            client=FakeClient(),
+            progress=incremental_downloader.StatusReporter(disable=True),
+            thumbnail_executor=thumbnail_executor,
+        )
+        assert result[0] == "ok"
+        assert result[2].pending_thumbnails is not None
+        status, _item, _payload, _exc = incremental_downloader._await_thumbnails(result)
+
+    assert status == expected_status
+    thumb = gallery_root / "thumbs" / "medium" / "x1.png"
+    assert thumb.exists() == (expected_status == "ok")
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("interrupt", [False, True])
+def test_main_throttles_progress_saves(
+    monkeypatch, tmp_path, sample_png_bytes, interrupt
+):
+    """Pages do not each rewrite metadata.json; interruptions still save."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        incremental_downloader,
+        "ensure_auth_config",
+        lambda path="auth.txt": {
+            "url": "https://api.example.com?limit=1",
+            "authorization": "Bearer token",
+            "cookie": "session=abc",
+            "referer": "https://chat.openai.com/library",
+            "user_agent": "agent",
+            "oai_client_version": "1",
+            "oai_device_id": "dev",
+            "oai_language": "en",
+        },
+    )
+    monkeypatch.setattr(incremental_downloader, "prompt_yes_no", lambda msg: True)
+    monkeypatch.setattr(incremental_downloader.time, "sleep", lambda s: None)
+    (tmp_path / "gallery" / "images").mkdir(parents=True)
+
+    pages = {
+        None: {"items": [{"id": "p1", "url": "https://img.local/1"}], "cursor": "c"},
+        "c": {"items": [{"id": "p2", "url": "https://img.local/2"}], "cursor": "d"},
+        "d": {"items": [{"id": "p3", "url": "https://img.local/3"}]},
+    }
+
+    class FakeHttpClient:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *a):
+            return False
+
+        def get_json(self, url, headers=None):
+            cursor = url.partition("&after=")[2] or None
+            if interrupt and cursor == "d":
+                raise KeyboardInterrupt
+            return pages[cursor]
+
+        def stream_download(self, url, destination, headers=None, **kwargs):
+            return _write_download(destination, sample_png_bytes)
+
+    monkeypatch.setattr(incremental_downloader, "create_http_client", FakeHttpClient)
+    saves: list[int] = []
+    real_save = incremental_downloader.save_gallery_items
+
+    def counting_save(root, items, **kwargs):
+        saves.append(len(items))
+        real_save(root, items, **kwargs)
+
+    monkeypatch.setattr(incremental_downloader, "save_gallery_items", counting_save)
+
+    if interrupt:
+        with pytest.raises(KeyboardInterrupt):
+            incremental_downloader.main(max_workers=2)
+        assert saves == [2]
+        expected = 2
+    else:
+        incremental_downloader.main(max_workers=2)
+        # The gallery step writes the final metadata.json itself.
+        assert saves == []
+        expected = 3
+
+    metadata = json.loads((tmp_path / "gallery" / "metadata.json").read_text())
+    assert len(metadata) == expected
 
 
 def test_download_cli_passes_max_workers(monkeypatch):
@@ -554,13 +758,7 @@ def get_json(self, url, headers=None):
 
         def stream_download(self, url, destination, headers=None, **kwargs):
             destination.parent.mkdir(parents=True, exist_ok=True)
-            destination.write_bytes(sample_png_bytes)
-            return DownloadResult(
-                path=destination,
-                bytes_downloaded=len(sample_png_bytes),
-                checksum=hashlib.sha256(sample_png_bytes).hexdigest(),
-                content_type="image/png",
-            )
+            return _write_download(destination, sample_png_bytes)
 
     monkeypatch.setattr(
         incremental_downloader,
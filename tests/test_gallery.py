@@ -1,8 +1,13 @@
+import io
 import json
+import os
 import re
 import subprocess
 import textwrap
 from importlib import resources
+from types import SimpleNamespace
+
+import pytest
 
 from chatgpt_library_archiver.gallery import generate_gallery
 
@@ -149,12 +154,8 @@ def test_gallery_persists_theme_size_and_filter():
     assert "sessionStorage.getItem('filter-text')" in html
 
 
-def test_generate_gallery_creates_single_index(tmp_path, write_metadata):
-    gallery_root = tmp_path / "gallery"
-    gallery_root.mkdir()
-
-    write_metadata(gallery_root, [{"id": "1", "filename": "a.jpg", "created_at": 1}])
-    (gallery_root / "images" / "a.jpg").write_text("img")
+def test_generate_gallery_creates_single_index(seeded_gallery):
+    gallery_root = seeded_gallery
 
     generate_gallery(str(gallery_root))
     index = gallery_root / "index.html"
@@ -170,19 +171,88 @@ def test_generate_gallery_creates_single_index(tmp_path, write_metadata):
     assert "setAttribute('data-full'" in html
     assert '<main class="layout">' in html
 
-    with open(gallery_root / "metadata.json", encoding="utf-8") as f:
-        data = json.load(f)
+    data = json.loads((gallery_root / "metadata.json").read_text(encoding="utf-8"))
     data.append({"id": "2", "filename": "b.jpg", "created_at": 2})
-    with open(gallery_root / "metadata.json", "w", encoding="utf-8") as f:
-        json.dump(data, f)
+    (gallery_root / "metadata.json").write_text(json.dumps(data), encoding="utf-8")
     (gallery_root / "images" / "b.jpg").write_text("img")
 
     generate_gallery(str(gallery_root))
-    with open(gallery_root / "metadata.json", encoding="utf-8") as f:
-        sorted_data = json.load(f)
+    sorted_data = json.loads(
+        (gallery_root / "metadata.json").read_text(encoding="utf-8")
+    )
     assert [item["id"] for item in sorted_data] == ["2", "1"]
 
 
+def test_generate_gallery_skips_rewriting_unchanged_outputs(seeded_gallery):
+    gallery_root = seeded_gallery
+
+    generate_gallery(str(gallery_root))
+    index = gallery_root / "index.html"
+    meta = gallery_root / "metadata.json"
+    first = (index.stat().st_ino, meta.stat().st_ino, index.read_text("utf-8"))
+    os.utime(index, ns=(0, 0))
+
+    generate_gallery(str(gallery_root))
+
+    assert index.stat().st_mtime_ns == 0
+    assert (index.stat().st_ino, meta.stat().st_ino, index.read_text("utf-8")) == first
+
+
+def test_generate_gallery_replaces_index_atomically(monkeypatch, seeded_gallery):
+    from chatgpt_library_archiver import gallery
+
+    gallery_root = seeded_gallery
+    index = gallery_root / "index.html"
+    index.write_text("previous", encoding="utf-8")
+
+    def fail_midway(fp, head, tail, escaped_json):
+        fp.write(head)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(gallery, "_write_index", fail_midway)
+    with pytest.raises(OSError, match="disk full"):
+        generate_gallery(str(gallery_root))
+
+    assert index.read_text(encoding="utf-8") == "previous"
+    assert sorted(p.name for p in gallery_root.iterdir()) == [
+        "images",
+        "index.html",
+        "metadata.json",
+    ]
+
+
+def test_generate_gallery_surfaces_metadata_write_errors(monkeypatch, seeded_gallery):
+    from chatgpt_library_archiver import gallery
+
+    gallery_root = seeded_gallery
+
+    def fail_save(root, records):
+        raise OSError("read-only")
+
+    monkeypatch.setattr(gallery, "save_gallery_records", fail_save)
+    with pytest.raises(OSError, match="read-only"):
+        generate_gallery(str(gallery_root))
+
+    # The page does not depend on metadata.json and is still written.
+    assert (gallery_root / "index.html").is_file()
+
+
+def test_generate_gallery_uses_preloaded_items(tmp_path):
+    from chatgpt_library_archiver.metadata import GalleryItem
+
+    gallery_root = tmp_path / "gallery"
+    items = [
+        GalleryItem(id="old", filename="a.jpg", created_at=1.0),
+        GalleryItem(id="new", filename="b.jpg", created_at=2.0),
+    ]
+
+    assert generate_gallery(str(gallery_root), items=items) == 2
+
+    data = json.loads((gallery_root / "metadata.json").read_text("utf-8"))
+    assert [item["id"] for item in data] == ["new", "old"]
+    assert (gallery_root / "index.html").exists()
+
+
 def test_generate_gallery_handles_empty_metadata(tmp_path, write_metadata):
     gallery_root = tmp_path / "gallery"
     gallery_root.mkdir()
@@ -216,8 +286,7 @@ def test_generate_gallery_backfills_missing_created_at(tmp_path, write_metadata)
     total = generate_gallery(str(gallery_root))
 
     assert total == 1
-    with open(gallery_root / "metadata.json", encoding="utf-8") as f:
-        data = json.load(f)
+    data = json.loads((gallery_root / "metadata.json").read_text(encoding="utf-8"))
     assert data[0]["created_at"] == 0.0
 
 
@@ -246,16 +315,101 @@ def test_generate_gallery_handles_mixed_created_at_types(tmp_path, write_metadat
 
     generate_gallery(str(gallery_root))
 
-    with open(gallery_root / "metadata.json", encoding="utf-8") as f:
-        sorted_data = json.load(f)
+    sorted_data = json.loads(
+        (gallery_root / "metadata.json").read_text(encoding="utf-8")
+    )
 
     assert [item["id"] for item in sorted_data] == ["recent", "old", "invalid"]
     assert all(isinstance(item["created_at"], float) for item in sorted_data)
 
 
+def test_template_parts_split_around_head_close():
+    from chatgpt_library_archiver.gallery import _template_parts
+
+    head, tail = _template_parts()
+
+    assert b"</head>" not in head
+    assert tail.startswith(b"</head>")
+    assert _template_parts() is _template_parts()
+
+
+def test_minify_template_compacts_css_and_js():
+    from chatgpt_library_archiver.gallery import _minify_template
+
+    template = (
+        "<head>\n<style>\n/* theme */\n.a > .b,\n.c {\n  color: red;\n"
+        "  padding: 0 calc(var(--x) * 2);\n}\n</style>\n</head>\n"
+        "<body>\n  <p>Hi</p>\n<script>\n/* === Section === */\n"
+        "function f() {\n  // note\n\n  return 'http://x'; // keep\n}\n"
+        "</script>\n</body>\n"
+    )
+
+    assert _minify_template(template) == (
+        "<head>\n<style>.a>.b,.c{color:red;padding:0 calc(var(--x) * 2)}</style>\n"
+        "</head>\n<body>\n<p>Hi</p>\n<script>\nfunction f() {\n"
+        "return 'http://x'; // keep\n}\n</script>\n</body>\n"
+    )
+
+
+def test_minified_template_script_is_valid_javascript(tmp_path):
+    from chatgpt_library_archiver.gallery import _template_parts
+
+    page = b"".join(_template_parts()).decode("utf-8")
+    script = page.split("<script>", 1)[1].split("</script>", 1)[0]
+    path = tmp_path / "gallery.js"
+    path.write_text(script, encoding="utf-8")
+
+    subprocess.run(["node", "--check", str(path)], check=True)
+
+
+def test_template_parts_pretty_env_keeps_authored_template(monkeypatch):
+    from chatgpt_library_archiver.gallery import _template_parts
+
+    raw = resources.read_text(
+        "chatgpt_library_archiver", "gallery_index.html", encoding="utf-8"
+    )
+    monkeypatch.setenv("ARCHIVER_PRETTY", "1")
+    _template_parts.cache_clear()
+    try:
+        assert b"".join(_template_parts()) == raw.encode("utf-8")
+    finally:
+        _template_parts.cache_clear()
+    monkeypatch.delenv("ARCHIVER_PRETTY")
+    assert len(b"".join(_template_parts())) < len(raw.encode("utf-8"))
+
+
+def test_write_index_streams_data_script_before_head_close():
+    from chatgpt_library_archiver.gallery import _write_index
+
+    buffer = io.BytesIO()
+    _write_index(buffer, b"<head><title>x</title>", b"</head><body></body>", b"[1]")
+
+    assert buffer.getvalue() == (
+        b"<head><title>x</title><script>var GALLERY_DATA = [1];</script>\n"
+        b"</head><body></body>"
+    )
+
+
 # -- XSS security tests for embedded metadata JSON --
 
 
+def test_html_json_payload_escapes_orjson_output(monkeypatch):
+    from chatgpt_library_archiver import gallery
+
+    def fake_dumps(records):
+        return json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode()
+
+    monkeypatch.setattr(gallery, "_orjson", SimpleNamespace(dumps=fake_dumps))
+    records = [{"title": "</script>&caf\u00e9\u2028", "tags": ["<b>"]}]
+
+    payload = gallery._html_json_payload(records)
+
+    for raw in (b"<", b">", b"&", "\u2028".encode()):
+        assert raw not in payload
+    assert "café".encode() in payload
+    assert json.loads(payload) == records
+
+
 def test_safe_json_for_html_escapes_dangerous_sequences():
     """Unit test: _safe_json_for_html escapes <, >, and & in serialized JSON."""
     from chatgpt_library_archiver.gallery import _safe_json_for_html
@@ -272,7 +426,7 @@ def test_safe_json_for_html_escapes_dangerous_sequences():
         ),
     ]
 
-    result = _safe_json_for_html(items)
+    result = _safe_json_for_html([item.to_dict() for item in items])
 
     # No raw angle brackets or ampersands in the output
     assert "</script>" not in result
@@ -368,6 +522,187 @@ def _extract_thumb_handler() -> str:
     return "function attach(link, openViewer, filteredIndex) {\n" + snippet + "}\n"
 
 
+def _extract_prepare_item() -> str:
+    html = resources.read_text(
+        "chatgpt_library_archiver", "gallery_index.html", encoding="utf-8"
+    )
+    utils_start = html.index("function resolveThumbnails(item")
+    utils_end = html.index("/* === Search / Filter === */")
+    fn_start = html.index("function prepareItem(item)")
+    fn_end = html.index("function loadImages()")
+    return html[utils_start:utils_end] + html[fn_start:fn_end]
+
+
+def test_prepare_item_precomputes_card_fields():
+    script = _extract_prepare_item() + textwrap.dedent(
+        """
+        var item = prepareItem({
+          id: 'x1',
+          filename: 'cat.png',
+          title: 'Black CAT',
+          tags: ['Pet', 'Cat'],
+          created_at: 1700000000.5,
+          thumbnails: { small: 'thumbs/small/cat.png' },
+        });
+        var bare = prepareItem({ id: 'x2', filename: 'dog.png' });
+        console.log(JSON.stringify([
+          item._imgPath, item._thumbs, item._displayTitle,
+          item._searchTitle, item._searchTags, item._created,
+          bare._displayTitle, bare._thumbs, bare._created,
+          item._srcset, item._tagsTitle, bare._tagsTitle,
+        ]));
+        """
+    )
+    result = subprocess.run(
+        ["node", "-e", script], capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout) == [
+        "images/cat.png",
+        {
+            "small": "thumbs/small/cat.png",
+            "medium": "images/cat.png",
+            "large": "images/cat.png",
+            "full": "images/cat.png",
+        },
+        "Black CAT",
+        "black cat",
+        "pet\ncat",
+        "2023-11-14 22:13:20",
+        "dog",
+        {
+            "small": "images/dog.png",
+            "medium": "images/dog.png",
+            "large": "images/dog.png",
+            "full": "images/dog.png",
+        },
+        "",
+        "thumbs/small/cat.png 150w, images/cat.png 250w, images/cat.png 400w",
+        "Pet, Cat",
+        "",
+    ]
+
+
+_FAKE_DOM = textwrap.dedent(
+    """
+    function El(tag) {
+      this.tagName = tag; this.childNodes = []; this.parent = null;
+      this.dataset = {}; this.attrs = {}; this.style = {}; this.textContent = '';
+    }
+    El.prototype.insertBefore = function(child, ref) {
+      var i = this.childNodes.indexOf(ref);
+      this.childNodes.splice(i < 0 ? this.childNodes.length : i, 0, child);
+      child.parent = this;
+      return child;
+    };
+    El.prototype.appendChild = function(child) {
+      return this.insertBefore(child, null);
+    };
+    El.prototype.setAttribute = function(k, v) { this.attrs[k] = v; };
+    El.prototype.addEventListener = function() {};
+    El.prototype.cloneNode = function() {
+      var copy = new El(this.tagName);
+      for (var k in this) {
+        if (!Object.prototype.hasOwnProperty.call(this, k)) continue;
+        if (k === 'childNodes' || k === 'parent') continue;
+        var v = this[k];
+        copy[k] = v && typeof v === 'object' ? Object.assign({}, v) : v;
+      }
+      this.childNodes.forEach(function(c) { copy.appendChild(c.cloneNode()); });
+      return copy;
+    };
+    Object.defineProperties(El.prototype, {
+      firstChild: { get: function() { return this.childNodes[0] || null; } },
+      lastChild: { get: function() {
+        return this.childNodes[this.childNodes.length - 1] || null;
+      } },
+      nextSibling: { get: function() {
+        var kids = this.parent ? this.parent.childNodes : [];
+        return kids[kids.indexOf(this) + 1] || null;
+      } },
+    });
+    var document = {
+      createElement: function(tag) { return new El(tag); },
+      createTextNode: function(text) {
+        var node = new El('#text');
+        node.textContent = text;
+        return node;
+      },
+      getElementById: function() { return null; },
+    };
+    function describe(el) {
+      var kids = el.childNodes.map(describe).join(',');
+      return el.tagName + (el.className ? '.' + el.className : '') +
+        (kids ? '[' + kids + ']' : '');
+    }
+    """
+)
+
+
+def _extract_create_card() -> str:
+    html = resources.read_text(
+        "chatgpt_library_archiver", "gallery_index.html", encoding="utf-8"
+    )
+    start = html.index("var cardTemplate = null;")
+    end = html.index("/* === Batch Rendering")
+    return html[start:end]
+
+
+def test_create_card_clones_template_and_fills_fields():
+    script = (
+        _FAKE_DOM
+        + _extract_prepare_item()
+        + _extract_create_card()
+        + textwrap.dedent(
+            """
+            function currentSizeKey() { return 'medium'; }
+            function sizesAttrForKey() { return '250px'; }
+            function safeHref(url) { return url || '#'; }
+            var tagged = createCard(prepareItem({
+              id: 'a', filename: 'a.png', title: 'A', tags: ['x', 'y'],
+              created_at: 1700000000, conversation_link: 'https://c/1',
+            }), 3);
+            var plain = createCard(prepareItem({ id: 'b', filename: 'b.png' }), 4);
+            var meta = tagged.card.lastChild;
+            console.log(JSON.stringify({
+              tagged: describe(tagged.card),
+              plain: describe(plain.card),
+              title: meta.firstChild.textContent,
+              created: meta.childNodes[1].lastChild.textContent,
+              href: meta.lastChild.href,
+              src: tagged.img.attrs['data-src'],
+              loading: tagged.img.loading,
+              decoding: tagged.img.decoding,
+              index: tagged.card.dataset.index,
+              plainTitle: plain.card.lastChild.firstChild.textContent,
+            }));
+            """
+        )
+    )
+    result = subprocess.run(
+        ["node", "-e", script], capture_output=True, text=True, check=True
+    )
+    data = json.loads(result.stdout)
+    assert data == {
+        "tagged": (
+            "article.image-card[a.thumb[img],div.meta[strong,"
+            "span.created[br,#text],span.tags[br,button.tag-pill,button.tag-pill],"
+            "br,a]]"
+        ),
+        "plain": (
+            "article.image-card[a.thumb[img],div.meta[strong,"
+            "span.created[br,#text],br,a]]"
+        ),
+        "title": "A",
+        "created": "2023-11-14 22:13:20",
+        "href": "https://c/1",
+        "src": "images/a.png",
+        "loading": "lazy",
+        "decoding": "async",
+        "index": "3",
+        "plainTitle": "b",
+    }
+
+
 def test_filter_by_date_range():
     fn = _extract_search_fn()
     script = fn + textwrap.dedent(
@@ -379,20 +714,54 @@ def test_filter_by_date_range():
           { _searchTitle: 'b', _searchTags: '',
             created_at: (startMs + 86400000) / 1000 },
         ];
-        var searchFn = function() { return true; };
-        var filtered = items.filter(function(item) {
-          var created = item.created_at ? item.created_at * 1000 : null;
-          if (startMs !== null && (!created || created < startMs)) return false;
-          if (endMs !== null && (!created || created > endMs)) return false;
-          return true;
-        });
+        items.push({ _searchTitle: 'undated', _searchTags: '' });
+        var createdMs = buildCreatedIndex(items);
+        var filtered = filterItems(items, createdMs, null, startMs, endMs);
+        var all = filterItems(items, createdMs, null, null, null);
         console.log(filtered.map(function(i) { return i._searchTitle; }).join(','));
+        console.log(all.length);
         """
     )
     result = subprocess.run(
         ["node", "-e", script], capture_output=True, text=True, check=True
     )
-    assert result.stdout.strip() == "a"
+    assert result.stdout.split() == ["a", "3"]
+
+
+def _extract_sort_fn() -> str:
+    html = resources.read_text(
+        "chatgpt_library_archiver", "gallery_index.html", encoding="utf-8"
+    )
+    start = html.index("/* === Sorting === */")
+    end = html.index("/* === Lazy Loading Observer === */")
+    return html[start:end]
+
+
+def test_sort_items_by_date_handles_presorted_and_unsorted_input():
+    script = _extract_sort_fn() + textwrap.dedent(
+        """
+        var newest = [{ id: 'c', created_at: 3 }, { id: 'b', created_at: 2 },
+                      { id: 'undated' }];
+        var shuffled = [newest[1], newest[2], newest[0]];
+        function ids(list) { return list.map(function(i) { return i.id; }).join(','); }
+        console.log(ids(sortItems(newest, 'date-desc')));
+        console.log(ids(sortItems(newest, 'date-asc')));
+        console.log(ids(sortItems(shuffled, 'date-desc')));
+        console.log(ids(sortItems(shuffled, 'date-asc')));
+        console.log(ids(newest) + ' ' + (sortItems(newest, 'date-desc') !== newest));
+        """
+    )
+    result = subprocess.run(
+        ["node", "-e", script], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == [
+        "c,b,undated",
+        "undated,b,c",
+        "c,b,undated",
+        "undated,b,c",
+        "c,b,undated",
+        "true",
+    ]
 
 
 def test_filter_by_tags_boolean():
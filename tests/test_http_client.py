@@ -1,15 +1,20 @@
 import hashlib
+import os
 from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
+import requests
 
+from chatgpt_library_archiver import http_client
 from chatgpt_library_archiver.http_client import (
     _SENSITIVE_HEADERS,
     HttpClient,
     HttpError,
     SafeSession,
     _origin,
+    _parse_duration,
+    _rate_limit_delay,
 )
 
 # ---------------------------------------------------------------------------
@@ -296,6 +301,65 @@ def test_get_json_success():
     assert data == {"items": []}
 
 
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("1.5", 1.5), ("20ms", 0.02), ("6m0s", 360.0), ("1h2m3.5s", 3723.5), ("", 0.0)],
+)
+def test_parse_duration(value, expected):
+    assert _parse_duration(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({}, 0.0),
+        ({"x-ratelimit-remaining-requests": "100"}, 0.0),
+        (
+            {
+                "x-ratelimit-remaining-requests": "2",
+                "x-ratelimit-reset-requests": "4s",
+            },
+            2.0,
+        ),
+        (
+            {
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "3",
+            },
+            3.0,
+        ),
+        ({"x-ratelimit-remaining-requests": "n/a"}, 0.0),
+    ],
+)
+def test_rate_limit_delay(headers, expected):
+    assert _rate_limit_delay(headers) == pytest.approx(expected)
+
+
+def test_get_json_paces_only_when_rate_limit_is_low(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(
+        "chatgpt_library_archiver.http_client.time.sleep", sleeps.append
+    )
+    low = {
+        "Content-Type": "application/json",
+        "x-ratelimit-remaining-requests": "1",
+        "x-ratelimit-reset-requests": "10s",
+    }
+    client = make_client(
+        {
+            "https://example.test/1": FakeResponse(json_data={}),
+            "https://example.test/2": FakeResponse(json_data={}, headers=low),
+            "https://example.test/3": FakeResponse(json_data={}),
+        }
+    )
+    client.get_json("https://example.test/1")
+    client.get_json("https://example.test/2")
+    assert sleeps == []
+    client.get_json("https://example.test/3")
+    assert len(sleeps) == 1
+    assert 9.0 < sleeps[0] <= 10.0
+
+
 def test_get_json_invalid_content_type():
     url = "https://example.test/data"
     client = make_client({url: FakeResponse(headers={"Content-Type": "text/html"})})
@@ -340,6 +404,41 @@ def test_stream_download_writes_file(tmp_path):
     assert result.content_type == "image/png"
 
 
+@pytest.mark.parametrize(
+    ("extra_headers", "expected_reserved"),
+    [
+        ({"Content-Length": "11"}, [11]),
+        ({"Content-Length": "64"}, [64]),
+        ({"Content-Length": "11", "Content-Encoding": "gzip"}, []),
+        ({"Content-Length": "bogus"}, []),
+    ],
+)
+def test_stream_download_preallocates_declared_length(
+    monkeypatch, tmp_path, extra_headers, expected_reserved
+):
+    reserved: list[int] = []
+    real_fallocate = getattr(os, "posix_fallocate", None)
+
+    def fake_fallocate(fd, offset, length):
+        reserved.append(length)
+        if real_fallocate is not None:
+            real_fallocate(fd, offset, length)
+
+    monkeypatch.setattr(http_client, "_HAS_FALLOCATE", True)
+    monkeypatch.setattr(os, "posix_fallocate", fake_fallocate, raising=False)
+    url = "https://example.test/image"
+    payload = b"hello world"
+    headers = {"Content-Type": "image/png", **extra_headers}
+    client = make_client({url: FakeResponse(headers=headers, body=payload)})
+    destination = tmp_path / "image.download"
+
+    client.stream_download(url, destination)
+
+    assert reserved == expected_reserved
+    # A body shorter than the declared length must not leave padding behind.
+    assert destination.read_bytes() == payload
+
+
 def test_stream_download_validates_content_prefix(tmp_path):
     url = "https://example.test/image"
     response = FakeResponse(
@@ -512,6 +611,178 @@ def iter_content(self, chunk_size=8192):
     assert not destination.exists(), "partial file should be cleaned up"
 
 
+class _RecordingSession:
+    """Fake session that replays queued responses and records request headers."""
+
+    def __init__(self, responses: list[FakeResponse]) -> None:
+        self._responses = responses
+        self.sent_headers: list[dict[str, str]] = []
+
+    def mount(self, prefix: str, adapter) -> None:
+        return None
+
+    def get(self, url: str, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        return self._responses.pop(0)
+
+    def close(self) -> None:
+        return None
+
+
+@pytest.mark.parametrize(
+    ("responses", "expected_ranges"),
+    [
+        (
+            [
+                FakeResponse(
+                    status_code=206,
+                    headers={"Content-Range": "bytes 6-10/11"},
+                    body=b"world",
+                )
+            ],
+            ["bytes=6-"],
+        ),
+        (
+            [
+                FakeResponse(
+                    status_code=206,
+                    headers={"Content-Range": "bytes 0-10/11"},
+                    body=b"hello world",
+                ),
+                FakeResponse(status_code=200, headers={}, body=b"hello world"),
+            ],
+            ["bytes=6-", None],
+        ),
+        (
+            [FakeResponse(status_code=200, headers={}, body=b"hello world")],
+            ["bytes=6-"],
+        ),
+        (
+            [
+                FakeResponse(status_code=416, headers={}),
+                FakeResponse(status_code=200, headers={}, body=b"hello world"),
+            ],
+            ["bytes=6-", None],
+        ),
+    ],
+    ids=[
+        "partial-content",
+        "content-range-mismatch",
+        "range-ignored",
+        "range-not-satisfiable",
+    ],
+)
+def test_stream_download_resumes_partial_file(tmp_path, responses, expected_ranges):
+    session = _RecordingSession(responses)
+    client = HttpClient(session_factory=lambda: session)
+    destination = tmp_path / "image.download"
+    destination.write_bytes(b"hello ")
+
+    result = client.stream_download(
+        "https://example.test/image",
+        destination,
+        headers={"Authorization": "Bearer tok"},
+        resume=True,
+    )
+
+    assert destination.read_bytes() == b"hello world"
+    assert result.checksum == hashlib.sha256(b"hello world").hexdigest()
+    assert result.bytes_downloaded == len(b"hello world")
+    assert [h.get("Range") for h in session.sent_headers] == expected_ranges
+    assert all(h["Authorization"] == "Bearer tok" for h in session.sent_headers)
+
+
+def test_stream_download_resume_keeps_partial_on_network_error(tmp_path):
+    url = "https://example.test/image"
+
+    class FailingResponse(FakeResponse):
+        def iter_content(self, chunk_size=8192):
+            yield b"partial"
+            raise requests.exceptions.ChunkedEncodingError("connection dropped")
+
+    response = FailingResponse(
+        headers={"Content-Type": "image/png", "Content-Length": "1000"}
+    )
+    client = make_client({url: response})
+    destination = tmp_path / "partial.download"
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.stream_download(url, destination, resume=True)
+
+    assert destination.read_bytes() == b"partial"
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, '"v1"'),
+        (
+            {"ETag": 'W/"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+            "Mon, 01 Jan 2024 00:00:00 GMT",
+        ),
+        ({}, None),
+    ],
+    ids=["strong-etag", "weak-etag", "no-validator"],
+)
+def test_stream_download_resume_sends_if_range(tmp_path, headers, expected):
+    class FailingResponse(FakeResponse):
+        def iter_content(self, chunk_size=8192):
+            yield b"hello "
+            raise requests.exceptions.ChunkedEncodingError("connection dropped")
+
+    session = _RecordingSession(
+        [
+            FailingResponse(headers=headers),
+            FakeResponse(
+                status_code=206,
+                headers={"Content-Range": "bytes 6-10/11"},
+                body=b"world",
+            ),
+        ]
+    )
+    client = HttpClient(session_factory=lambda: session)
+    destination = tmp_path / "image.download"
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.stream_download("https://example.test/image", destination, resume=True)
+    client.stream_download("https://example.test/image", destination, resume=True)
+
+    assert destination.read_bytes() == b"hello world"
+    assert session.sent_headers[1].get("If-Range") == expected
+    assert not (tmp_path / "image.download.validator").exists()
+
+
+def test_stream_download_resumes_with_if_range_after_interrupt(tmp_path):
+    """A Ctrl-C mid-stream still leaves the validator for the next run."""
+
+    class InterruptedResponse(FakeResponse):
+        def iter_content(self, chunk_size=8192):
+            yield b"hello "
+            raise KeyboardInterrupt
+
+    session = _RecordingSession(
+        [
+            InterruptedResponse(headers={"ETag": '"v1"'}),
+            FakeResponse(
+                status_code=206,
+                headers={"Content-Range": "bytes 6-10/11"},
+                body=b"world",
+            ),
+        ]
+    )
+    client = HttpClient(session_factory=lambda: session)
+    destination = tmp_path / "image.download"
+
+    with pytest.raises(KeyboardInterrupt):
+        client.stream_download("https://example.test/image", destination, resume=True)
+    assert destination.read_bytes() == b"hello "
+    client.stream_download("https://example.test/image", destination, resume=True)
+
+    assert destination.read_bytes() == b"hello world"
+    assert session.sent_headers[1].get("Range") == "bytes=6-"
+    assert session.sent_headers[1].get("If-Range") == '"v1"'
+
+
 # ---------------------------------------------------------------------------
 # 10.3 — Empty response body rejection test
 # ---------------------------------------------------------------------------
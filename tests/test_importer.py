@@ -1,8 +1,11 @@
 import json
+import os
+import threading
 
 import pytest
 
 from chatgpt_library_archiver import importer, thumbnails
+from chatgpt_library_archiver.ai import AIRequestTelemetry
 from chatgpt_library_archiver.importer import ImportConfig
 
 EXPECTED_IMPORTED_COUNT = 2
@@ -123,6 +126,28 @@ def test_recursive_directory_import(monkeypatch, tmp_path, sample_png_bytes):
     assert any(name.endswith(".png") for name in filenames if name != "existing.png")
 
 
+def test_import_does_not_overwrite_untracked_files(
+    monkeypatch, tmp_path, sample_png_bytes
+):
+    monkeypatch.setattr(importer, "prompt_yes_no", always_yes)
+
+    gallery_root = tmp_path / "gallery"
+    images_dir = gallery_root / "images"
+    images_dir.mkdir(parents=True)
+    (images_dir / "photo.png").write_bytes(b"untracked")
+
+    src = tmp_path / "photo.png"
+    src.write_bytes(sample_png_bytes)
+
+    imported = importer.import_images(
+        inputs=[str(src)],
+        config=ImportConfig(gallery_root=str(gallery_root), copy_files=True),
+    )
+
+    assert imported[0].filename == "photo-2.png"
+    assert (images_dir / "photo.png").read_bytes() == b"untracked"
+
+
 def test_conversation_link_count_mismatch(monkeypatch, tmp_path):
     monkeypatch.setattr(importer, "prompt_yes_no", always_yes)
 
@@ -141,6 +166,48 @@ def test_conversation_link_count_mismatch(monkeypatch, tmp_path):
         )
 
 
+def test_import_post_steps_reuse_loaded_metadata(
+    tmp_path, monkeypatch, sample_png_bytes
+):
+    """Tagging and gallery generation share the import's in-memory items."""
+    monkeypatch.setattr(importer, "prompt_yes_no", always_yes)
+    loads = []
+    real_load = importer.load_gallery_items
+
+    def counting_load(root):
+        loads.append(root)
+        return real_load(root)
+
+    monkeypatch.setattr(importer, "load_gallery_items", counting_load)
+    monkeypatch.setattr(importer.tagger, "load_gallery_items", counting_load)
+    monkeypatch.setattr(importer.gallery, "load_gallery_items", counting_load)
+
+    tagged_with = {}
+
+    def fake_tag_images(*, items, ids, **_kwargs):
+        tagged_with["items"] = items
+        for item in items:
+            if item.id in ids:
+                item.tags = ["auto"]
+        return len(ids)
+
+    monkeypatch.setattr(importer.tagger, "tag_images", fake_tag_images)
+
+    src = tmp_path / "sample.png"
+    src.write_bytes(sample_png_bytes)
+    gallery_root = tmp_path / "gallery"
+    importer.import_images(
+        inputs=[str(src)],
+        config=ImportConfig(gallery_root=str(gallery_root), tag_new=True),
+    )
+
+    assert len(loads) == 1
+    assert [item.tags for item in tagged_with["items"]] == [["auto"]]
+    data = json.loads((gallery_root / "metadata.json").read_text())
+    assert data[0]["tags"] == ["auto"]
+    assert (gallery_root / "index.html").is_file()
+
+
 def test_regenerate_thumbnails_recreates_missing(
     tmp_path, monkeypatch, sample_png_bytes
 ):
@@ -238,3 +305,167 @@ def test_unique_filename_multiple_collisions():
     result = importer._unique_filename("shot", ".jpg", existing)
     assert result == "shot-4.jpg"
     assert "shot-4.jpg" in existing
+
+
+def test_unique_filename_counters_resume_after_last_suffix():
+    """Repeated collisions on one slug resume at the remembered suffix."""
+    existing = {"shot.jpg", "shot-2.jpg", "shot-4.jpg"}
+    counters: dict[tuple[str, str], int] = {}
+    names = [
+        importer._unique_filename("shot", ".jpg", existing, counters) for _ in range(3)
+    ]
+    assert names == ["shot-3.jpg", "shot-5.jpg", "shot-6.jpg"]
+    assert counters[("shot", ".jpg")] == 7
+    assert importer._unique_filename("other", ".jpg", existing, counters) == (
+        "other.jpg"
+    )
+
+
+@pytest.mark.parametrize("copy_range_fails", [False, True])
+def test_copy_file_preserves_content_and_mtime(monkeypatch, tmp_path, copy_range_fails):
+    src = tmp_path / "src.bin"
+    payload = os.urandom(200_000)
+    src.write_bytes(payload)
+    os.utime(src, ns=(1_000_000_000, 2_000_000_000))
+    dest = tmp_path / "dest.bin"
+
+    if copy_range_fails:
+
+        def broken(*_args, **_kwargs):
+            raise OSError("cross-device")
+
+        monkeypatch.setattr(importer.os, "copy_file_range", broken, raising=False)
+
+    importer._copy_file(src, dest)
+
+    assert dest.read_bytes() == payload
+    assert dest.stat().st_mtime_ns == 2_000_000_000
+
+
+def test_walk_image_files_matches_rglob_filter(tmp_path):
+    root = tmp_path / "root"
+    (root / "b" / "deep").mkdir(parents=True)
+    (root / "a").mkdir()
+    for rel in ["z.png", "a/one.JPG", "b/deep/two.webp", "b/notes.txt", "b/.png"]:
+        (root / rel).write_bytes(b"x")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "linked.png").write_bytes(b"x")
+    (root / "link").symlink_to(outside, target_is_directory=True)
+
+    expected = [
+        p
+        for p in sorted(root.rglob("*"))
+        if p.is_file() and importer._is_image_name(p.name)
+    ]
+
+    assert importer._walk_image_files(root) == expected
+    assert [p.relative_to(root).as_posix() for p in expected] == [
+        "a/one.JPG",
+        "b/deep/two.webp",
+        "z.png",
+    ]
+
+
+def test_direct_non_image_inputs_are_skipped(monkeypatch, tmp_path, sample_png_bytes):
+    monkeypatch.setattr(importer, "prompt_yes_no", always_yes)
+    image = tmp_path / "pic.png"
+    image.write_bytes(sample_png_bytes)
+    notes = tmp_path / "notes.txt"
+    notes.write_text("ignore")
+
+    imported = importer.import_images(
+        inputs=[str(notes), str(image)],
+        config=ImportConfig(
+            gallery_root=str(tmp_path / "gallery"),
+            copy_files=True,
+            conversation_links=["https://c/notes", "https://c/pic"],
+        ),
+    )
+
+    assert [item.conversation_link for item in imported] == ["https://c/pic"]
+    with pytest.raises(ValueError, match="No importable images"):
+        importer.import_images(
+            inputs=[str(notes)],
+            config=ImportConfig(gallery_root=str(tmp_path / "gallery")),
+        )
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_parallel_import_keeps_input_order_and_unique_names(
+    monkeypatch, tmp_path, sample_png_bytes, workers
+):
+    monkeypatch.setattr(importer, "prompt_yes_no", always_yes)
+    names = ["delta", "alpha", "charlie", "bravo"]
+    for name in names:
+        (tmp_path / f"{name}.png").write_bytes(sample_png_bytes)
+    folder = tmp_path / "folder"
+    for sub in "abcd":
+        (folder / sub).mkdir(parents=True)
+        (folder / sub / "same.png").write_bytes(sample_png_bytes)
+    config = ImportConfig(
+        gallery_root=str(tmp_path / "gallery"),
+        recursive=True,
+        copy_files=True,
+        import_workers=workers,
+    )
+
+    direct = importer.import_images(
+        inputs=[str(tmp_path / f"{name}.png") for name in names], config=config
+    )
+    nested = importer.import_images(inputs=[str(folder)], config=config)
+
+    assert [item.filename for item in direct] == [f"{name}.png" for name in names]
+    assert sorted(item.filename for item in nested) == [
+        "same-2.png",
+        "same-3.png",
+        "same-4.png",
+        "same.png",
+    ]
+    metadata = json.loads((tmp_path / "gallery" / "metadata.json").read_text())
+    assert len(metadata) == len(names) + 4
+
+
+def test_parallel_import_sends_telemetry_from_calling_thread(
+    monkeypatch, tmp_path, sample_png_bytes
+):
+    monkeypatch.setattr(importer, "prompt_yes_no", always_yes)
+    monkeypatch.setattr(
+        importer,
+        "_prepare_ai_client",
+        lambda **_kwargs: (object(), "model", "prompt"),
+    )
+
+    def fake_slug(_client, _model, _prompt, image_path, **_kwargs):
+        telemetry = AIRequestTelemetry(
+            operation="rename",
+            subject=image_path.name,
+            latency_s=0.0,
+            total_tokens=None,
+            prompt_tokens=None,
+            completion_tokens=None,
+            retries=0,
+        )
+        return f"ai-{image_path.stem}", telemetry
+
+    monkeypatch.setattr(importer, "_generate_ai_slug", fake_slug)
+    names = ["one", "two", "three", "four"]
+    for name in names:
+        (tmp_path / f"{name}.png").write_bytes(sample_png_bytes)
+    received: list[tuple[str | None, threading.Thread]] = []
+
+    imported = importer.import_images(
+        inputs=[str(tmp_path / f"{name}.png") for name in names],
+        config=ImportConfig(
+            gallery_root=str(tmp_path / "gallery"),
+            ai_rename=True,
+            import_workers=4,
+            telemetry_sink=lambda t: received.append(
+                (t.subject, threading.current_thread())
+            ),
+        ),
+    )
+
+    assert [item.filename for item in imported] == [f"ai-{n}.png" for n in names]
+    assert [subject for subject, _ in received] == [f"{n}.png" for n in names]
+    assert all(thread is threading.current_thread() for _, thread in received)
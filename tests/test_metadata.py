@@ -1,6 +1,8 @@
+import io
 import json
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
@@ -16,6 +18,13 @@ def test_normalize_created_at_numeric_and_iso() -> None:
     assert metadata.normalize_created_at(iso_value) == pytest.approx(expected)
 
 
+def test_normalize_created_at_returns_float_types() -> None:
+    assert type(metadata.normalize_created_at(12)) is float
+    assert metadata.normalize_created_at(1.5) == 1.5
+    assert metadata.normalize_created_at(True) == 1.0
+    assert metadata.normalize_created_at(" 7.25 ") == 7.25
+
+
 def test_normalize_created_at_blank() -> None:
     assert metadata.normalize_created_at("   ") is None
 
@@ -42,6 +51,16 @@ def test_gallery_item_from_dict_filters_extras(tmp_path: Path) -> None:
     assert [loaded_item.id for loaded_item in loaded] == ["1"]
 
 
+def test_gallery_item_from_dict_known_fields_only_has_fresh_extras() -> None:
+    raw = {"id": "1", "filename": "a.png", "title": "A", "created_at": 5}
+    first = metadata.GalleryItem.from_dict(raw)
+    second = metadata.GalleryItem.from_dict(raw)
+    assert first.extra == {}
+    first.extra["note"] = "x"
+    assert second.extra == {}
+    assert first.to_dict()["title"] == "A"
+
+
 def test_save_gallery_items_is_atomic(tmp_path: Path) -> None:
     """Verify save uses a temp file + os.replace for atomic writes."""
     item = metadata.GalleryItem(id="a1", filename="pic.png")
@@ -52,11 +71,70 @@ def test_save_gallery_items_is_atomic(tmp_path: Path) -> None:
     assert data[0]["id"] == "a1"
 
 
+def test_save_gallery_items_uses_orjson_when_available(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The optional ``orjson`` backend writes its bytes straight to disk."""
+    calls: list[int] = []
+
+    def fake_dumps(records: object, option: int = 0) -> bytes:
+        calls.append(option)
+        return json.dumps(records, indent=2 if option else None).encode()
+
+    monkeypatch.setattr(
+        metadata, "_orjson", SimpleNamespace(dumps=fake_dumps, OPT_INDENT_2=4)
+    )
+    monkeypatch.delenv("ARCHIVER_PRETTY", raising=False)
+    item = metadata.GalleryItem(id="a1", filename="a.png")
+
+    metadata.save_gallery_items(tmp_path, [item])
+    metadata.save_gallery_items(tmp_path, [item], pretty=True)
+
+    assert calls == [0, 4]
+    data = json.loads((tmp_path / "metadata.json").read_text())
+    assert data == [item.to_dict()]
+
+
+@pytest.mark.parametrize(
+    ("env", "pretty", "indented"),
+    [
+        (None, None, False),
+        ("1", None, True),
+        (None, True, True),
+        ("yes", False, False),
+    ],
+)
+def test_save_gallery_items_is_compact_unless_pretty(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    env: str | None,
+    pretty: bool | None,
+    indented: bool,
+) -> None:
+    monkeypatch.setattr(metadata, "_orjson", None)
+    if env is None:
+        monkeypatch.delenv("ARCHIVER_PRETTY", raising=False)
+    else:
+        monkeypatch.setenv("ARCHIVER_PRETTY", env)
+    items = [metadata.GalleryItem(id=str(i), filename=f"{i}.png") for i in range(3)]
+
+    metadata.save_gallery_items(tmp_path, items, pretty=pretty)
+
+    text = (tmp_path / "metadata.json").read_text()
+    assert ("\n" in text) is indented
+    assert [item.id for item in metadata.load_gallery_items(tmp_path)] == [
+        "0",
+        "1",
+        "2",
+    ]
+
+
 def test_save_gallery_items_cleans_up_on_failure(tmp_path: Path) -> None:
     """On write failure the temp file is removed."""
     item = metadata.GalleryItem(id="b1", filename="fail.png")
 
     with (
+        patch.object(metadata, "_orjson", None),
         patch(
             "chatgpt_library_archiver.metadata.json.dumps",
             side_effect=RuntimeError("boom"),
@@ -84,6 +162,7 @@ def bad_dumps(*args, **kwargs):
         raise OSError("disk full")
 
     with (
+        patch.object(metadata, "_orjson", None),
         patch(
             "chatgpt_library_archiver.metadata.json.dumps",
             side_effect=bad_dumps,
@@ -140,6 +219,38 @@ def test_load_gallery_items_non_dict_items_in_list_are_filtered(
     assert items[1].id == "2"
 
 
+@pytest.mark.parametrize(
+    ("document", "expected_ids"),
+    [
+        (
+            '[{"id": "1", "filename": "a.png"}, 7, {"id": "2", "filename": "b.png"}]',
+            ["1", "2"],
+        ),
+        ('{"key": "value"}', []),
+    ],
+)
+def test_load_gallery_items_uses_orjson_when_available(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    document: str,
+    expected_ids: list[str],
+) -> None:
+    """The optional ``orjson`` backend parses the raw bytes in one call."""
+    calls: list[bytes] = []
+
+    def fake_loads(data: bytes) -> object:
+        calls.append(data)
+        return json.loads(data)
+
+    monkeypatch.setattr(metadata, "_orjson", SimpleNamespace(loads=fake_loads))
+    (tmp_path / "metadata.json").write_text(document)
+
+    items = metadata.load_gallery_items(tmp_path)
+
+    assert [item.id for item in items] == expected_ids
+    assert calls == [document.encode()]
+
+
 def test_load_gallery_items_missing_id_and_filename_default_to_empty(
     tmp_path: Path,
 ) -> None:
@@ -151,3 +262,60 @@ def test_load_gallery_items_missing_id_and_filename_default_to_empty(
     assert items[0].id == ""
     assert items[0].filename == ""
     assert items[0].tags == ["a"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+@pytest.mark.parametrize(
+    "document",
+    [
+        "[]",
+        " [ ] \n",
+        '[{"id": "1", "tags": ["x]"]}, 12345678, -1.5e10, true, null, "s"]',
+        '{"key": "value"}',
+    ],
+)
+def test_iter_json_array_matches_json_loads(
+    monkeypatch: pytest.MonkeyPatch, chunk_size: int, document: str
+) -> None:
+    """Elements split across read chunks decode exactly as ``json.loads``."""
+    monkeypatch.setattr(metadata, "_READ_CHUNK_SIZE", chunk_size)
+    result = list(metadata._iter_json_array(io.StringIO(document)))
+    assert result == list(json.loads(document))
+
+
+def test_iter_json_array_grows_reads_for_large_elements(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """An element spanning many chunks is buffered in doubling reads."""
+
+    class CountingReader(io.StringIO):
+        reads = 0
+
+        def read(self, size: int | None = -1) -> str:
+            CountingReader.reads += 1
+            return super().read(size)
+
+    monkeypatch.setattr(metadata, "_READ_CHUNK_SIZE", 4)
+    document = json.dumps([{"title": "x" * 100_000}, 1])
+    result = list(metadata._iter_json_array(CountingReader(document)))
+    assert result == json.loads(document)
+    assert CountingReader.reads < 40
+
+
+@pytest.mark.parametrize(
+    "document",
+    ["", "[1 2]", "[1,]", "[1.5e]", "[1,", "[1]garbage", "[1][2]", "[1]  \n  x"],
+)
+def test_iter_json_array_rejects_malformed_input(
+    monkeypatch: pytest.MonkeyPatch, document: str
+) -> None:
+    monkeypatch.setattr(metadata, "_READ_CHUNK_SIZE", 2)
+    with pytest.raises(json.JSONDecodeError):
+        list(metadata._iter_json_array(io.StringIO(document)))
+
+
+def test_iter_json_array_allows_trailing_whitespace(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(metadata, "_READ_CHUNK_SIZE", 2)
+    assert list(metadata._iter_json_array(io.StringIO("[1, 2]  \n\t "))) == [1, 2]
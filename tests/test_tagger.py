@@ -37,6 +37,22 @@ def test_tag_missing_only(monkeypatch, tmp_path, write_metadata):
     assert data[1]["tags"] == ["x", "y"]
 
 
+def test_tag_nothing_missing_skips_config(monkeypatch, tmp_path, write_metadata):
+    gallery = write_metadata(
+        tmp_path / "gallery",
+        [{"id": "1", "filename": "a.jpg", "tags": ["keep"]}],
+        create_images=True,
+    )
+    before = (gallery / "metadata.json").read_text()
+
+    mock_config = Mock(spec=tagger.ensure_tagging_config)
+    monkeypatch.setattr(tagger, "ensure_tagging_config", mock_config)
+
+    assert tagger.tag_images(gallery_root=str(gallery)) == 0
+    mock_config.assert_not_called()
+    assert (gallery / "metadata.json").read_text() == before
+
+
 def test_retag_all(monkeypatch, tmp_path, write_metadata):
     gallery = write_metadata(
         tmp_path / "gallery",
@@ -123,6 +139,19 @@ def test_remove_specific_ids(tmp_path, write_metadata):
     assert data[1]["tags"] == ["b"]
 
 
+def test_remove_empty_ids_clears_nothing(tmp_path, write_metadata):
+    gallery = write_metadata(
+        tmp_path / "gallery",
+        [{"id": "1", "filename": "a.jpg", "tags": ["a"]}],
+        create_images=True,
+    )
+
+    count = tagger.remove_tags(gallery_root=str(gallery), ids=[])
+    assert count == 0
+    data = json.loads((gallery / "metadata.json").read_text())
+    assert data[0]["tags"] == ["a"]
+
+
 def test_progress_and_tokens(monkeypatch, capsys, tmp_path, write_metadata):
     gallery = write_metadata(
         tmp_path / "gallery",
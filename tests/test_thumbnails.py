@@ -1,14 +1,14 @@
 import io
 import multiprocessing
 import os
-import queue
 import time
 from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
-from PIL import Image
+from PIL import Image, ImageOps
 
 from chatgpt_library_archiver import thumbnails
 from chatgpt_library_archiver.metadata import GalleryItem
@@ -107,6 +107,7 @@ def fake_as_completed(futures):
         yield from list(futures)
 
     monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", DummyExecutor)
+    monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
     monkeypatch.setattr(thumbnails, "as_completed", fake_as_completed)
 
     processed, updated = thumbnails.regenerate_thumbnails(
@@ -116,7 +117,13 @@ def fake_as_completed(futures):
         max_workers=PARALLEL_WORKERS,
     )
 
-    assert executor_kwargs == [{"max_workers": PARALLEL_WORKERS, "mp_context": None}]
+    assert executor_kwargs == [
+        {
+            "max_workers": PARALLEL_WORKERS,
+            "mp_context": multiprocessing.get_context(),
+            "initializer": thumbnails._pin_to_perf_cores,
+        }
+    ]
     assert len(submitted) == PARALLEL_WORKERS
     assert sorted(name for name, _ in calls) == sorted(filenames)
     assert processed == filenames
@@ -129,6 +136,159 @@ def fake_as_completed(futures):
         assert thumbs["large"] == f"thumbs/large/{name}"
 
 
+@pytest.mark.parametrize(
+    ("cpu_list", "expected"),
+    [("0-3,8,10-11\n", [(0, {0, 1, 2, 3, 8, 10, 11})]), (None, [])],
+)
+def test_pin_to_perf_cores(tmp_path, monkeypatch, cpu_list, expected):
+    """Workers pin to the listed performance cores, or stay put without one."""
+    perf_cores = tmp_path / "cpus"
+    if cpu_list is not None:
+        perf_cores.write_text(cpu_list)
+    monkeypatch.setattr(thumbnails, "_PERF_CORES_PATH", perf_cores)
+    calls: list[tuple[int, set[int]]] = []
+    monkeypatch.setattr(
+        thumbnails.os,
+        "sched_setaffinity",
+        lambda pid, cpus: calls.append((pid, cpus)),
+        raising=False,
+    )
+
+    thumbnails._pin_to_perf_cores()
+
+    assert calls == expected
+
+
+def test_regenerate_thumbnails_small_runs_use_threads(gallery_dir, sample_png_bytes):
+    """Runs below the process-pool threshold never start worker processes."""
+    filenames = ["one.png", "two.png", "three.png"]
+    for name in filenames:
+        (gallery_dir / "images" / name).write_bytes(sample_png_bytes)
+    metadata = [GalleryItem(id=name, filename=name) for name in filenames]
+
+    with patch.object(thumbnails, "ProcessPoolExecutor") as process_pool:
+        processed, _ = thumbnails.regenerate_thumbnails(
+            gallery_dir, metadata, force=True, max_workers=PARALLEL_WORKERS
+        )
+
+    process_pool.assert_not_called()
+    assert processed == filenames
+    for name in filenames:
+        for size in thumbnails.THUMBNAIL_SIZES:
+            assert (gallery_dir / "thumbs" / size / name).is_file()
+
+
+def test_regenerate_thumbnails_parallel_batches_jobs(
+    monkeypatch, tmp_path, sample_png_bytes
+):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    filenames = [f"img{idx:02d}.png" for idx in range(16)]
+    for name in filenames:
+        (images_dir / name).write_bytes(sample_png_bytes)
+    metadata = [GalleryItem(id=name, filename=name) for name in filenames]
+
+    created: list[str] = []
+    monkeypatch.setattr(
+        thumbnails,
+        "create_thumbnails",
+        lambda source, dest_map, reporter=None, webp=False: created.append(source.name),
+    )
+    batch_sizes: list[int] = []
+
+    class DummyExecutor:
+        def __init__(self, **kwargs):
+            self._max_workers = kwargs["max_workers"]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def submit(self, fn, jobs, *args):
+            batch_sizes.append(len(jobs))
+            future: Future = Future()
+            future.set_result(fn(jobs, *args))
+            return future
+
+    monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", DummyExecutor)
+    monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
+    reporter = RecordingReporter()
+
+    thumbnails.regenerate_thumbnails(
+        tmp_path,
+        metadata,
+        force=True,
+        reporter=reporter,
+        max_workers=PARALLEL_WORKERS,
+    )
+
+    # 16 images over 2 workers x 4 batches each -> 8 tasks of 2 images.
+    assert batch_sizes == [2] * 8
+    assert created == filenames
+    assert reporter.advanced == len(filenames)
+
+
+@pytest.mark.parametrize("fail_on", ["result", "submit"])
+def test_regenerate_thumbnails_parallel_reports_failed_batches(
+    monkeypatch, tmp_path, sample_png_bytes, fail_on
+):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    filenames = [f"img{idx:02d}.png" for idx in range(16)]
+    for name in filenames:
+        (images_dir / name).write_bytes(sample_png_bytes)
+    metadata = [GalleryItem(id=name, filename=name) for name in filenames]
+
+    created: list[str] = []
+    monkeypatch.setattr(
+        thumbnails,
+        "create_thumbnails",
+        lambda source, dest_map, reporter=None, webp=False: created.append(source.name),
+    )
+
+    class DummyExecutor:
+        def __init__(self, **kwargs):
+            self._max_workers = kwargs["max_workers"]
+            self.submitted = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def submit(self, fn, jobs, *args):
+            self.submitted += 1
+            future: Future = Future()
+            if self.submitted == 1 and fail_on == "submit":
+                raise BrokenProcessPool("worker died")
+            if self.submitted == 1:
+                future.set_exception(BrokenProcessPool("worker died"))
+            else:
+                future.set_result(fn(jobs, *args))
+            return future
+
+    monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", DummyExecutor)
+    monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
+    reporter = RecordingReporter()
+
+    thumbnails.regenerate_thumbnails(
+        tmp_path,
+        metadata,
+        force=True,
+        reporter=reporter,
+        max_workers=PARALLEL_WORKERS,
+    )
+
+    # The first batch of two images fails as a whole; the rest still run.
+    assert [detail for _action, detail, _reason in reporter.errors] == filenames[:2]
+    assert all(reason == "worker died" for *_rest, reason in reporter.errors)
+    assert created == filenames[2:]
+    assert reporter.advanced == len(filenames)
+
+
 def test_regenerate_thumbnails_parallel_reports_start_and_finish(
     monkeypatch, tmp_path, sample_png_bytes
 ):
@@ -168,27 +328,13 @@ def __exit__(self, exc_type, exc, tb):
         def submit(self, fn, *args):
             return DummyFuture(fn, *args)
 
-    class DummyManager:
-        def __init__(self) -> None:
-            self.queue = queue.Queue()
-            self.shutdown_called = False
-
-        def Queue(self):
-            return self.queue
-
-        def shutdown(self) -> None:
-            self.shutdown_called = True
-
     class DummyContext:
-        def __init__(self) -> None:
-            self.manager = DummyManager()
-
-        def Manager(self) -> DummyManager:
-            return self.manager
+        pass
 
     reporter = RecordingReporter()
 
     monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", DummyExecutor)
+    monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
     dummy_context = DummyContext()
     monkeypatch.setattr(
         thumbnails.multiprocessing, "get_context", lambda: dummy_context
@@ -211,8 +357,6 @@ def Manager(self) -> DummyManager:
     assert reporter.total == len(filenames)
     assert reporter.advanced == len(filenames)
 
-    assert dummy_context.manager.shutdown_called
-
     starts = {
         detail
         for action, detail in reporter.messages
@@ -248,6 +392,7 @@ def test_regenerate_thumbnails_parallel_with_spawn_queue(
     monkeypatch.setattr(
         thumbnails.multiprocessing, "get_context", lambda: spawn_context
     )
+    monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
 
     gallery_root = tmp_path
     images_dir = gallery_root / "images"
@@ -305,6 +450,18 @@ def test_create_thumbnails_corrupt_image_raises_thumbnail_error(tmp_path):
         thumbnails.create_thumbnails(source, dest_map)
 
 
+def test_create_thumbnails_decompression_bomb_raises_thumbnail_error(
+    tmp_path, monkeypatch
+):
+    """Images over Pillow's pixel limit surface as ThumbnailError."""
+    source = tmp_path / "bomb.png"
+    Image.new("RGB", (100, 100)).save(source)
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1_000)
+
+    with pytest.raises(thumbnails.ThumbnailError):
+        thumbnails.create_thumbnails(source, {"large": tmp_path / "large.png"})
+
+
 @pytest.mark.parametrize("max_workers", [1, 2])
 def test_regenerate_thumbnails_one_bad_one_good_continues_and_reports_error(
     monkeypatch,
@@ -348,25 +505,11 @@ def __exit__(self, *a):
             def submit(self, fn, *args):
                 return _DummyFuture(fn, *args)
 
-        class _DummyManager:
-            def __init__(self):
-                self.queue = queue.Queue()
-                self.shutdown_called = False
-
-            def Queue(self):
-                return self.queue
-
-            def shutdown(self):
-                self.shutdown_called = True
-
         class _DummyContext:
-            def __init__(self):
-                self.manager = _DummyManager()
-
-            def Manager(self):
-                return self.manager
+            pass
 
         monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", _DummyExecutor)
+        monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
         dummy_ctx = _DummyContext()
         monkeypatch.setattr(
             thumbnails.multiprocessing,
@@ -579,6 +722,7 @@ def fake_as_completed(futures):
         yield from list(futures)
 
     monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", DummyExecutor)
+    monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
     monkeypatch.setattr(thumbnails, "as_completed", fake_as_completed)
 
     # Simulate 64-core machine
@@ -636,6 +780,7 @@ def fake_as_completed(futures):
         yield from list(futures)
 
     monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", DummyExecutor)
+    monkeypatch.setattr(thumbnails, "_PROCESS_POOL_MIN_JOBS", 0)
     monkeypatch.setattr(thumbnails, "as_completed", fake_as_completed)
 
     with patch.object(os, "cpu_count", return_value=2):
@@ -685,6 +830,91 @@ def test_regenerate_thumbnails_recreates_stale_thumbnails(
     assert new_mtime > old_mtime, "Stale thumbnail should have been regenerated"
 
 
+def test_regenerate_thumbnails_current_entry_costs_two_stats(
+    gallery_dir, sample_png_bytes
+):
+    """Up-to-date thumbnails are confirmed from the source and one thumbnail."""
+    (gallery_dir / "images" / "img.png").write_bytes(sample_png_bytes)
+    metadata = [GalleryItem(id="img", filename="img.png")]
+    thumbnails.regenerate_thumbnails(gallery_dir, metadata, force=True, max_workers=1)
+
+    real_stat = Path.stat
+    stated: list[str] = []
+
+    def counting_stat(self, *args, **kwargs):
+        stated.append(self.relative_to(gallery_dir).as_posix())
+        return real_stat(self, *args, **kwargs)
+
+    with (
+        patch.object(Path, "stat", counting_stat),
+        patch.object(thumbnails, "create_thumbnails") as create,
+    ):
+        thumbnails.regenerate_thumbnails(gallery_dir, metadata, max_workers=1)
+
+    create.assert_not_called()
+    assert sorted(stated) == ["images/img.png", "thumbs/large/img.png"]
+
+
+def test_regenerate_thumbnails_lists_each_directory_once(gallery_dir, sample_png_bytes):
+    """Existence checks come from one scandir per directory, not per entry."""
+    images_dir = gallery_dir / "images"
+    metadata = []
+    for idx in range(3):
+        (images_dir / f"img{idx}.png").write_bytes(sample_png_bytes)
+        metadata.append(GalleryItem(id=f"img{idx}", filename=f"img{idx}.png"))
+    metadata.append(GalleryItem(id="gone", filename="missing.png"))
+    thumbnails.regenerate_thumbnails(gallery_dir, metadata, force=True, max_workers=1)
+    (gallery_dir / "thumbs" / "small" / "img1.png").unlink()
+
+    real_scandir = os.scandir
+    scanned: list[str] = []
+
+    def counting_scandir(path):
+        scanned.append(os.fspath(path))
+        return real_scandir(path)
+
+    with (
+        patch.object(thumbnails.os, "scandir", side_effect=counting_scandir),
+        patch.object(thumbnails, "create_thumbnails") as create,
+    ):
+        processed, _ = thumbnails.regenerate_thumbnails(
+            gallery_dir, metadata, max_workers=1
+        )
+
+    assert processed == ["img0.png", "img1.png", "img2.png"]
+    assert len(scanned) == len(set(scanned)) == 1 + len(thumbnails.THUMBNAIL_SIZES)
+    create.assert_called_once()
+    assert create.call_args.args[0] == images_dir / "img1.png"
+
+
+def test_regenerate_thumbnails_fixes_metadata_in_one_pass(
+    gallery_dir, sample_png_bytes
+):
+    """Thumbnail paths are derived once per entry, including missing sources."""
+    (gallery_dir / "images" / "a.png").write_bytes(sample_png_bytes)
+    metadata = [
+        GalleryItem(id="a", filename="a.png"),
+        GalleryItem(id="gone", filename="gone.png"),
+    ]
+
+    with (
+        patch.object(
+            thumbnails,
+            "thumbnail_relative_paths",
+            wraps=thumbnails.thumbnail_relative_paths,
+        ) as rel_paths,
+        patch.object(thumbnails, "create_thumbnails"),
+    ):
+        processed, updated = thumbnails.regenerate_thumbnails(
+            gallery_dir, metadata, max_workers=1
+        )
+
+    assert processed == ["a.png"]
+    assert updated is True
+    assert rel_paths.call_count == len(metadata)
+    assert metadata[1].thumbnail == "thumbs/medium/gone.png"
+
+
 # ---------------------------------------------------------------------------
 # 13.4 — RGBA → RGB white background compositing
 # ---------------------------------------------------------------------------
@@ -774,6 +1004,127 @@ def test_create_thumbnails_webp_from_jpeg(tmp_path):
             assert img.format == "WEBP"
 
 
+def test_create_thumbnails_decodes_large_jpeg_at_reduced_scale(tmp_path):
+    """Large JPEGs are drafted to the biggest bucket before the full decode."""
+    buf = io.BytesIO()
+    Image.new("RGB", (2000, 1600), color=(50, 100, 150)).save(buf, format="JPEG")
+    source = tmp_path / "photo.jpg"
+    source.write_bytes(buf.getvalue())
+    decoded_sizes: list[tuple[int, int]] = []
+    real_ensure_srgb = thumbnails._ensure_srgb
+
+    def recording_ensure_srgb(image):
+        decoded_sizes.append(image.size)
+        return real_ensure_srgb(image)
+
+    dest_map = {size: tmp_path / f"{size}.jpg" for size in thumbnails.THUMBNAIL_SIZES}
+    with patch.object(thumbnails, "_ensure_srgb", recording_ensure_srgb):
+        thumbnails.create_thumbnails(source, dest_map)
+
+    # 1/2 scale is the smallest that keeps 2x headroom over the 400 px bucket.
+    assert decoded_sizes == [(1000, 800)]
+    with Image.open(dest_map["large"]) as img:
+        assert img.size == (400, 320)
+
+
+@pytest.mark.parametrize(
+    ("orientation", "expected_size"), [(1, (400, 200)), (6, (200, 400))]
+)
+def test_create_thumbnails_transposes_only_rotated_sources(
+    tmp_path, orientation, expected_size
+):
+    """Upright sources skip ``exif_transpose``; rotated ones are turned."""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    source = tmp_path / "photo.jpg"
+    Image.new("RGB", (800, 400), color=(50, 100, 150)).save(source, exif=exif)
+    dest = tmp_path / "large.jpg"
+
+    with patch.object(
+        thumbnails.ImageOps, "exif_transpose", wraps=ImageOps.exif_transpose
+    ) as transpose:
+        thumbnails.create_thumbnails(source, {"large": dest})
+
+    assert transpose.call_count == (orientation != 1)
+    with Image.open(dest) as img:
+        assert img.size == expected_size
+
+
+@pytest.mark.parametrize(
+    ("name", "expected_formats"),
+    [("photo.jpg", [("JPEG",)]), ("photo.png", [("PNG",), None])],
+)
+def test_create_thumbnails_probes_extension_format_first(
+    tmp_path, name, expected_formats
+):
+    """Sources open as their extension's format, falling back to a full probe."""
+    source = tmp_path / name
+    Image.new("RGB", (40, 30)).save(source, format="JPEG")
+    real_open = Image.open
+    probed: list[tuple[str, ...] | None] = []
+
+    def recording_open(fp, mode="r", formats=None):
+        probed.append(formats)
+        return real_open(fp, mode, formats)
+
+    with patch.object(thumbnails.Image, "open", recording_open):
+        thumbnails.create_thumbnails(source, {"small": tmp_path / "small.jpg"})
+
+    assert probed == expected_formats
+    assert (tmp_path / "small.jpg").is_file()
+
+
+def test_create_thumbnails_cascades_from_largest_bucket(tmp_path):
+    """Smaller buckets are resized from the previous thumbnail, not the source."""
+    source = tmp_path / "photo.png"
+    Image.new("RGB", (1600, 1200), color=(50, 100, 150)).save(source)
+    resized_from: list[tuple[int, int]] = []
+    real_resize = Image.Image.resize
+
+    def recording_resize(self, size, *args, **kwargs):
+        resized_from.append(self.size)
+        return real_resize(self, size, *args, **kwargs)
+
+    dest_map = {size: tmp_path / f"{size}.png" for size in thumbnails.THUMBNAIL_SIZES}
+    with patch.object(Image.Image, "resize", recording_resize):
+        thumbnails.create_thumbnails(source, dest_map)
+
+    assert resized_from == [(1600, 1200), (400, 300), (250, 188)]
+    with Image.open(dest_map["small"]) as img:
+        # Rounding from the 250x188 step may differ by a pixel from 150x112.
+        assert img.width == 150
+        assert abs(img.height - 112) <= 1
+
+
+@pytest.mark.parametrize(
+    ("size", "bounds"),
+    [((1600, 1200), (400, 400)), ((1000, 333), (250, 250)), ((333, 1000), (150, 150))],
+)
+def test_fit_size_matches_pillow_thumbnail(size, bounds):
+    """``_fit_size`` reproduces ``Image.thumbnail``'s output dimensions."""
+    image = Image.new("RGB", size)
+    image.thumbnail(bounds)
+
+    assert thumbnails._fit_size(size, bounds) == image.size
+
+
+def test_fit_size_leaves_small_images_alone():
+    assert thumbnails._fit_size((100, 80), (400, 400)) is None
+
+
+def test_save_image_keeps_existing_file_on_error(tmp_path):
+    """A failed save leaves neither a partial file nor a stray temp file."""
+    dest = tmp_path / "thumb.png"
+    dest.write_bytes(b"previous")
+    image = Image.new("RGB", (8, 8))
+
+    with pytest.raises(KeyError):
+        thumbnails._save_image(image, dest, "NOT-A-FORMAT", {})
+
+    assert dest.read_bytes() == b"previous"
+    assert [p.name for p in tmp_path.iterdir()] == ["thumb.png"]
+
+
 def test_ensure_thumbnail_metadata_webp():
     """ensure_thumbnail_metadata uses .webp paths when webp=True."""
     metadata = [GalleryItem(id="photo", filename="photo.jpg")]
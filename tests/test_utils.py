@@ -8,6 +8,7 @@
     _SENSITIVE_AUTH_KEYS,
     REQUIRED_AUTH_KEYS,
     ensure_auth_config,
+    file_matches,
     load_auth_config,
     mask_sensitive,
     prompt_and_write_auth,
@@ -140,6 +141,18 @@ def test_write_secure_file_custom_mode(tmp_path):
 # --- mask_sensitive tests ---
 
 
+def test_file_matches_compares_parts_against_file(tmp_path):
+    path = tmp_path / "out.html"
+    assert not file_matches(path, ("a",))
+
+    path.write_text("héllo world", encoding="utf-8")
+    assert file_matches(path, ("hé", "llo", " world"))
+    assert not file_matches(path, ("hé", "llo", " worle"))
+    assert not file_matches(path, ("hé", "llo"))
+    assert file_matches(path, ("hé".encode(), "llo", b" world"))
+    assert not file_matches(path, ("héllo world".encode(), b"!"))
+
+
 def test_mask_sensitive_truncates_long_value():
     assert mask_sensitive("sk-Zpp16abcdef1234567890") == "sk-Zpp16..."
 